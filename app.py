@@ -1,18 +1,32 @@
 import uuid
-from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for, flash, session
+import click
+from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for, flash, session, make_response
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from urllib.parse import urlparse
 from functools import wraps
-from datetime import datetime, timedelta
+from datetime import datetime
 from random import randint
 import os
 from dotenv import load_dotenv
 from utils.json_handler import JsonHandler
+from utils.pagination import paginate
+from utils.http_cache import conditional_get, collections_etag, not_modified
+from utils.snapshot_cache import SnapshotCache
+from utils.write_behind import WriteBehindBuffer
+from utils.sessions import init_session_interface
+from utils.json_provider import init_json_provider
+from utils.compression import init_compression
+from utils.allocation import ALLOCATION_COLLECTIONS
+from utils.spatial import SPATIAL_COLLECTIONS, SpatialIndexes
+from utils.ttl_cache import TTLCache
+from utils.event_broker import change_broker
 from routes.api_routes import api_blueprint
 from models.sql_models import User, Bowser, Location, Maintenance, Deployment, Invoice, Partner, Alert
+from models.views import BowserStatusView
+from models.principals import load_principal
 from database import initialize_database, initialize_database_with_sample_data
 from routes.protected_routes import protected_blueprint
 from config import Config
@@ -29,7 +43,10 @@ csrf = CSRFProtect()
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return load_principal(int(user_id))
+
+# Collections rendered on the public map
+PUBLIC_MAP_COLLECTIONS = ('bowsers', 'locations', 'deployments', 'alerts')
 
 def create_app(config_name='development'):
     app = Flask(__name__)
@@ -38,9 +55,13 @@ def create_app(config_name='development'):
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     
-    # Initialize extensions
+    # Initialize extensions; compression is registered first so its
+    # after_request hook runs after every other one
+    init_compression(app)
     init_db(app)
     csrf.init_app(app)
+    init_session_interface(app)
+    init_json_provider(app)
     
     # Initialize Flask-Login
     login_manager.init_app(app)
@@ -49,7 +70,43 @@ def create_app(config_name='development'):
     login_manager.login_message_category = 'info'
     
     # Initialize JSON handler
-    json_handler = JsonHandler('data/test_db.json' if app.config['TESTING'] else 'data/db.json')
+    app.json_handler = JsonHandler(
+        'data/test_db.json' if app.config['TESTING'] else 'data/db.json',
+        engine=app.config['JSON_DB_ENGINE'],
+        compact_threshold=app.config['JSON_DB_COMPACT_BYTES'],
+        indexes={
+            'mutual_aid_schemes': {'status': 'hash', 'start_date': 'sorted'},
+            'mutual_aid_contributions': {'scheme_id': 'hash'}
+        }
+    )
+    
+    # Cached user principals for the user loader (see models.principals)
+    if app.config['USER_CACHE_TTL_SECONDS'] > 0:
+        app.extensions['user_cache'] = TTLCache(
+            maxsize=app.config['USER_CACHE_SIZE'], ttl=app.config['USER_CACHE_TTL_SECONDS']
+        )
+    
+    # Batched last_login writes, so a login burst is not one write per login
+    if app.config['LAST_LOGIN_FLUSH_SECONDS'] > 0:
+        app.extensions['last_login_writer'] = WriteBehindBuffer(
+            app, User.write_last_logins, interval=app.config['LAST_LOGIN_FLUSH_SECONDS']
+        )
+    
+    # Rendered /public_map for anonymous visitors, dropped on any local write
+    # to the collections it shows
+    app.public_map_cache = SnapshotCache(max_age=app.config['PUBLIC_MAP_CACHE_SECONDS'])
+    change_broker.listen(app.public_map_cache.invalidate, PUBLIC_MAP_COLLECTIONS)
+    
+    # Shared allocation plan for /api/allocation, dropped on local writes
+    app.allocation_cache = SnapshotCache(max_age=app.config['ALLOCATION_CACHE_SECONDS'])
+    change_broker.listen(app.allocation_cache.invalidate, ALLOCATION_COLLECTIONS)
+    
+    # Grid indexes for /api/locations/nearby and /api/bowsers/nearest, moved
+    # point by point as local writes are published
+    app.extensions['spatial_index'] = SpatialIndexes(
+        cell_km=app.config['SPATIAL_CELL_KM'], max_age=app.config['SPATIAL_INDEX_MAX_AGE']
+    )
+    change_broker.listen(app.extensions['spatial_index'].apply, SPATIAL_COLLECTIONS)
     
     # Import routes after app creation to avoid circular imports
     from routes.api_routes import api_blueprint
@@ -63,11 +120,24 @@ def create_app(config_name='development'):
 
 # Create the application instance
 app = create_app('development')
+json_handler = app.json_handler
 
-# Initialize the database (using instance/aquaalert.db) and ensure tables and admin user
+# Check the schema version (using instance/aquaalert.db); upgrades only when it is stale
 initialize_database(app)
-# In development, reseed sample data (including Bloomsbury deployment)
-initialize_database_with_sample_data(app, force_reset=True)
+
+@app.cli.command('seed-db')
+@click.option('--reset', is_flag=True, help='Drop all tables before seeding.')
+def seed_db_command(reset):
+    """Load sample users, bowsers, locations, deployments and invoices."""
+    initialize_database_with_sample_data(app, force_reset=reset)
+
+@app.cli.command('rebuild-reports')
+def rebuild_reports_command():
+    """Recompute the /api/reports aggregates from the base tables."""
+    from models.report_aggregates import rebuild_report_aggregates
+    with app.app_context():
+        count = rebuild_report_aggregates()
+    click.echo(f"Rebuilt {count} report aggregate rows")
 
 # --- Access Control Decorators ---
 
@@ -139,7 +209,10 @@ def login():
             return render_template('auth/login.html'), 200
             
         user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password):
+        authenticated = bool(user and user.check_password(password))
+        # One commit for the attempt's bookkeeping (failed attempts, lockout)
+        db.session.commit()
+        if authenticated:
             # Clear any existing session data
             session.clear()
             
@@ -189,9 +262,10 @@ def logout():
 def before_request():
     """Ensure user session is valid and update last seen."""
     if current_user.is_authenticated:
-        session.permanent = True
-        session.modified = True
-        app.permanent_session_lifetime = timedelta(days=31)
+        # Expiry slides through the session interface; only a change here
+        # (or SESSION_REFRESH_THRESHOLD passing) re-issues the cookie
+        if not session.permanent:
+            session.permanent = True
         
         # Ensure session has all required data
         if 'user_id' not in session or session['user_id'] != current_user.id:
@@ -202,8 +276,14 @@ def before_request():
 
 @app.after_request
 def add_header(response):
-    """Add headers to prevent caching."""
-    if 'Cache-Control' not in response.headers:
+    """Prevent caching of authenticated pages.
+
+    Other responses are left alone; views that can be revalidated cheaply
+    set their own ETag and Cache-Control through conditional_get.
+    """
+    if ('Cache-Control' not in response.headers
+            and response.mimetype == 'text/html'
+            and current_user.is_authenticated):
         response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '-1'
@@ -221,32 +301,14 @@ def dashboard():
     if not current_user.is_authenticated:
         return redirect(url_for('login'))
         
-    # Get all bowsers and their current status
-    bowsers = Bowser.query.all()
-    bowser_status = {}
-    for bowser in bowsers:
-        bowser_status[bowser.id] = {
-            'number': bowser.number,
-            'capacity': bowser.capacity,
-            'status': bowser.status,
-            'current_location': None
-        }
-        # Get current deployment if any
-        current_deployment = Deployment.query.filter_by(
-            bowser_id=bowser.id,
-            status='active'
-        ).first()
-        if current_deployment:
-            location = Location.query.get(current_deployment.location_id)
-            if location:
-                bowser_status[bowser.id]['current_location'] = location.name
-                
+    # Get all bowsers with their active deployment location in one query
+    bowser_status = BowserStatusView.status_map()
+
     return render_template('dashboard.html', bowser_status=bowser_status)
 
 # --- Public Routes (No Decorators) ---
-@app.route('/public_map')
-def public_map():
-    """Public view of bowser locations and status"""
+def render_public_map():
+    """Render public.html from the current bowsers, deployments and alerts."""
     bowsers = Bowser.query.all()
     locations = Location.query.all()
     deployments = Deployment.query.filter(Deployment.status.in_(['active', 'scheduled'])).all()
@@ -267,6 +329,36 @@ def public_map():
                          alerts=alerts,
                          initial_data=data)
 
+def build_public_map_snapshot():
+    """Render the anonymous public map together with its validators.
+
+    The version stamps are read before the rows, so a write racing the
+    render can only make the ETag older than the body, never newer.
+    """
+    etag, last_modified = collections_etag(PUBLIC_MAP_COLLECTIONS)
+    return render_public_map(), etag, last_modified
+
+@app.route('/public_map')
+def public_map():
+    """Public view of bowser locations and status.
+
+    Anonymous visitors get a shared pre-rendered snapshot, so a hit costs a
+    dictionary lookup rather than four queries and a template render.
+    Signed-in users (whose navigation differs) and requests carrying flash
+    messages or query arguments are rendered per request.
+    """
+    if current_user.is_authenticated or request.args or session.get('_flashes'):
+        return conditional_get(*PUBLIC_MAP_COLLECTIONS)(render_public_map)()
+
+    body, etag, last_modified = app.public_map_cache.get_or_build('anonymous', build_public_map_snapshot)
+    response = make_response('', 304) if not_modified(etag) else make_response(body)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Cookie')
+    return response
+
 # --- Staff Routes ---
 @app.route('/management')
 @staff_required
@@ -376,9 +468,15 @@ def create_invoice():
 @admin_required
 def manage_schemes():
     """Mutual Aid Scheme management interface"""
-    schemes = json_handler.get_all('mutual_aid_schemes')
-    # Sort schemes by start_date in descending order
-    schemes.sort(key=lambda x: x.get('start_date', ''), reverse=True)
+    # Newest schemes first, read in order from the start_date index;
+    # a negative ?limit= is ignored
+    limit = request.args.get('limit', type=int)
+    schemes = json_handler.query(
+        'mutual_aid_schemes',
+        order_by='start_date',
+        descending=True,
+        limit=limit if limit is not None and limit >= 0 else None
+    )
     return render_template('manage_schemes.html', schemes=schemes)
 
 @app.route('/finance/schemes/create', methods=['GET', 'POST'])
@@ -487,43 +585,30 @@ def update_priority(deployment_id):
     return render_template('update_priority.html', deployment=deployment)
 
 # API Endpoints
-@app.route('/api/bowsers')
-@login_required
-def api_bowsers():
-    bowsers = Bowser.query.all()
-    return jsonify([bowser.to_dict() for bowser in bowsers])
-
-@app.route('/api/locations')
-@login_required
-def api_locations():
-    locations = Location.query.all()
-    return jsonify([location.to_dict() for location in locations])
-
-@app.route('/api/maintenance')
-@staff_required
-def api_maintenance():
-    records = Maintenance.query.all()
-    return jsonify([record.to_dict() for record in records])
-
-@app.route('/api/deployments')
-@staff_required
-def api_deployments():
-    deployments = Deployment.query.all()
-    return jsonify([deployment.to_dict() for deployment in deployments])
+def page_list_response(model, order_by=None, descending=False):
+    """Return a keyset page as a bare JSON list, with the next cursor in a header."""
+    try:
+        page = paginate(model, order_by=order_by, descending=descending)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 400
+    response = jsonify(page.items)
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    return response
 
 @app.route('/api/invoices')
 @login_required
+@conditional_get('invoices')
 def api_invoices():
-    """Return all invoices for the finance dashboard."""
-    invoices = Invoice.query.order_by(Invoice.issue_date.desc()).all()
-    return jsonify([invoice.to_dict() for invoice in invoices])
+    """Return invoices (newest first) for the finance dashboard, optionally paged."""
+    return page_list_response(Invoice, order_by=['issue_date'], descending=True)
 
 @app.route('/api/partners')
 @login_required
+@conditional_get('partners')
 def api_partners():
-    """Return all partner companies for mutual aid."""
-    partners = Partner.query.order_by(Partner.name).all()
-    return jsonify([partner.to_dict() for partner in partners])
+    """Return partner companies for mutual aid, optionally paged."""
+    return page_list_response(Partner, order_by=['name'])
 
 @app.route('/api/mutual-aid/transactions')
 @login_required
@@ -810,6 +895,5 @@ def inject_current_year():
     return {'current_year': datetime.now().year}
 
 if __name__ == '__main__':
-    # Seed database with sample data on startup
-    initialize_database_with_sample_data(app, force_reset=True)
+    # Sample data is opt-in: run `flask seed-db --reset` to (re)load it
     app.run(debug=True)
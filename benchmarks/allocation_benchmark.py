@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Time the allocation plan at fleet scale.
+
+A scratch SQLite database gets --locations active locations of mixed types
+and --bowsers available bowsers of a few standard capacities. Reported:
+
+  browser port   PriorityManager.getOptimalAllocation translated line by
+                 line: a comparator sort that scores both sides on every
+                 comparison, then largest-first shift() from the bowser list
+  allocate       utils.allocation.allocate on the same tuples
+  plan           build_allocation_plan(), i.e. the queries plus allocate
+  cached         /api/allocation served from the shared plan
+
+Usage:
+    python benchmarks/allocation_benchmark.py [--locations 10000] [--bowsers 5000]
+"""
+import argparse
+import functools
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCATION_TYPES = ['hospital', 'clinic', 'fire_station', 'water_treatment', 'residential', 'apartment', 'office', 'retail']
+CAPACITIES = [1000, 2500, 5000, 7500, 10000]
+
+def browser_allocation(bowsers, locations, business_hours, population):
+    """getOptimalAllocation from static/js/priority.js, ported as written."""
+    from utils.allocation import location_category, priority_score, required_capacity
+
+    def score(location):
+        return priority_score(location_category(location[2]), population, business_hours)
+
+    ordered = sorted(locations, key=functools.cmp_to_key(lambda a, b: score(a) - score(b)))
+    available = sorted(bowsers, key=lambda bowser: -bowser[1])
+    allocation = {}
+    for location in ordered:
+        if not available:
+            break
+        needed = required_capacity(location_category(location[2]), population)
+        allocated, total = [], 0
+        while total < needed and available:
+            bowser = available.pop(0)
+            allocated.append(bowser)
+            total += bowser[1]
+        if allocated:
+            allocation[location[0]] = allocated
+    return allocation
+
+def timed(function, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--locations', type=int, default=10000)
+    parser.add_argument('--bowsers', type=int, default=5000)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch.name, 'bench.db')}"
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    from database import db, initialize_database_with_sample_data
+    from models.sql_models import Bowser, Location
+    from utils.allocation import allocate, build_allocation_plan
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    with app.app_context():
+        db.session.execute(Location.__table__.insert(), [
+            {'id': str(uuid.uuid4()), 'name': f'Site {number}', 'address': f'{number} High Street',
+             'latitude': 50.8 + number * 1e-4, 'longitude': -0.4 + number * 1e-4,
+             'type': LOCATION_TYPES[number % len(LOCATION_TYPES)], 'status': 'active'}
+            for number in range(args.locations)
+        ])
+        db.session.execute(Bowser.__table__.insert(), [
+            {'id': str(uuid.uuid4()), 'number': f'B{number:05d}', 'capacity': CAPACITIES[number % len(CAPACITIES)],
+             'current_level': 0, 'status': 'available', 'owner': 'Fleet'}
+            for number in range(args.bowsers)
+        ])
+        db.session.commit()
+        bowsers = db.session.query(Bowser.id, Bowser.capacity).all()
+        locations = db.session.query(Location.id, Location.name, Location.type).all()
+
+    print(f"{args.locations} locations, {args.bowsers} bowsers (best of 3)")
+    browser_ms, _ = timed(lambda: browser_allocation(bowsers, locations, True, 500))
+    allocate_ms, plan = timed(lambda: allocate(locations, bowsers, True, 500))
+    with app.app_context():
+        plan_ms, _ = timed(lambda: build_allocation_plan())
+
+    client = app.test_client()
+    client.post('/login', json={'username': 'staff_test', 'password': 'Staff@123'})
+    assert client.get('/api/allocation').status_code == 200
+    cached_ms, _ = timed(lambda: client.get('/api/allocation', headers={'Accept-Encoding': 'identity'}))
+
+    print(f"{'browser port':<14} {browser_ms:>9.1f} ms")
+    print(f"{'allocate':<14} {allocate_ms:>9.1f} ms")
+    print(f"{'plan':<14} {plan_ms:>9.1f} ms")
+    print(f"{'cached':<14} {cached_ms:>9.1f} ms")
+    summary = plan['summary']
+    print(f"served {summary['served_locations']} locations with {summary['allocated_bowsers']} bowsers, "
+          f"{summary['fully_served_locations']} fully")
+    scratch.cleanup()
+
+if __name__ == '__main__':
+    main()
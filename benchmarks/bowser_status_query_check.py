@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Check that the bowser status projection costs a fixed number of queries.
+
+Statements are counted with a before_cursor_execute listener while
+BowserStatusView.all(), BowserStatusView.status_map(), GET
+/api/bowsers/status and the signed-in /dashboard run. This is done on the
+sample data and again after the fleet has grown by --extra deployed
+bowsers. Each count must be the same at both sizes: a count that grows
+with the fleet is the per-bowser lookup (N+1) coming back.
+
+Usage:
+    python benchmarks/bowser_status_query_check.py [--extra 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRATCH = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH.name, 'status.db')}"
+
+from sqlalchemy import event
+from app import app
+from database import db, initialize_database_with_sample_data
+from models.sql_models import User, Bowser, Location, Deployment
+from models.views import BowserStatusView
+
+def grow_fleet(count):
+    """Add `count` bowsers, each actively deployed at a location of its own."""
+    bowsers, locations, deployments = [], [], []
+    for number in range(count):
+        bowser_id, location_id = str(uuid.uuid4()), str(uuid.uuid4())
+        bowsers.append({'id': bowser_id, 'number': f'QC{number:05d}', 'capacity': 5000,
+                        'current_level': 2500, 'status': 'active', 'owner': 'Fleet'})
+        locations.append({'id': location_id, 'name': f'Site {number}', 'address': f'{number} Check Road',
+                          'latitude': 51.5 + number * 1e-4, 'longitude': -0.1, 'type': 'residential',
+                          'status': 'active'})
+        deployments.append({'id': str(uuid.uuid4()), 'bowser_id': bowser_id, 'location_id': location_id,
+                            'start_date': datetime.utcnow(), 'status': 'active', 'priority': 'medium'})
+    db.session.execute(Bowser.__table__.insert(), bowsers)
+    db.session.execute(Location.__table__.insert(), locations)
+    db.session.execute(Deployment.__table__.insert(), deployments)
+    db.session.commit()
+
+def count_queries(client):
+    """Statements issued by each status reader, keyed by name."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    readers = [
+        ('BowserStatusView.all', lambda: len(BowserStatusView.all())),
+        ('BowserStatusView.status_map', lambda: len(BowserStatusView.status_map())),
+        ('GET /api/bowsers/status', lambda: len(client.get('/api/bowsers/status').get_json()['data'])),
+        ('GET /dashboard', lambda: client.get('/dashboard').status_code),
+    ]
+    counts = {}
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        for name, read in readers:
+            db.session.expire_all()
+            start = len(statements)
+            result = read()
+            counts[name] = (len(statements) - start, result)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--extra', type=int, default=500, help='bowsers added for the second run')
+    args = parser.parse_args()
+
+    initialize_database_with_sample_data(app, force_reset=True)
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').first()
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+            session['_fresh'] = True
+
+        # Warm up once, so first-request work (principal cache, snapshots) is not counted
+        count_queries(client)
+        small_fleet = Bowser.query.count()
+        small = count_queries(client)
+        grow_fleet(args.extra)
+        large_fleet = Bowser.query.count()
+        large = count_queries(client)
+
+    failures = 0
+    print(f"{'':5}{'reader':<30} {f'{small_fleet} bowsers':>12} {f'{large_fleet} bowsers':>12}")
+    for name in small:
+        (small_count, _), (large_count, _) = small[name], large[name]
+        passed = small_count == large_count
+        failures += not passed
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<30} {small_count:>12} {large_count:>12}")
+    assert large['BowserStatusView.all'][1] == large_fleet, 'projection lost bowsers'
+    print(f"{len(small) - failures}/{len(small)} readers use a fixed number of queries")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Compare importing a fleet one record per request with /api/bowsers/bulk.
+
+A scratch SQLite database receives the same N bowsers three ways:
+
+  per-item   N POSTs to /api/bowsers/bulk with one item each, i.e. one
+             request and one transaction per record, as the single-record
+             endpoints do
+  batched    N / --batch-size POSTs of --batch-size items each
+  single     one POST carrying all N items
+
+Usage:
+    python benchmarks/bulk_import_benchmark.py [--bowsers 1000] [--batch-size 100]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_worker(args):
+    """Body of one strategy run; prints a JSON result line."""
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    from database import initialize_database_with_sample_data
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    client = app.test_client()
+    client.post('/login', json={'username': 'staff_test', 'password': 'Staff@123'})
+
+    docs = [
+        {'number': f'IMP-{number:05d}', 'capacity': 5000, 'current_level': 5000, 'status': 'active', 'owner': 'Region'}
+        for number in range(args.bowsers)
+    ]
+    batch_size = {'per-item': 1, 'batched': args.batch_size, 'single': len(docs)}[args.strategy]
+    created = requests = 0
+    started = time.perf_counter()
+    for start in range(0, len(docs), batch_size):
+        response = client.post('/api/bowsers/bulk', json=docs[start:start + batch_size])
+        created += response.get_json()['succeeded']
+        requests += 1
+    print(json.dumps({'seconds': time.perf_counter() - started, 'created': created, 'requests': requests}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bowsers', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--strategy', choices=['per-item', 'batched', 'single'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.strategy:
+        return run_worker(args)
+
+    print(f"{args.bowsers} bowsers, batches of {args.batch_size}")
+    print(f"{'strategy':<10} {'requests':>9} {'created':>8} {'total ms':>9} {'ms/record':>10}")
+    for strategy in ('per-item', 'batched', 'single'):
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--strategy', strategy,
+                 '--bowsers', str(args.bowsers), '--batch-size', str(args.batch_size)],
+                cwd=REPO_ROOT, env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            counts = json.loads(result.stdout.strip().splitlines()[-1])
+        milliseconds = counts['seconds'] * 1000
+        print(f"{strategy:<10} {counts['requests']:>9} {counts['created']:>8} {milliseconds:>9.0f} "
+              f"{milliseconds / max(counts['created'], 1):>10.3f}")
+
+if __name__ == '__main__':
+    main()
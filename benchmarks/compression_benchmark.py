@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Measure bytes on the wire and CPU per request with response compression.
+
+A scratch SQLite database is filled through the bulk API with a regional
+fleet (--bowsers bowsers, a third as many locations, one deployment per
+two bowsers, five maintenance records per bowser). These payloads are
+then fetched with each Accept-Encoding:
+
+  /public_map                   anonymous HTML, served from its snapshot
+  /api/bowsers                  JSON list
+  /api/deployments              JSON list
+  /api/export/maintenance       streamed NDJSON
+
+CPU is process time per request (mean of --repeat), so the difference from
+the identity row is the cost of compressing.
+
+Usage:
+    python benchmarks/compression_benchmark.py [--bowsers 2000] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOADS = ['/public_map', '/api/bowsers', '/api/deployments', '/api/export/maintenance']
+
+def seed(client, bowsers):
+    """Create the fleet through /api/<collection>/bulk; returns nothing."""
+    def bulk(collection, items):
+        created = []
+        for start in range(0, len(items), 1000):
+            response = client.post(f'/api/{collection}/bulk', json=items[start:start + 1000])
+            created += [item['id'] for item in response.get_json()['data'] if item['status'] != 'error']
+        return created
+
+    bowser_ids = bulk('bowsers', [
+        {'number': f'RGN-{number:05d}', 'capacity': 5000 + number % 4 * 2500, 'current_level': number % 5000,
+         'status': ('active', 'maintenance', 'standby')[number % 3], 'owner': 'Southern Water',
+         'notes': 'Standard 5000 L trailer bowser'}
+        for number in range(bowsers)
+    ])
+    location_ids = bulk('locations', [
+        {'name': f'Distribution point {number}', 'address': f'{number} High Street, Worthing',
+         'latitude': 50.8 + number * 0.0007, 'longitude': -0.37 - number * 0.0009, 'postcode': 'BN11 1AA',
+         'area': 'BN11', 'type': 'distribution', 'status': 'active'}
+        for number in range(bowsers // 3)
+    ])
+    bulk('deployments', [
+        {'bowser_id': bowser_ids[number], 'location_id': location_ids[number % len(location_ids)],
+         'start_date': '2024-06-01', 'status': ('active', 'scheduled')[number % 2], 'priority': 'medium',
+         'notes': 'Supply interruption response'}
+        for number in range(0, len(bowser_ids), 2)
+    ])
+    bulk('maintenance', [
+        {'bowser_id': bowser_ids[number % len(bowser_ids)], 'maintenance_type': 'inspection',
+         'description': 'Routine inspection of valve, hose and tank seals', 'date': '2024-05-01',
+         'status': 'completed', 'assigned_to': 'Depot team'}
+        for number in range(bowsers * 5)
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bowsers', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch.name, 'bench.db')}"
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    from database import initialize_database_with_sample_data
+    from utils.compression import ENCODERS
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    staff = app.test_client()
+    staff.post('/login', json={'username': 'staff_test', 'password': 'Staff@123'})
+    seed(staff, args.bowsers)
+    anonymous = app.test_client()
+
+    encodings = ['identity'] + [name for name in ('gzip', 'br') if name in ENCODERS]
+    print(f"{args.bowsers} bowsers, mean of {args.repeat} requests"
+          + ('' if 'br' in ENCODERS else ' (install brotli for br)'))
+    print(f"{'payload':<26} {'encoding':<9} {'KiB':>9} {'ratio':>6} {'CPU ms':>8} {'+CPU ms':>8}")
+    for path in PAYLOADS:
+        client = anonymous if path == '/public_map' else staff
+        baseline = None
+        for encoding in encodings:
+            headers = {'Accept-Encoding': encoding}
+            size = 0
+            started = time.process_time()
+            for _ in range(args.repeat):
+                response = client.get(path, headers=headers, buffered=False)
+                size = sum(len(chunk) for chunk in response.response)
+                response.close()
+            cpu = (time.process_time() - started) / args.repeat * 1000
+            if baseline is None:
+                baseline = (size, cpu)
+            print(f"{path:<26} {encoding:<9} {size / 1024:>9.1f} {baseline[0] / size:>5.1f}x "
+                  f"{cpu:>8.2f} {cpu - baseline[1]:>8.2f}")
+    scratch.cleanup()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Time the refill dispatch planner on synthetic outage fleets.
+
+--stops low bowsers are scattered over a 60 x 60 km area and planned
+from one depot, with each phase timed on its own:
+
+  matrix (python)   pairwise haversine in a Python double loop
+  matrix (numpy)    utils.dispatch.distance_matrix
+  nearest-neighbour capacitated trips from the matrix
+  2-opt             improving every trip
+  plan_depot        the whole single-depot plan
+
+Then --depots depots share --depots times as many stops and are planned
+serially and with a process pool of --workers.
+
+Usage:
+    python benchmarks/dispatch_benchmark.py [--stops 1000] [--depots 4] [--workers 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TANKER_CAPACITY = 20000
+
+def synthetic_stops(generator, count, lat=51.0, lon=-0.5):
+    return [(f'bowser-{number}', f'B{number:05d}', f'location-{number}', f'Site {number}',
+             lat + generator.uniform(-0.27, 0.27), lon + generator.uniform(-0.43, 0.43),
+             generator.choice((1000.0, 2500.0, 4000.0)))
+            for number in range(count)]
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - started) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stops', type=int, default=1000)
+    parser.add_argument('--depots', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    from utils.dispatch import (distance_matrix, nearest_neighbour_trips, two_opt, trip_distance,
+                                plan_depot, plan_dispatch)
+    from utils.spatial import haversine_km
+    import numpy as np
+
+    generator = random.Random(23)
+    stops = synthetic_stops(generator, args.stops)
+    depot = {'id': 'depot', 'latitude': 51.0, 'longitude': -0.5, 'tankers': 10}
+    lats = [depot['latitude']] + [stop[4] for stop in stops]
+    lons = [depot['longitude']] + [stop[5] for stop in stops]
+    demand = np.array([0.0] + [stop[6] for stop in stops])
+
+    print(f"{args.stops} stops, one depot, {TANKER_CAPACITY} L tankers")
+    python_ms, _ = timed(lambda: [[haversine_km(a, b, c, d) for c, d in zip(lats, lons)] for a, b in zip(lats, lons)])
+    numpy_ms, matrix = timed(lambda: distance_matrix(lats, lons))
+    greedy_ms, trips = timed(lambda: nearest_neighbour_trips(matrix, demand, TANKER_CAPACITY))
+    improve_ms, improved = timed(lambda: [two_opt(matrix, trip) for trip in trips])
+    plan_ms, plan = timed(lambda: plan_depot(depot, stops, TANKER_CAPACITY))
+    greedy_km = sum(trip_distance(matrix, trip) for trip in trips)
+    improved_km = sum(trip_distance(matrix, trip) for trip in improved)
+    for name, elapsed in (('matrix (python)', python_ms), ('matrix (numpy)', numpy_ms),
+                          ('nearest-neighbour', greedy_ms), ('2-opt', improve_ms), ('plan_depot', plan_ms)):
+        print(f"{name:<18} {elapsed:>9.1f} ms")
+    print(f"{len(trips)} trips, {greedy_km:.0f} km greedy, {improved_km:.0f} km after 2-opt "
+          f"({(1 - improved_km / greedy_km) * 100:.1f}% shorter)")
+
+    depots = [{'id': f'depot-{number}', 'latitude': 51.0 + number * 0.6, 'longitude': -0.5 + number * 0.9,
+               'tankers': 10} for number in range(args.depots)]
+    all_stops = [stop for depot in depots
+                 for stop in synthetic_stops(generator, args.stops, depot['latitude'], depot['longitude'])]
+    serial_ms, _ = timed(lambda: list(plan_dispatch(depots, all_stops, TANKER_CAPACITY)))
+    pool_ms, _ = timed(lambda: list(plan_dispatch(depots, all_stops, TANKER_CAPACITY, workers=args.workers)))
+    print(f"\n{args.depots} depots, {len(all_stops)} stops")
+    print(f"{'serial':<18} {serial_ms:>9.1f} ms")
+    print(f"{f'{args.workers} workers':<18} {pool_ms:>9.1f} ms")
+
+if __name__ == '__main__':
+    main()
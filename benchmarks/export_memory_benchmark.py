@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Compare peak memory of the list endpoint with the streaming export.
+
+For each table size a scratch SQLite database is filled with maintenance
+records and the whole table is fetched three ways, tracking the peak of
+Python allocations (tracemalloc) while the response is produced and read:
+
+  list       GET /api/maintenance, which builds every to_dict() and
+             jsonify()s the full list
+  ndjson     GET /api/export/maintenance
+  csv        GET /api/export/maintenance?format=csv
+
+Times include tracemalloc's overhead, so compare them with each other only.
+
+Usage:
+    python benchmarks/export_memory_benchmark.py [--rows 10000 100000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+URLS = {
+    'list': '/api/maintenance',
+    'ndjson': '/api/export/maintenance',
+    'csv': '/api/export/maintenance?format=csv',
+}
+
+def run_worker(args):
+    """Fill a scratch database with --rows records and measure every strategy."""
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    from database import db, initialize_database_with_sample_data
+    from models.sql_models import Bowser, Maintenance
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    with app.app_context():
+        bowser_ids = [bowser_id for (bowser_id,) in db.session.query(Bowser.id)]
+        start = datetime(2020, 1, 1)
+        for offset in range(0, args.rows, 10000):
+            db.session.execute(Maintenance.__table__.insert(), [
+                {
+                    'id': str(uuid.uuid4()),
+                    'bowser_id': bowser_ids[number % len(bowser_ids)],
+                    'maintenance_type': 'inspection',
+                    'description': f'Routine inspection #{number} of valve, hose and tank seals',
+                    'date': start + timedelta(hours=number),
+                    'status': 'completed',
+                    'priority': 'medium',
+                    'assigned_to': 'Depot team',
+                }
+                for number in range(offset, min(offset + 10000, args.rows))
+            ])
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', json={'username': 'staff_test', 'password': 'Staff@123'})
+    results = {}
+    for strategy, url in URLS.items():
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get(url, buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[strategy] = {'bytes': size, 'seconds': seconds, 'peak': peak}
+    print(json.dumps(results))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        args.rows = args.rows[0]
+        return run_worker(args)
+
+    print(f"{'rows':>8} {'strategy':<8} {'peak MiB':>9} {'body MiB':>9} {'seconds':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', '--rows', str(rows)],
+                cwd=REPO_ROOT, env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            results = json.loads(result.stdout.strip().splitlines()[-1])
+        for strategy, stats in results.items():
+            print(f"{rows:>8} {strategy:<8} {stats['peak'] / 2 ** 20:>9.1f} "
+                  f"{stats['bytes'] / 2 ** 20:>9.1f} {stats['seconds']:>8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Compare JsonHandler write latency: full-file rewrite vs. journaled appends.
+
+Usage:
+    python benchmarks/json_store_benchmark.py [--sizes 10000 100000 1000000] [--writes 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_handler import JsonHandler
+
+def build_snapshot(path, size):
+    """Write a snapshot holding `size` scheme-like documents."""
+    docs = [{
+        'id': str(i),
+        'name': f'Scheme {i}',
+        'start_date': '2025-01-01T00:00:00',
+        'contribution_amount': 100.0,
+        'balance': 0,
+        'status': 'active',
+        'notes': ''
+    } for i in range(size)]
+    with open(path, 'w') as f:
+        json.dump({'mutual_aid_schemes': docs}, f, indent=4)
+
+def time_writes(engine, path, size, writes):
+    handler = JsonHandler(path, engine=engine)
+    handler.load_data()
+    started = time.perf_counter()
+    for i in range(writes):
+        handler.update('mutual_aid_schemes', str(i % size), {'balance': i})
+    return (time.perf_counter() - started) / writes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--writes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'documents':>10} {'rewrite (ms)':>14} {'journal (ms)':>14} {'speedup':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'db.json')
+            build_snapshot(path, size)
+            rewrite = time_writes('file', path, size, args.writes)
+            journal = time_writes('journal', path, size, args.writes)
+        print(f"{size:>10} {rewrite * 1000:>14.2f} {journal * 1000:>14.3f} {rewrite / journal:>8.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Measure level-reading ingestion and chart queries with and without rollups.
+
+A scratch SQLite database gets --bowsers bowsers reporting every
+--interval seconds for --days days, ingested through
+utils.level_series.ingest_readings in batches of --batch. Then one
+bowser's chart is fetched over several ranges:
+
+  series    level_series(..., 'auto', --max-points): raw readings when they
+            fit, otherwise the finest rollup that does
+  raw scan  reading every raw reading in the range and bucketing it in
+            Python at the same resolution, i.e. the cost without rollups
+
+Usage:
+    python benchmarks/level_series_benchmark.py [--bowsers 10] [--days 14] [--interval 60]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RANGES = [('6 hours', timedelta(hours=6)), ('1 day', timedelta(days=1)),
+          ('7 days', timedelta(days=7)), ('all', None)]
+
+def best_of(repeat, function):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bowsers', type=int, default=10)
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--interval', type=int, default=60)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--max-points', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch.name, 'bench.db')}"
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    from database import db, initialize_database_with_sample_data
+    from models.sql_models import Bowser, LevelReading
+    from utils.level_series import ingest_readings, level_series, bucket_start, RESOLUTION_NAMES
+
+    initialize_database_with_sample_data(app, force_reset=True)
+    generator = random.Random(25)
+    end = datetime.utcnow().replace(second=0, microsecond=0)
+    start = end - timedelta(days=args.days)
+    with app.app_context():
+        bowser_ids = [str(uuid.uuid4()) for _ in range(args.bowsers)]
+        db.session.execute(Bowser.__table__.insert(), [
+            {'id': bowser_id, 'number': f'TS{number:04d}', 'capacity': 5000, 'current_level': 5000,
+             'status': 'active', 'owner': 'Fleet'}
+            for number, bowser_id in enumerate(bowser_ids)
+        ])
+        db.session.commit()
+
+        # Every bowser drains and is refilled; readings arrive interleaved
+        steps = args.days * 86400 // args.interval
+        readings = []
+        for step in range(steps):
+            moment = (start + timedelta(seconds=step * args.interval)).isoformat()
+            for bowser_id in bowser_ids:
+                level = 5000 - (step * 7 + generator.randint(0, 50)) % 5000
+                readings.append({'bowser_id': bowser_id, 'level': level, 'recorded_at': moment})
+        started = time.perf_counter()
+        for first in range(0, len(readings), args.batch):
+            result = ingest_readings(readings[first:first + args.batch], now=end)
+            assert not result.failed
+        ingest_seconds = time.perf_counter() - started
+        print(f"{len(readings)} readings from {args.bowsers} bowsers ingested in {ingest_seconds:.1f} s "
+              f"({len(readings) / ingest_seconds:,.0f} readings/s, batches of {args.batch})")
+
+        bowser_id = bowser_ids[0]
+
+        def raw_scan(range_start, resolution_name):
+            if resolution_name == 'raw':
+                return list(db.session.query(LevelReading.recorded_at, LevelReading.level).filter(
+                    LevelReading.bowser_id == bowser_id, LevelReading.recorded_at >= range_start,
+                    LevelReading.recorded_at < end).order_by(LevelReading.recorded_at))
+            seconds = RESOLUTION_NAMES[resolution_name]
+            buckets = {}
+            for recorded_at, level in db.session.query(LevelReading.recorded_at, LevelReading.level).filter(
+                    LevelReading.bowser_id == bowser_id, LevelReading.recorded_at >= range_start,
+                    LevelReading.recorded_at < end):
+                bucket = buckets.setdefault(bucket_start(recorded_at, seconds), [0, 0.0, level, level])
+                bucket[0] += 1
+                bucket[1] += level
+                bucket[2] = min(bucket[2], level)
+                bucket[3] = max(bucket[3], level)
+            return sorted(buckets.items())
+
+        print(f"\n{'range':<9} {'resolution':<11} {'points':>7} {'raw rows':>9} {'series ms':>10} {'raw scan ms':>12}")
+        for name, span in RANGES:
+            range_start = end - span if span else start
+            series_ms, (resolution, points) = best_of(
+                args.repeat, lambda: level_series(bowser_id, range_start, end, 'auto', args.max_points))
+            scan_ms, scanned = best_of(args.repeat, lambda: raw_scan(range_start, resolution))
+            raw_rows = db.session.query(LevelReading.id).filter(
+                LevelReading.bowser_id == bowser_id, LevelReading.recorded_at >= range_start,
+                LevelReading.recorded_at < end).count()
+            assert len(scanned) == len(points), (name, len(scanned), len(points))
+            print(f"{name:<9} {resolution:<11} {len(points):>7} {raw_rows:>9} {series_ms:>10.2f} {scan_ms:>12.2f}")
+    scratch.cleanup()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Measure login throughput during a shift-change burst.
+
+Worker threads POST JSON logins for a pool of staff accounts (mostly
+correct passwords, some typos) against a scratch SQLite database. Two
+bookkeeping strategies run in fresh interpreters:
+
+  per-attempt  the previous User.check_password, which committed on every
+               attempt (last_login, counter resets and failures alike)
+  batched      the current one: failures commit once per request, clean
+               successes write nothing, last_login is flushed in batches
+
+Usage:
+    python benchmarks/login_storm_benchmark.py [--threads 8] [--seconds 5] [--users 200] [--typo-ratio 0.1]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'Shift@2024'
+
+def per_attempt_check_password(self, password):
+    """User.check_password as it was, committing on every attempt."""
+    from database import db
+    if self.account_locked_until and datetime.utcnow() < self.account_locked_until:
+        return False
+    is_correct = (self.password_hash == password)
+    if is_correct:
+        self.failed_login_attempts = 0
+        self.account_locked_until = None
+        self.last_login = datetime.utcnow()
+        db.session.commit()
+    else:
+        self.failed_login_attempts += 1
+        if self.failed_login_attempts >= 5:
+            self.account_locked_until = datetime.utcnow() + timedelta(minutes=30)
+        db.session.commit()
+    return is_correct
+
+def run_worker(args):
+    """Body of one strategy run; prints a JSON result line."""
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    from database import db, initialize_database_with_sample_data
+    from models.sql_models import User
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    usernames = [f'shift{number:04d}' for number in range(args.users)]
+    with app.app_context():
+        for username in usernames:
+            user = User(username=username, email=f'{username}@example.com', role='staff')
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+
+    if args.strategy == 'per-attempt':
+        User.check_password = per_attempt_check_password
+        app.extensions.pop('last_login_writer', None)
+
+    counts = {'ok': 0, 'rejected': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def drive(seed):
+        rng = random.Random(seed)
+        client = app.test_client(use_cookies=False)
+        ok = rejected = 0
+        while time.perf_counter() < deadline:
+            password = PASSWORD if rng.random() >= args.typo_ratio else 'typo'
+            response = client.post('/login', json={'username': rng.choice(usernames), 'password': password})
+            if response.get_json().get('success'):
+                ok += 1
+            else:
+                rejected += 1
+        with lock:
+            counts['ok'] += ok
+            counts['rejected'] += rejected
+
+    threads = [threading.Thread(target=drive, args=(seed,)) for seed in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counts['seconds'] = time.perf_counter() - started
+    writer = app.extensions.get('last_login_writer')
+    counts['flushed'] = writer.flush() if writer else 0
+    print(json.dumps(counts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--typo-ratio', type=float, default=0.1)
+    parser.add_argument('--strategy', choices=['per-attempt', 'batched'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.strategy:
+        return run_worker(args)
+
+    print(f"{args.threads} threads, {args.users} accounts, {args.typo_ratio:.0%} typos, {args.seconds:.0f} s per strategy")
+    print(f"{'strategy':<12} {'logins/s':>9} {'ok':>7} {'rejected':>9}")
+    for strategy in ('per-attempt', 'batched'):
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--strategy', strategy, '--threads', str(args.threads),
+                 '--seconds', str(args.seconds), '--users', str(args.users), '--typo-ratio', str(args.typo_ratio)],
+                cwd=REPO_ROOT, env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            counts = json.loads(result.stdout.strip().splitlines()[-1])
+        total = counts['ok'] + counts['rejected']
+        print(f"{strategy:<12} {total / counts['seconds']:>9.1f} {counts['ok']:>7} {counts['rejected']:>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Estimate server load of dashboard polling versus the /api/stream push channel.
+
+Polling cost is measured by timing the five list requests one dashboard
+refresh makes. Push cost is measured by fanning change events out to N
+in-process subscribers through the change broker.
+
+Usage:
+    python benchmarks/push_vs_poll_benchmark.py [--clients 100 500 1000] [--interval 30] [--changes-per-second 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.event_broker import EventBroker
+
+POLL_ENDPOINTS = ['/api/locations', '/api/bowsers', '/api/deployments', '/api/alerts', '/api/maintenance']
+
+def time_poll_round(client, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for endpoint in POLL_ENDPOINTS:
+            client.get(endpoint)
+    return (time.perf_counter() - started) / rounds
+
+def time_fanout(clients, events):
+    broker = EventBroker()
+    subscriptions = [broker.subscribe(['bowsers']) for _ in range(clients)]
+    change = {'collection': 'bowsers', 'operation': 'upsert', 'id': 'b1', 'row': {'id': 'b1', 'current_level': 1.0}}
+    started = time.perf_counter()
+    for _ in range(events):
+        broker.publish('bowsers', change)
+        for subscription in subscriptions:
+            subscription.get()
+    return (time.perf_counter() - started) / events
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--interval', type=float, default=30.0, help='polling interval in seconds')
+    parser.add_argument('--changes-per-second', type=float, default=1.0)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    poll_round = time_poll_round(app.test_client(), args.rounds)
+    print(f"one poll round ({len(POLL_ENDPOINTS)} requests): {poll_round * 1000:.2f} ms")
+    print(f"{'clients':>8} {'poll req/s':>11} {'poll cpu s/s':>13} {'push req/s':>11} {'push cpu s/s':>13} {'req/s saved':>12}")
+    for clients in args.clients:
+        poll_rps = clients * len(POLL_ENDPOINTS) / args.interval
+        poll_cpu = clients / args.interval * poll_round
+        push_cpu = args.changes_per_second * time_fanout(clients, 200)
+        print(f"{clients:>8} {poll_rps:>11.1f} {poll_cpu:>13.4f} {0:>11.1f} {push_cpu:>13.4f} {poll_rps:>12.1f}")
+
+if __name__ == '__main__':
+    main()
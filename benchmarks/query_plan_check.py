@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""Fail if a hot route's SQL needs a full table scan or an unindexed sort on SQLite.
+
+Every SELECT issued while requesting the routes in HOT_ROUTES (as a signed-in
+admin, against a scratch database loaded with the sample data) is run
+through EXPLAIN QUERY PLAN. A query fails the check when its plan:
+
+  * scans a table without an index while filtering it (WHERE) or joining it,
+  * builds an automatic (temporary) index, or
+  * sorts through a temporary B-tree instead of reading an index in order.
+
+Plain "read the whole table" queries, such as Bowser.query.all(), are
+allowed: a scan is the cheapest plan for them.
+
+Usage:
+    python benchmarks/query_plan_check.py [--verbose]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRATCH = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH.name, 'plans.db')}"
+
+from sqlalchemy import event
+from app import app
+from database import db, initialize_database_with_sample_data
+from models.sql_models import User
+
+HOT_ROUTES = [
+    '/public_map?plan=1',
+    '/dashboard',
+    '/maintenance',
+    '/deployments/manage',
+    '/finance',
+    '/emergency/priority',
+    '/protected/dashboard',
+    '/api/bowsers/status',
+    '/api/bowsers?limit=50',
+    '/api/locations?limit=50',
+    '/api/deployments?limit=50',
+    '/api/maintenance?limit=50',
+    '/api/alerts?limit=50',
+    '/api/invoices?limit=50',
+    '/api/partners?limit=50',
+    '/api/sync?since=0',
+]
+
+BARE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+def capture_queries(client):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        for route in HOT_ROUTES:
+            start = len(statements)
+            try:
+                response = client.get(route)
+                status = response.status_code
+            except Exception as e:
+                # The queries ran before the failure (usually a template
+                # error), so their plans are still worth checking
+                status = type(e).__name__
+            if status != 200:
+                print(f"note {route}: {status}")
+            for statement, parameters in statements[start:]:
+                yield route, statement, parameters
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def plan_problems(statement, plan):
+    problems = []
+    filtered = ' WHERE ' in statement.upper()
+    for position, detail in enumerate(plan):
+        scan = BARE_SCAN.match(detail)
+        if scan and (filtered or position > 0):
+            problems.append(f"full scan of {scan.group(1)}")
+        if 'AUTOMATIC' in detail:
+            problems.append(detail.lower())
+        if 'USE TEMP B-TREE FOR ORDER BY' in detail:
+            problems.append('sort without an index')
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args()
+
+    initialize_database_with_sample_data(app, force_reset=True)
+    failures = 0
+    seen = set()
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').first()
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+            session['_fresh'] = True
+
+        queries = list(capture_queries(client))
+        connection = db.engine.raw_connection()
+        try:
+            for route, statement, parameters in queries:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                cursor = connection.cursor()
+                cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+                plan = [row[-1] for row in cursor.fetchall()]
+                cursor.close()
+                problems = plan_problems(statement, plan)
+                if problems or args.verbose:
+                    print(f"{'FAIL' if problems else 'ok  '} {route}: {' '.join(statement.split())[:160]}")
+                    for detail in plan:
+                        print(f"       {detail}")
+                    for problem in problems:
+                        print(f"       -> {problem}")
+                failures += bool(problems)
+        finally:
+            connection.close()
+
+    print(f"{len(seen)} distinct queries checked, {failures} with scans or unindexed sorts")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
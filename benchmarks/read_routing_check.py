@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""Check read/write routing against two local SQLite files.
+
+primary.db takes writes; replica.db is opened read-only (mode=ro) as
+SQLALCHEMY_READ_URI. "Replication" is a stand-in: an explicit copy of the
+primary through SQLite's online backup API, so replica lag is under the
+script's control. Statements are attributed to a file by listening on
+every engine, and each check prints PASS or FAIL.
+
+Usage:
+    python benchmarks/read_routing_check.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRATCH = tempfile.TemporaryDirectory()
+PRIMARY = os.path.join(SCRATCH.name, 'primary.db')
+REPLICA = os.path.join(SCRATCH.name, 'replica.db')
+os.environ['DATABASE_URL'] = f"sqlite:///{PRIMARY}"
+os.environ['DATABASE_READ_URL'] = f"sqlite:///file:{REPLICA}?mode=ro&uri=true"
+# mode=ro needs the file to exist before the first read connection
+sqlite3.connect(REPLICA).close()
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from app import app
+from database import db, initialize_database_with_sample_data
+from models.sql_models import User, Maintenance
+
+def replicate():
+    """Copy the primary into the replica (the replication stand-in)."""
+    source, target = sqlite3.connect(PRIMARY), sqlite3.connect(REPLICA)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+class StatementLog:
+    def __init__(self):
+        self.files = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.files.append('replica' if 'replica.db' in str(conn.engine.url) else 'primary')
+
+    def take(self):
+        files, self.files = self.files, []
+        return set(files)
+
+def signed_in_client(user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = user_id
+        session['_fresh'] = True
+    return client
+
+def main():
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    replicate()
+
+    log = StatementLog()
+    results = []
+
+    def check(name, passed, detail=''):
+        results.append(passed)
+        print(f"{'PASS' if passed else 'FAIL'} {name}{f' ({detail})' if detail else ''}")
+
+    with app.app_context():
+        user_id = str(User.query.first().id)
+        record_id = Maintenance.query.first().id
+        read_engine = app.extensions['read_engine']
+        for engine in (db.engine, read_engine):
+            event.listen(engine, 'before_cursor_execute', log)
+
+    writer, reader = signed_in_client(user_id), signed_in_client(user_id)
+    log.take()
+
+    reader.get('/api/bowsers?limit=10')
+    files = log.take()
+    check('GET reads from the replica', files == {'replica'}, ', '.join(sorted(files)))
+
+    response = writer.put(f'/api/maintenance/{record_id}', json={'description': 'routed write'})
+    files = log.take()
+    check('PUT goes to the primary only', response.status_code == 200 and files == {'primary'}, ', '.join(sorted(files)))
+
+    body = writer.get('/api/maintenance').get_json()
+    files = log.take()
+    seen = {row['id']: row['description'] for row in body['data']}.get(record_id)
+    check('writer reads its own write from the primary', files == {'primary'} and seen == 'routed write',
+          f"{', '.join(sorted(files))}; saw {seen!r}")
+
+    body = reader.get('/api/maintenance').get_json()
+    seen = {row['id']: row['description'] for row in body['data']}.get(record_id)
+    check('other clients read the lagging replica', log.take() == {'replica'} and seen != 'routed write', f"saw {seen!r}")
+
+    replicate()
+    body = reader.get('/api/maintenance').get_json()
+    seen = {row['id']: row['description'] for row in body['data']}.get(record_id)
+    check('replica serves the write once replicated', seen == 'routed write', f"saw {seen!r}")
+    log.take()
+
+    with app.app_context():
+        try:
+            with read_engine.begin() as connection:
+                connection.execute("DELETE FROM maintenance")
+            rejected = False
+        except OperationalError:
+            rejected = True
+    check('read engine refuses writes', rejected)
+
+    failures = results.count(False)
+    print(f"{len(results) - failures}/{len(results)} checks passed")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""Compare loading the reports dashboard before and after report aggregates.
+
+For each --history size a scratch SQLite database gets that many
+maintenance records and a tenth as many deployments (spread over two
+years and a few areas). Timed and measured:
+
+  lists     what reports.js used to download: /api/bowsers, /api/deployments
+            and /api/maintenance in full
+  reports   /api/reports?days=30 from the aggregates
+  rebuild   rebuild_report_aggregates() from scratch
+  write     bulk-creating 100 maintenance records with the aggregates kept
+            current, against the same write with the flush hook removed
+
+Usage:
+    python benchmarks/report_aggregates_benchmark.py [--history 10000 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AREAS = ['BN1', 'BN2', 'BN11', 'RH10', 'RH12', 'GU1']
+LOCATION_TYPES = ['hospital', 'clinic', 'fire_station', 'residential', 'apartment', 'office', 'retail']
+MAINTENANCE_TYPES = ['inspection', 'repair', 'scheduled', 'emergency']
+
+def seed(db, models, history, generator):
+    Bowser, Location, Deployment, Maintenance = models
+    now = datetime.utcnow()
+    bowser_ids = [str(uuid.uuid4()) for _ in range(500)]
+    location_ids = [str(uuid.uuid4()) for _ in range(300)]
+    db.session.execute(Bowser.__table__.insert(), [
+        {'id': bowser_id, 'number': f'B{number:05d}', 'capacity': 5000, 'current_level': generator.randint(0, 5000),
+         'status': generator.choice(['active', 'standby', 'maintenance']), 'owner': 'Fleet'}
+        for number, bowser_id in enumerate(bowser_ids)
+    ])
+    db.session.execute(Location.__table__.insert(), [
+        {'id': location_id, 'name': f'Site {number}', 'address': f'{number} High Street', 'latitude': 50.8,
+         'longitude': -0.4, 'postcode': '', 'area': generator.choice(AREAS),
+         'type': generator.choice(LOCATION_TYPES), 'status': 'active'}
+        for number, location_id in enumerate(location_ids)
+    ])
+    db.session.execute(Deployment.__table__.insert(), [
+        {'id': str(uuid.uuid4()), 'bowser_id': generator.choice(bowser_ids),
+         'location_id': generator.choice(location_ids),
+         'start_date': now - timedelta(minutes=generator.randint(0, 2 * 365 * 24 * 60)),
+         'status': 'active' if number < 200 else 'completed', 'priority': 'medium'}
+        for number in range(history // 10)
+    ])
+    for start in range(0, history, 20000):
+        db.session.execute(Maintenance.__table__.insert(), [
+            {'id': str(uuid.uuid4()), 'bowser_id': generator.choice(bowser_ids),
+             'maintenance_type': generator.choice(MAINTENANCE_TYPES), 'description': 'Routine inspection of valves',
+             'date': now - timedelta(minutes=generator.randint(0, 2 * 365 * 24 * 60)),
+             'status': generator.choice(['completed', 'completed', 'scheduled']), 'priority': 'medium'}
+            for _ in range(min(20000, history - start))
+        ])
+    db.session.commit()
+    return bowser_ids
+
+def best_of(repeat, function):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+def run(history, repeat):
+    scratch = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch.name, 'bench.db')}"
+    for name in [name for name in sys.modules if name == 'app' or name.startswith(('models', 'routes', 'database', 'utils', 'config'))]:
+        del sys.modules[name]
+    from app import app
+    from database import db, initialize_database_with_sample_data
+    from models.sql_models import Bowser, Location, Deployment, Maintenance
+    from models import report_aggregates
+    from sqlalchemy import event
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    generator = random.Random(24)
+    with app.app_context():
+        bowser_ids = seed(db, (Bowser, Location, Deployment, Maintenance), history, generator)
+        rebuild_ms, rows = best_of(1, report_aggregates.rebuild_report_aggregates)
+
+    client = app.test_client()
+    client.post('/login', json={'username': 'staff_test', 'password': 'Staff@123'})
+    headers = {'Accept-Encoding': 'identity'}
+
+    def lists():
+        return sum(len(client.get(path, headers=headers).data)
+                   for path in ('/api/bowsers', '/api/deployments', '/api/maintenance'))
+
+    def reports():
+        return len(client.get('/api/reports?days=30', headers=headers).data)
+
+    def write():
+        items = [{'bowser_id': generator.choice(bowser_ids), 'maintenance_type': 'inspection',
+                  'description': 'Valve check', 'date': f'2026-{generator.randint(1, 9):02d}-{generator.randint(1, 28):02d}',
+                  'status': 'scheduled'} for _ in range(100)]
+        assert client.post('/api/maintenance/bulk', json=items).status_code == 200
+
+    lists_ms, lists_bytes = best_of(repeat, lists)
+    reports_ms, reports_bytes = best_of(repeat, reports)
+    write_ms, _ = best_of(repeat, write)
+    event.remove(db.session, 'after_flush', report_aggregates.refresh_aggregates)
+    plain_write_ms, _ = best_of(repeat, write)
+
+    print(f"{history:>8} {'lists':<8} {lists_ms:>9.1f} ms {lists_bytes / 1024:>9.1f} KiB")
+    print(f"{'':>8} {'reports':<8} {reports_ms:>9.1f} ms {reports_bytes / 1024:>9.1f} KiB")
+    print(f"{'':>8} {'rebuild':<8} {rebuild_ms:>9.1f} ms {rows:>9} rows")
+    print(f"{'':>8} {'write':<8} {write_ms:>9.1f} ms (without aggregates {plain_write_ms:.1f} ms)")
+    scratch.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sys.path.insert(0, REPO_ROOT)
+    print(f"{'history':>8} {'path':<8} {'best of ' + str(args.repeat):>12}")
+    for history in args.history:
+        run(history, args.repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""Measure API serialization cost per model, per 10k rows.
+
+Each model's table in a scratch SQLite database is filled with --rows
+generated rows, then serialized to a JSON string three ways:
+
+  orm+stdlib   Model.query.all(), to_dict() per object, stdlib encoder
+               (the previous path of every list endpoint)
+  proj+stdlib  column tuples through utils.serialization, stdlib encoder
+  proj+orjson  column tuples, orjson encoder (skipped when not installed)
+
+Times are the best of --repeat runs, scaled to 10k rows.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--rows 10000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def column_value(column, number, parents):
+    """A plausible value for `column` in generated row `number`."""
+    from database import db
+    for foreign_key in column.foreign_keys:
+        ids = parents[foreign_key.column.table.name]
+        return ids[number % len(ids)]
+    if column.primary_key:
+        return str(uuid.uuid4()) if isinstance(column.type, db.String) else None
+    if isinstance(column.type, db.DateTime):
+        return datetime(2020, 1, 1) + timedelta(minutes=number)
+    if isinstance(column.type, db.Integer):
+        return number
+    if isinstance(column.type, db.Float):
+        return number * 0.5
+    if isinstance(column.type, db.String) and column.type.length:
+        return f'{column.name}-{number}'[-column.type.length:]
+    return f'Generated {column.name} text for row {number}, long enough to be realistic.'
+
+def fill(models, rows):
+    """Insert `rows` generated rows into each model's table, parents first."""
+    from database import db
+    tables = [model.__table__ for model in models]
+    parents = {}
+    for table in db.metadata.sorted_tables:
+        if table not in tables:
+            continue
+        for offset in range(0, rows, 5000):
+            db.session.execute(table.insert(), [
+                {
+                    column.name: column_value(column, number, parents)
+                    for column in table.columns
+                    if not (column.primary_key and isinstance(column.type, db.Integer))
+                }
+                for number in range(offset, min(offset + 5000, rows))
+            ])
+        parents[table.name] = [row_id for (row_id,) in db.session.execute(table.select().with_only_columns(table.c.id))]
+    db.session.commit()
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch.name, 'bench.db')}"
+    sys.path.insert(0, REPO_ROOT)
+    from flask import json
+    from app import app
+    from database import db
+    from models.sql_models import User, Bowser, Location, Deployment, Maintenance, Alert, Invoice, Partner
+    from utils.json_provider import JSON_BACKENDS
+    from utils.serialization import project_rows
+
+    models = [User, Bowser, Location, Deployment, Maintenance, Alert, Invoice, Partner]
+    with app.app_context():
+        db.create_all()
+        fill(models, args.rows)
+
+    strategies = [
+        ('orm+stdlib', 'stdlib', lambda model: [row.to_dict() for row in model.query.all()]),
+        ('proj+stdlib', 'stdlib', project_rows),
+    ]
+    if 'orjson' in JSON_BACKENDS:
+        strategies.append(('proj+orjson', 'orjson', project_rows))
+
+    scale = 10000 / args.rows
+    print(f"ms per 10k rows ({args.rows} rows, best of {args.repeat})")
+    print(f"{'model':<12}" + ''.join(f"{name:>13}" for name, backend, build in strategies) + f"{'speed-up':>10}")
+    for model in models:
+        timings = []
+        for name, backend, build in strategies:
+            app.json_encoder = JSON_BACKENDS[backend]
+
+            def run():
+                with app.test_request_context():
+                    db.session.expunge_all()
+                    json.dumps(build(model))
+            timings.append(best_of(args.repeat, run) * scale * 1000)
+        print(f"{model.__name__:<12}" + ''.join(f"{timing:>13.1f}" for timing in timings)
+              + f"{timings[0] / timings[-1]:>9.1f}x")
+    scratch.cleanup()
+
+if __name__ == '__main__':
+    main()
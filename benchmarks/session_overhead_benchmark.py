@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Measure per-request session overhead for an authenticated API poller.
+
+A signed-in client polls /api/bowsers/status. Three session set-ups are
+compared in one process:
+
+  legacy     signed cookie re-issued on every request (session.modified
+             forced in before_request, as the app used to do)
+  sliding    signed cookie re-issued only past SESSION_REFRESH_THRESHOLD
+  server     SESSION_TYPE='filesystem': data on disk, id-only cookie,
+             also re-issued only past the threshold
+
+Usage:
+    python benchmarks/session_overhead_benchmark.py [--requests 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRATCH = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH.name, 'sessions.db')}"
+
+from flask import session
+from flask.sessions import SecureCookieSessionInterface
+from app import app
+from database import initialize_database_with_sample_data
+from utils.sessions import FileSystemSessionStore, ServerSideSessionInterface, SlidingCookieSessionInterface
+
+POLL_ROUTE = '/api/bowsers/status'
+
+def force_refresh():
+    """The old before_request behaviour."""
+    session.permanent = True
+    session.modified = True
+
+def measure(interface, requests, legacy=False):
+    app.session_interface = interface
+    if legacy:
+        app.before_request_funcs.setdefault(None, []).insert(0, force_refresh)
+    try:
+        client = app.test_client()
+        client.post('/login', json={'username': 'staff_test', 'password': 'Staff@123'})
+        client.get(POLL_ROUTE)
+        header_bytes = cookies = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = client.get(POLL_ROUTE)
+            set_cookie = response.headers.getlist('Set-Cookie')
+            cookies += bool(set_cookie)
+            header_bytes += sum(len('Set-Cookie: ') + len(value) + 2 for value in set_cookie)
+        elapsed = time.perf_counter() - started
+    finally:
+        if legacy:
+            app.before_request_funcs[None].remove(force_refresh)
+    return elapsed / requests, cookies, header_bytes / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        setups = [
+            ('legacy', SecureCookieSessionInterface(), True),
+            ('sliding', SlidingCookieSessionInterface(), False),
+            ('server', ServerSideSessionInterface(FileSystemSessionStore(scratch)), False),
+        ]
+        print(f"{args.requests} polls of {POLL_ROUTE}")
+        print(f"{'session':<9} {'ms/req':>8} {'Set-Cookie responses':>21} {'cookie bytes/resp':>18}")
+        for name, interface, legacy in setups:
+            per_request, cookies, header_bytes = measure(interface, args.requests, legacy)
+            print(f"{name:<9} {per_request * 1000:>8.3f} {cookies:>21} {header_bytes:>18.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Compare the spatial grid index with a brute-force haversine scan.
+
+--points random points are spread over Great Britain's bounding box and
+--queries random query points are answered both ways:
+
+  within    every point within --radius km, nearest first
+  nearest   the --k nearest points
+
+Brute force computes the distance to every point and sorts; the grid
+index visits only the cells near the query. Results are checked to be
+identical, and the index's build time is reported.
+
+Usage:
+    python benchmarks/spatial_index_benchmark.py [--points 100000] [--queries 200] [--radius 5] [--k 5]
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Roughly the mainland's latitude/longitude extent
+BOUNDS = ((50.0, 58.6), (-5.7, 1.8))
+
+def random_point(generator):
+    (lat_min, lat_max), (lon_min, lon_max) = BOUNDS
+    return generator.uniform(lat_min, lat_max), generator.uniform(lon_min, lon_max)
+
+def brute_within(points, haversine_km, lat, lon, radius_km):
+    found = []
+    for key, (point_lat, point_lon) in enumerate(points):
+        distance = haversine_km(lat, lon, point_lat, point_lon)
+        if distance <= radius_km:
+            found.append((distance, key))
+    return sorted(found)
+
+def brute_nearest(points, haversine_km, lat, lon, k):
+    return heapq.nsmallest(k, ((haversine_km(lat, lon, point_lat, point_lon), key)
+                               for key, (point_lat, point_lon) in enumerate(points)))
+
+def timed(function, queries):
+    started = time.perf_counter()
+    results = [function(lat, lon) for lat, lon in queries]
+    return (time.perf_counter() - started) / len(queries) * 1000, results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--radius', type=float, default=5.0)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--cell-km', type=float, default=5.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    from utils.spatial import GridIndex, haversine_km
+
+    generator = random.Random(22)
+    points = [random_point(generator) for _ in range(args.points)]
+    queries = [random_point(generator) for _ in range(args.queries)]
+
+    started = time.perf_counter()
+    index = GridIndex(args.cell_km)
+    for key, (lat, lon) in enumerate(points):
+        index.insert(key, lat, lon, None)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    def strip(found):
+        return [(distance, key) for distance, key, _ in found]
+
+    print(f"{args.points} points, {args.queries} queries, {args.cell_km:g} km cells "
+          f"(index built in {build_ms:.0f} ms)")
+    print(f"{'query':<22} {'brute ms':>9} {'index ms':>9} {'speed-up':>9}")
+    cases = [
+        (f'within {args.radius:g} km',
+         lambda lat, lon: brute_within(points, haversine_km, lat, lon, args.radius),
+         lambda lat, lon: strip(index.within(lat, lon, args.radius))),
+        (f'nearest k={args.k}',
+         lambda lat, lon: brute_nearest(points, haversine_km, lat, lon, args.k),
+         lambda lat, lon: strip(index.nearest(lat, lon, args.k))),
+    ]
+    for name, brute, indexed in cases:
+        brute_ms, expected = timed(brute, queries)
+        index_ms, actual = timed(indexed, queries)
+        assert actual == expected, f"{name}: index results differ from brute force"
+        print(f"{name:<22} {brute_ms:>9.2f} {index_ms:>9.3f} {brute_ms / index_ms:>8.0f}x")
+
+if __name__ == '__main__':
+    main()
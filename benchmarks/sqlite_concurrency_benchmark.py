@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Measure mixed read/write request throughput under two SQLite profiles.
+
+Worker threads drive the app through Flask test clients against a scratch
+database file: most requests are API reads, the rest update maintenance
+records. Each profile runs in a fresh interpreter so the connection
+profile comes from config (SQLITE_* environment variables), as it would
+in a deployment.
+
+  rollback  journal_mode=DELETE, synchronous=FULL, SQLite's default caches,
+            a new connection per request (the previous behaviour)
+  wal       the SQLITE_PRAGMAS and SQLITE_POOL_SIZE defaults in config.Config
+
+Usage:
+    python benchmarks/sqlite_concurrency_benchmark.py [--threads 8] [--seconds 5] [--write-ratio 0.1]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'rollback': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL',
+                 'SQLITE_MMAP_SIZE': '0', 'SQLITE_CACHE_SIZE': '-2000', 'SQLITE_POOL_SIZE': '0'},
+    'wal': {},
+}
+READ_ROUTES = ['/api/bowsers?limit=50', '/api/deployments?limit=50', '/api/bowsers/status', '/api/sync?since=0']
+
+def run_worker(args):
+    """Body of one profile run; prints a JSON result line."""
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    from database import initialize_database_with_sample_data
+    from models.sql_models import User, Maintenance
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    initialize_database_with_sample_data(app, force_reset=True)
+    with app.app_context():
+        user_id = str(User.query.first().id)
+        record_ids = [record.id for record in Maintenance.query.all()]
+
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def drive(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = user_id
+            session['_fresh'] = True
+        reads = writes = errors = 0
+        while time.perf_counter() < deadline:
+            if rng.random() < args.write_ratio:
+                response = client.put(f'/api/maintenance/{rng.choice(record_ids)}',
+                                      json={'description': f'benchmark {rng.random()}'})
+                writes += 1
+            else:
+                response = client.get(rng.choice(READ_ROUTES))
+                reads += 1
+            errors += response.status_code >= 400
+        with lock:
+            counts['reads'] += reads
+            counts['writes'] += writes
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=drive, args=(seed,)) for seed in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counts['seconds'] = time.perf_counter() - started
+    print(json.dumps(counts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return run_worker(args)
+
+    print(f"{args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:.0f} s per profile")
+    print(f"{'profile':<10} {'req/s':>8} {'reads/s':>8} {'writes/s':>9} {'errors':>7}")
+    for name, overrides in PROFILES.items():
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'bench.db')}", **overrides)
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', '--threads', str(args.threads),
+                 '--seconds', str(args.seconds), '--write-ratio', str(args.write_ratio)],
+                cwd=REPO_ROOT, env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            counts = json.loads(result.stdout.strip().splitlines()[-1])
+        seconds = counts['seconds']
+        total = counts['reads'] + counts['writes']
+        print(f"{name:<10} {total / seconds:>8.1f} {counts['reads'] / seconds:>8.1f} "
+              f"{counts['writes'] / seconds:>9.1f} {counts['errors']:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Measure worker cold-start time: importing app.py in a fresh interpreter.
+
+Each run starts a new Python process against a scratch SQLite database, the
+way a gunicorn worker boots. The first boot creates the schema; later boots
+only read the schema version. For comparison the old boot sequence (schema
+check followed by a forced drop-and-reseed) is timed as well.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT = 'import app'
+BOOT_WITH_RESEED = ('import app; from database import initialize_database_with_sample_data; '
+                    'initialize_database_with_sample_data(app.app, force_reset=True)')
+BARE_IMPORTS = 'import flask, flask_sqlalchemy, flask_login, flask_wtf, sqlalchemy'
+# The database step alone, timed inside an already booted process
+STEP = ('import time, app; from database import initialize_database, initialize_database_with_sample_data; '
+        'started = time.perf_counter(); {step}; print(time.perf_counter() - started)')
+SCHEMA_CHECK = STEP.format(step='initialize_database(app.app)')
+RESEED = STEP.format(step='initialize_database_with_sample_data(app.app, force_reset=True)')
+
+def time_process(code, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def time_step(code, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=env, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def report(label, samples):
+    print(f"{label:<34} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = f"sqlite:///{os.path.join(scratch, 'startup.db')}"
+        report('interpreter + framework imports', [time_process(BARE_IMPORTS, database_url) for _ in range(args.runs)])
+        report('first boot (creates schema)', [time_process(BOOT, database_url)])
+        report('boot (schema version check)', [time_process(BOOT, database_url) for _ in range(args.runs)])
+        report('boot + drop/reseed (old default)', [time_process(BOOT_WITH_RESEED, database_url) for _ in range(args.runs)])
+        report('db step: schema version check', [time_step(SCHEMA_CHECK, database_url) for _ in range(args.runs)])
+        report('db step: drop/reseed', [time_step(RESEED, database_url) for _ in range(args.runs)])
+
+if __name__ == '__main__':
+    main()
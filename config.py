@@ -12,6 +12,16 @@ class Config:
     SESSION_TYPE = 'filesystem'
     SESSION_PERMANENT = True
     SESSION_USE_SIGNER = True
+    # Sliding expiry: an unchanged session is re-issued at most this often
+    SESSION_REFRESH_THRESHOLD = timedelta(minutes=5)
+    
+    # Signed-in user principals cached per worker; edits in this worker
+    # invalidate immediately, the TTL bounds edits made by other workers
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', 30))
+    
+    # Seconds between batched last_login writes; 0 writes them with the login
+    LAST_LOGIN_FLUSH_SECONDS = float(os.environ.get('LAST_LOGIN_FLUSH_SECONDS', 5))
     
     # Password Policy
     PASSWORD_MIN_LENGTH = 8
@@ -25,10 +35,88 @@ class Config:
     if not os.path.exists(INSTANCE_PATH):
         os.makedirs(INSTANCE_PATH)
     
+    SESSION_FILE_DIR = os.path.join(INSTANCE_PATH, 'flask_session')
+    
     DATABASE_PATH = os.path.join(INSTANCE_PATH, 'aquaalert.db')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{DATABASE_PATH}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read-only requests (GET/HEAD) query this database instead, e.g. a
+    # replica URL or the same SQLite file opened read-only:
+    #   sqlite:///file:/path/to/aquaalert.db?mode=ro&uri=true
+    # Unset, every request uses SQLALCHEMY_DATABASE_URI.
+    SQLALCHEMY_READ_URI = os.environ.get('DATABASE_READ_URL')
+    # After a write, the same client reads from the primary for this long
+    READ_AFTER_WRITE_SECONDS = float(os.environ.get('READ_AFTER_WRITE_SECONDS', 5))
+    
+    # SQLite connection profile. WAL lets readers run alongside a writer and
+    # synchronous=NORMAL is safe under WAL (a power cut can lose the last
+    # commits, never corrupt the file). Negative cache_size is in KiB.
+    SQLITE_PRAGMAS = {
+        'foreign_keys': 'ON',
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'temp_store': 'MEMORY',
+    }
+    # Pooled connections for file databases, so the page cache and mmap
+    # survive between requests (0 opens a connection per request)
+    SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 5))
+    
+    # JSON document store: 'file' re-reads db.json per call, 'memory' keeps it
+    # resident, 'journal' also appends writes to db.json.log until compaction
+    JSON_DB_ENGINE = os.environ.get('JSON_DB_ENGINE', 'memory')
+    JSON_DB_COMPACT_BYTES = int(os.environ.get('JSON_DB_COMPACT_BYTES', 4 * 1024 * 1024))
+    
+    # Seconds an anonymous /public_map snapshot may be served for; local
+    # writes invalidate it immediately, this bounds other workers' writes
+    PUBLIC_MAP_CACHE_SECONDS = float(os.environ.get('PUBLIC_MAP_CACHE_SECONDS', 5))
+    
+    # JSON encoder for jsonify(): 'auto' uses orjson when it is installed,
+    # 'stdlib' forces the standard library encoder
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+    
+    # Response compression: preferred encodings ('br' needs the brotli
+    # package), smallest buffered body worth compressing, and levels
+    COMPRESS_ALGORITHMS = ('br', 'gzip')
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_QUALITY = int(os.environ.get('COMPRESS_BR_QUALITY', 4))
+    
+    # Largest array accepted by the /api/<collection>/bulk endpoints
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+    
+    # Seconds the shared /api/allocation plan may be served for; local
+    # writes invalidate it immediately, this bounds other workers' writes
+    ALLOCATION_CACHE_SECONDS = float(os.environ.get('ALLOCATION_CACHE_SECONDS', 30))
+    # Locations record no population yet; demand is sized for this many people
+    ALLOCATION_DEFAULT_POPULATION = int(os.environ.get('ALLOCATION_DEFAULT_POPULATION', 500))
+    
+    # Spatial index grid cell size, seconds before it is rebuilt to pick up
+    # other workers' writes, and caps on query radius and result count
+    SPATIAL_CELL_KM = float(os.environ.get('SPATIAL_CELL_KM', 5))
+    SPATIAL_INDEX_MAX_AGE = float(os.environ.get('SPATIAL_INDEX_MAX_AGE', 300))
+    SPATIAL_MAX_RADIUS_KM = float(os.environ.get('SPATIAL_MAX_RADIUS_KM', 200))
+    SPATIAL_MAX_RESULTS = int(os.environ.get('SPATIAL_MAX_RESULTS', 100))
+    
+    # Refill dispatch planning: default tanker size (litres), bowsers below
+    # this fraction of capacity are stops, worker processes for multi-depot
+    # plans (1 plans in the request thread), most depots per plan and most
+    # tankers per depot
+    DISPATCH_TANKER_CAPACITY = float(os.environ.get('DISPATCH_TANKER_CAPACITY', 20000))
+    DISPATCH_REFILL_THRESHOLD = float(os.environ.get('DISPATCH_REFILL_THRESHOLD', 0.5))
+    DISPATCH_WORKERS = int(os.environ.get('DISPATCH_WORKERS', 1))
+    DISPATCH_MAX_DEPOTS = int(os.environ.get('DISPATCH_MAX_DEPOTS', 20))
+    DISPATCH_MAX_TANKERS = int(os.environ.get('DISPATCH_MAX_TANKERS', 500))
+    
+    # Longest daily series /api/reports returns
+    REPORT_MAX_DAYS = int(os.environ.get('REPORT_MAX_DAYS', 366))
+    
+    # Most points one /api/bowsers/<id>/levels response may carry
+    LEVEL_MAX_POINTS = int(os.environ.get('LEVEL_MAX_POINTS', 2000))
+    
     # API Keys (if needed)
     GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY', '')
     
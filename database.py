@@ -1,12 +1,15 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
+import time
+from flask import Flask, request, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
 from flask_migrate import Migrate
 from datetime import datetime, timedelta
 import uuid
 import os
+import sqlite3
 from werkzeug.security import generate_password_hash
-from sqlalchemy import event, inspect
+from sqlalchemy import create_engine, event, inspect, orm
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from config import Config
@@ -21,130 +24,197 @@ app = Flask(__name__)
 # Use configuration from Config class
 app.config.from_object(Config)
 
+# Methods whose requests may be answered from the read engine
+READ_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+class RoutingSession(SignallingSession):
+    """Session that reads from the read engine during read-only requests.
+
+    init_read_routing() marks a request read-only through session.info.
+    Anything the session flushes goes to the primary, and so does every
+    statement after that, so a request always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing:
+            self.info['wrote'] = True
+        elif self.info.get('read_only') and not self.info.get('wrote'):
+            return self._read_engine()
+        return super().get_bind(mapper, clause)
+
+    def _read_engine(self):
+        return self.app.extensions['read_engine']
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
 # Initialize SQLAlchemy without binding to app
-db = SQLAlchemy()
+db = RoutingSQLAlchemy()
 migrate = Migrate()
 
+# PRAGMAs run on every new SQLite connection; init_db() loads the
+# application's SQLITE_PRAGMAS profile over these defaults
+sqlite_pragmas = {'foreign_keys': 'ON'}
+
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
-    """Enable foreign key constraints for SQLite"""
+    """Apply the SQLite connection profile (foreign keys, WAL, cache sizes...)"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
     cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
+    for name, value in sqlite_pragmas.items():
+        try:
+            cursor.execute(f"PRAGMA {name}={value}")
+        except sqlite3.OperationalError:
+            # The journal mode belongs to the file; a mode=ro connection
+            # cannot change it and uses whatever the primary set
+            if name != 'journal_mode':
+                raise
     cursor.close()
 
 def init_db(app):
     """Initialize database with app context"""
+    sqlite_pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    pool_size = app.config.get('SQLITE_POOL_SIZE')
+    if pool_size and uri.startswith('sqlite:///') and ':memory:' not in uri:
+        # SQLAlchemy 1.4 defaults file databases to NullPool
+        options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        options.setdefault('poolclass', QueuePool)
+        options.setdefault('pool_size', pool_size)
+        options.setdefault('connect_args', {}).setdefault('check_same_thread', False)
+    init_read_routing(app)
     db.init_app(app)
     migrate.init_app(app, db)
 
-def initialize_database(app):
-    """Initialize the database with proper error handling and security features"""
+def init_read_routing(app):
+    """Send read-only requests to SQLALCHEMY_READ_URI, when it is set.
+
+    GET/HEAD/OPTIONS requests read from the read engine unless the view is
+    decorated with use_primary or the client wrote within the last
+    READ_AFTER_WRITE_SECONDS (so a redirect after a form post shows the new
+    data even while a replica catches up). Everything else uses the primary.
+    """
+    read_uri = app.config.get('SQLALCHEMY_READ_URI')
+    if not read_uri:
+        return
+    # Kept out of SQLALCHEMY_BINDS so create_all()/drop_all() never touch it
+    app.extensions['read_engine'] = create_engine(read_uri, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    sticky_seconds = app.config.get('READ_AFTER_WRITE_SECONDS', 5)
+
+    @app.before_request
+    def route_read_only_requests():
+        view = app.view_functions.get(request.endpoint)
+        db.session.info['read_only'] = (
+            request.method in READ_METHODS
+            and not getattr(view, 'use_primary', False)
+            and session.get('_primary_until', 0) <= time.time()
+        )
+
+    @app.after_request
+    def remember_recent_write(response):
+        if db.session.info.get('wrote'):
+            session['_primary_until'] = time.time() + sticky_seconds
+        return response
+
+def use_primary(f):
+    """Mark a view whose reads must come from the primary database."""
+    f.use_primary = True
+    return f
+
+# Bump whenever the models gain tables, columns or indexes. Stored in
+# SQLite's PRAGMA user_version so the boot check is a single header read.
+SCHEMA_VERSION = 4
+
+def stored_schema_version():
+    """Return the schema version recorded in the database.
+
+    Returns 0 for a database that was never stamped and None for engines
+    other than SQLite, which are always taken through upgrade_schema().
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return None
+    return db.session.execute('PRAGMA user_version').scalar()
+
+def stamp_schema_version():
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        db.session.commit()
+
+def upgrade_schema():
+    """Create missing tables, columns and indexes, and the initial admin user.
+
+    Every step is idempotent, so this is safe on a populated database.
+    """
     try:
-        # Initialize extensions
-        init_db(app)
+        db.create_all()
+        # create_all() skips indexes on tables that already exist
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+        # Ensure the 'area' column exists in the Location table
+        inspector = inspect(db.engine)
+        cols = [col['name'] for col in inspector.get_columns('location')]
+        if 'area' not in cols:
+            db.session.execute(
+                "ALTER TABLE location ADD COLUMN area VARCHAR(20) NOT NULL DEFAULT ''"
+            )
+            db.session.commit()
+            logger.info("Added 'area' column to Location table")
+        # Ensure the 'postcode' column exists in the Location table
+        if 'postcode' not in cols:
+            db.session.execute(
+                "ALTER TABLE location ADD COLUMN postcode VARCHAR(20) NOT NULL DEFAULT ''"
+            )
+            db.session.commit()
+            logger.info("Added 'postcode' column to Location table")
+        logger.info("Database tables created successfully")
+    except SQLAlchemyError as e:
+        logger.error(f"Error creating database tables: {str(e)}")
+        raise
 
-        # Create tables
-        with app.app_context():
-            try:
-                db.create_all()
-                # Ensure the 'area' column exists in the Location table
-                inspector = inspect(db.engine)
-                cols = [col['name'] for col in inspector.get_columns('location')]
-                if 'area' not in cols:
-                    db.session.execute(
-                        "ALTER TABLE location ADD COLUMN area VARCHAR(20) NOT NULL DEFAULT ''"
-                    )
-                    db.session.commit()
-                    logger.info("Added 'area' column to Location table")
-                # Ensure the 'postcode' column exists in the Location table
-                if 'postcode' not in cols:
-                    db.session.execute(
-                        "ALTER TABLE location ADD COLUMN postcode VARCHAR(20) NOT NULL DEFAULT ''"
-                    )
-                    db.session.commit()
-                    logger.info("Added 'postcode' column to Location table")
-                logger.info("Database tables created successfully")
-            except SQLAlchemyError as e:
-                logger.error(f"Error creating database tables: {str(e)}")
-                raise
+    # Report aggregates are kept current on write; seed them from the rows
+    # already present when the table is new
+    from models.sql_models import ReportAggregate
+    if db.session.query(ReportAggregate.id).first() is None:
+        from models.report_aggregates import rebuild_report_aggregates
+        rebuild_report_aggregates()
 
-            # Create initial admin user if not exists
-            from models.sql_models import User
-            admin = User.query.filter_by(username='admin').first()
-            if not admin:
-                try:
-                    admin = User(
-                        username='admin',
-                        email='admin@example.com',
-                        role='admin'
-                    )
-                    admin.set_password(os.getenv('ADMIN_PASSWORD', 'Admin@123'))
-                    db.session.add(admin)
-                    db.session.commit()
-                    logger.info("Initial admin user created successfully")
-                except SQLAlchemyError as e:
-                    logger.error(f"Error creating admin user: {str(e)}")
-                    db.session.rollback()
-                    raise
+    # Create initial admin user if not exists
+    from models.sql_models import User
+    admin = User.query.filter_by(username='admin').first()
+    if not admin:
+        try:
+            admin = User(
+                username='admin',
+                email='admin@example.com',
+                role='admin'
+            )
+            admin.set_password(os.getenv('ADMIN_PASSWORD', 'Admin@123'))
+            db.session.add(admin)
+            db.session.commit()
+            logger.info("Initial admin user created successfully")
+        except SQLAlchemyError as e:
+            logger.error(f"Error creating admin user: {str(e)}")
+            db.session.rollback()
+            raise
 
-            # Seed sample data (for development/testing) if no bowsers exist
-            from models.sql_models import Bowser, Location, Maintenance, Deployment
-            if Bowser.query.count() == 0:
-                logger.info("Seeding sample data into database...")
-                # Sample bowsers
-                bowser1 = Bowser(
-                    id=str(uuid.uuid4()), number='BW001', capacity=5000.0,
-                    current_level=4500.0, status='active', owner='Company A'
-                )
-                bowser2 = Bowser(
-                    id=str(uuid.uuid4()), number='BW002', capacity=3000.0,
-                    current_level=2800.0, status='active', owner='Company B'
-                )
-                db.session.add_all([bowser1, bowser2])
-                # Sample locations
-                location1 = Location(
-                    id=str(uuid.uuid4()),
-                    name='Central Hospital',
-                    postcode='SW1',
-                    area='south',
-                    address='123 Main St',
-                    latitude=51.5074,
-                    longitude=-0.1278,
-                    type='hospital',
-                    status='active'
-                )
-                location2 = Location(
-                    id=str(uuid.uuid4()),
-                    name='North Community Center',
-                    postcode='N1',
-                    area='north',
-                    address='456 Park Ave',
-                    latitude=51.5204,
-                    longitude=-0.1298,
-                    type='community',
-                    status='active'
-                )
-                db.session.add_all([location1, location2])
-                db.session.commit()
-                # Sample deployments
-                deployment1 = Deployment(
-                    id=str(uuid.uuid4()), bowser_id=bowser1.id, location_id=location1.id,
-                    start_date=datetime.utcnow(), end_date=None, status='active', priority='high'
-                )
-                deployment2 = Deployment(
-                    id=str(uuid.uuid4()), bowser_id=bowser2.id, location_id=location2.id,
-                    start_date=datetime.utcnow(), end_date=None, status='active', priority='high'
-                )
-                db.session.add_all([deployment1, deployment2])
-                # Sample maintenance record
-                maintenance = Maintenance(
-                    id=str(uuid.uuid4()), bowser_id=bowser2.id, maintenance_type='routine',
-                    description='Initial check', date=datetime.utcnow(), status='completed'
-                )
-                db.session.add(maintenance)
-                db.session.commit()
-                logger.info("Sample data seeded successfully")
+    stamp_schema_version()
+
+def initialize_database(app):
+    """Make sure the database schema is current; called on every worker boot.
 
+    A database already stamped with SCHEMA_VERSION costs one PRAGMA read.
+    Sample data is never loaded here; use `flask seed-db` for that.
+    """
+    try:
+        with app.app_context():
+            version = stored_schema_version()
+            if version == SCHEMA_VERSION:
+                return
+            logger.info(f"Upgrading database schema from version {version} to {SCHEMA_VERSION}")
+            upgrade_schema()
     except Exception as e:
         logger.error(f"Database initialization failed: {str(e)}")
         raise
@@ -164,13 +234,15 @@ def initialize_database_with_sample_data(app, force_reset=False):
             # Drop all tables
             db.drop_all()
         
-        # Create all tables
-        db.create_all()
-        
-        # Check if we need to add sample data
+        # Check if we need to add sample data; decided before the upgrade,
+        # which creates the initial admin user
         from models.sql_models import User, Bowser, Location, Maintenance, Deployment, Invoice
+        seed = force_reset or not inspect(db.engine).has_table(User.__tablename__) or User.query.count() == 0
+        
+        # Create missing tables, columns and indexes and stamp the version
+        upgrade_schema()
         
-        if force_reset or User.query.count() == 0:
+        if seed:
             try:
                 # Create admin user
                 admin = User(
@@ -0,0 +1,51 @@
+"""Add indexes for the hot filter and sort columns
+
+Revision ID: 3f2c9a7d41e6
+Revises: 10b03aa3a8b8
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2c9a7d41e6'
+down_revision = '10b03aa3a8b8'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_maintenance_bowser_date', 'maintenance', ['bowser_id', 'date']),
+    ('ix_maintenance_date', 'maintenance', ['date']),
+    ('ix_deployment_bowser_status', 'deployment', ['bowser_id', 'status']),
+    ('ix_deployment_location_status', 'deployment', ['location_id', 'status']),
+    ('ix_deployment_status_priority', 'deployment', ['status', 'priority']),
+    ('ix_deployment_start_date', 'deployment', ['start_date']),
+    ('ix_invoice_issue_date_id', 'invoice', ['issue_date', 'id']),
+    ('ix_partner_name_id', 'partner', ['name', 'id']),
+    ('ix_alert_priority_created_at', 'alert', ['priority', 'created_at']),
+]
+
+
+def existing_indexes(table_name):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return {index['name'] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade():
+    # The application also creates missing indexes at boot (see
+    # database.upgrade_schema), so skip any that already exist
+    for name, table_name, columns in INDEXES:
+        existing = existing_indexes(table_name)
+        if existing is not None and name not in existing:
+            op.create_index(name, table_name, columns, unique=False)
+
+
+def downgrade():
+    for name, table_name, columns in reversed(INDEXES):
+        existing = existing_indexes(table_name)
+        if existing is not None and name in existing:
+            op.drop_index(name, table_name=table_name)
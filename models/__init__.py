@@ -3,4 +3,8 @@
 
 from .json_models import JSONDataHandler, json_handler
 from .mutual_aid_models import MutualAidScheme, MutualAidContribution
-from .sql_models import Bowser, Location, Maintenance, Deployment, Invoice, Partner
\ No newline at end of file
+from .sql_models import Bowser, Location, Maintenance, Deployment, Invoice, Partner
+from .views import BowserStatusView
+from .change_tracking import SYNC_COLLECTIONS, changes_since, full_snapshot
+from .report_aggregates import REPORT_COLLECTIONS, build_report, rebuild_report_aggregates
+from .principals import UserPrincipal, load_principal
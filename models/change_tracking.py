@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from sqlalchemy import event, func
+from database import db
+from models.sql_models import User, Bowser, Location, Deployment, Maintenance, Alert, Invoice, Partner, ChangeLog
+from utils.event_broker import change_broker
+from utils.serialization import project_rows
+
+# Collections exposed through /api/sync, keyed by the name the front end uses
+SYNC_COLLECTIONS = OrderedDict([
+    ('bowsers', Bowser),
+    ('locations', Location),
+    ('deployments', Deployment),
+    ('maintenance', Maintenance),
+    ('alerts', Alert),
+])
+# Every collection with change tracking; the extra ones only feed version stamps
+TRACKED_COLLECTIONS = OrderedDict(list(SYNC_COLLECTIONS.items()) + [
+    ('users', User),
+    ('invoices', Invoice),
+    ('partners', Partner),
+])
+_COLLECTION_BY_MODEL = {model: name for name, model in TRACKED_COLLECTIONS.items()}
+
+# SQLite's default bound-parameter limit is 999
+_IN_CHUNK_SIZE = 500
+
+@event.listens_for(db.session, 'after_flush')
+def record_changes(session, flush_context):
+    """Append a change_log row for every tracked row inserted, updated or deleted.
+
+    Runs inside the flushing transaction, so the log commits or rolls back
+    together with the change itself. The matching push events are held on
+    the session until commit.
+    """
+    changes = []
+    for obj in session.new:
+        collection = _COLLECTION_BY_MODEL.get(type(obj))
+        if collection:
+            changes.append((collection, obj, 'upsert'))
+    for obj in session.dirty:
+        collection = _COLLECTION_BY_MODEL.get(type(obj))
+        if collection and session.is_modified(obj, include_collections=False):
+            changes.append((collection, obj, 'upsert'))
+    for obj in session.deleted:
+        collection = _COLLECTION_BY_MODEL.get(type(obj))
+        if collection:
+            changes.append((collection, obj, 'delete'))
+    if not changes:
+        return
+
+    session.connection().execute(ChangeLog.__table__.insert(), [
+        {'collection': collection, 'row_id': str(obj.id), 'operation': operation}
+        for collection, obj, operation in changes
+    ])
+    session.info.setdefault('pending_change_events', []).extend(
+        {
+            'collection': collection,
+            'operation': operation,
+            'id': obj.id,
+            'row': obj.to_dict() if operation == 'upsert' else None
+        }
+        for collection, obj, operation in changes
+        if collection in SYNC_COLLECTIONS
+    )
+
+@event.listens_for(db.session, 'after_commit')
+def publish_changes(session):
+    """Push the committed changes to in-process subscribers (see /api/stream)."""
+    for change in session.info.pop('pending_change_events', []):
+        change_broker.publish(change['collection'], change)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_changes(session):
+    session.info.pop('pending_change_events', None)
+
+def current_version():
+    """Return the latest change version (0 when nothing has changed yet)."""
+    return db.session.query(func.max(ChangeLog.version)).scalar() or 0
+
+def collection_stamps(collections):
+    """Return {collection: (latest version, latest change time)} in one query.
+
+    Collections that have never changed map to (0, None).
+    """
+    stamps = {name: (0, None) for name in collections}
+    rows = db.session.query(
+        ChangeLog.collection,
+        func.max(ChangeLog.version),
+        func.max(ChangeLog.changed_at)
+    ).filter(ChangeLog.collection.in_(list(collections))).group_by(ChangeLog.collection)
+    for collection, version, changed_at in rows:
+        stamps[collection] = (version, changed_at)
+    return stamps
+
+def full_snapshot():
+    """Return every row of every synced collection with the current version."""
+    version = current_version()
+    return {
+        'version': version,
+        'full': True,
+        'collections': {
+            name: {'upserted': project_rows(model), 'deleted': []}
+            for name, model in SYNC_COLLECTIONS.items()
+        }
+    }
+
+def changes_since(since):
+    """Return the rows inserted, updated or deleted after change version `since`.
+
+    Each row appears once with its latest state. A `since` ahead of the
+    current version (for example after a database reset) yields a full
+    snapshot so the client can rebuild from scratch.
+    """
+    version = current_version()
+    if since > version:
+        return full_snapshot()
+
+    latest = OrderedDict()
+    # A primary-key range read comes back in version order without a sort;
+    # rows of collections that are not synced are skipped below
+    entries = db.session.query(ChangeLog.collection, ChangeLog.row_id, ChangeLog.operation).filter(
+        ChangeLog.version > since,
+        ChangeLog.version <= version
+    ).order_by(ChangeLog.version)
+    for collection, row_id, operation in entries:
+        latest.pop((collection, row_id), None)
+        latest[(collection, row_id)] = operation
+
+    collections = {name: {'upserted': [], 'deleted': []} for name in SYNC_COLLECTIONS}
+    upserted_ids = {}
+    for (collection, row_id), operation in latest.items():
+        if collection not in collections:
+            continue
+        if operation == 'delete':
+            collections[collection]['deleted'].append(row_id)
+        else:
+            upserted_ids.setdefault(collection, []).append(row_id)
+
+    for collection, ids in upserted_ids.items():
+        model = SYNC_COLLECTIONS[collection]
+        found = set()
+        for start in range(0, len(ids), _IN_CHUNK_SIZE):
+            for row in project_rows(model, model.id.in_(ids[start:start + _IN_CHUNK_SIZE])):
+                found.add(row['id'])
+                collections[collection]['upserted'].append(row)
+        # Rows removed after `version` was read are reported as deleted
+        collections[collection]['deleted'].extend(row_id for row_id in ids if row_id not in found)
+
+    return {'version': version, 'full': False, 'collections': collections}
@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 import uuid
 from typing import Optional
+from utils.json_handler import select_documents
 
 class JSONDataHandler:
     def __init__(self, json_file_path):
@@ -83,22 +84,12 @@ class JSONDataHandler:
         self.save_data()
         return True
 
-    def query(self, model_name, filters=None):
-        """Query records with filters"""
+    def query(self, model_name, filters=None, order_by=None, descending=False, limit=None):
+        """Query records with filters (exact values or operator dicts such as {'$in': [...]})"""
         items = self.data.get(model_name, [])
-        if not filters:
+        if not filters and not order_by and limit is None:
             return items
-
-        results = []
-        for item in items:
-            matches = True
-            for key, value in filters.items():
-                if key not in item or item[key] != value:
-                    matches = False
-                    break
-            if matches:
-                results.append(item)
-        return results
+        return select_documents(items, filters, order_by, descending, limit)
 
 class Bowser:
     id: str
@@ -0,0 +1,76 @@
+from datetime import datetime
+from itertools import chain
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from database import db
+from models.sql_models import User
+
+class UserPrincipal(UserMixin):
+    """Detached, read-only view of a signed-in user, used as current_user.
+
+    Holds only what authentication and role checks need, so it can be
+    cached across requests; load the User row for anything else.
+    """
+
+    __slots__ = ('id', 'username', 'role', 'account_locked_until')
+
+    def __init__(self, id, username, role, account_locked_until):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.account_locked_until = account_locked_until
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_staff(self):
+        return self.role == 'staff'
+
+    @property
+    def is_locked(self):
+        return bool(self.account_locked_until and datetime.utcnow() < self.account_locked_until)
+
+    def __repr__(self):
+        return f'<UserPrincipal {self.username} ({self.role})>'
+
+def _user_cache():
+    return current_app.extensions.get('user_cache') if has_app_context() else None
+
+def _query_principal(user_id):
+    row = db.session.query(User.id, User.username, User.role, User.account_locked_until).filter(
+        User.id == user_id
+    ).first()
+    return UserPrincipal(*row) if row else None
+
+def load_principal(user_id):
+    """Return the UserPrincipal for `user_id` (None if the user is gone).
+
+    Served from the app's user cache when one is configured, so most
+    authenticated requests need no user query.
+    """
+    cache = _user_cache()
+    if cache is None:
+        return _query_principal(user_id)
+    return cache.get_or_load(user_id, lambda: _query_principal(user_id))
+
+@event.listens_for(db.session, 'after_flush')
+def collect_changed_users(session, flush_context):
+    """Remember users created, edited or deleted (lockouts included) in this transaction."""
+    changed = {obj.id for obj in chain(session.new, session.dirty, session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault('changed_user_ids', set()).update(changed)
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_changed_users(session):
+    changed = session.info.pop('changed_user_ids', None)
+    cache = _user_cache()
+    if changed and cache is not None:
+        for user_id in changed:
+            cache.pop(user_id)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
@@ -0,0 +1,372 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import event, func, inspect, select, distinct, case, or_, and_, bindparam
+from database import db
+from models.sql_models import Bowser, Location, Deployment, Maintenance, ReportAggregate
+from utils.allocation import location_category
+
+# Current-state gauges per area and location type
+AREA_GAUGES = ('active_deployments', 'locations_served', 'water_supplied')
+# Counters per day (and, for deployments, area and location type)
+DEPLOYMENT_DAILY = ('deployments_started',)
+MAINTENANCE_DAILY = ('maintenance_records', 'maintenance_completed')
+# Collections the reports are computed from
+REPORT_COLLECTIONS = ('bowsers', 'locations', 'deployments', 'maintenance')
+# Day ranges refreshed per statement (two bound parameters each)
+_RANGES_PER_STATEMENT = 200
+
+_IN_CHUNK_SIZE = 500
+_table = ReportAggregate.__table__
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        yield values[start:start + _IN_CHUNK_SIZE]
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        return date.fromisoformat(value[:10])
+    return None
+
+def _values(obj, name):
+    """The attribute's value and, when this flush changed it, its previous one."""
+    history = inspect(obj).attrs[name].history
+    return {value for value in (*history.added, *history.unchanged, *history.deleted) if value is not None}
+
+def _old(obj, name):
+    """The attribute's value before this flush."""
+    history = inspect(obj).attrs[name].history
+    values = history.deleted or history.unchanged
+    return values[0] if values else None
+
+def _new(obj, name):
+    history = inspect(obj).attrs[name].history
+    values = history.added or history.unchanged
+    return values[0] if values else None
+
+def _before_after(obj, change, names):
+    """(old values, new values) of `names`; None for the side that does not exist."""
+    before = None if change == 'new' else tuple(_old(obj, name) for name in names)
+    after = None if change == 'deleted' else tuple(_new(obj, name) for name in names)
+    return (None, None) if before == after else (before, after)
+
+def _changed(obj, names):
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in names)
+
+def _day_ranges(days):
+    """Merge days into [start, end) ranges of consecutive days."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return ranges
+
+def _in_ranges(column, ranges):
+    """`column` falls in any of the [start, end) day ranges; each term can use an index."""
+    return or_(*(and_(column >= datetime.combine(start, time.min), column < datetime.combine(end, time.min))
+                 for start, end in ranges))
+
+def _bowser_gauge_rows(conn):
+    query = select(Bowser.status, func.count(Bowser.id)).group_by(Bowser.status)
+    return [{'metric': 'bowsers', 'day': None, 'area': '', 'dimension': status, 'value': count}
+            for status, count in conn.execute(query)]
+
+def _area_gauge_rows(conn, areas=None):
+    query = select(
+        Location.area, Location.type, func.count(Deployment.id), func.count(distinct(Location.id)),
+        func.coalesce(func.sum(Bowser.capacity - Bowser.current_level), 0)
+    ).select_from(Deployment).join(
+        Location, Location.id == Deployment.location_id
+    ).join(
+        Bowser, Bowser.id == Deployment.bowser_id
+    ).where(Deployment.status == 'active').group_by(Location.area, Location.type)
+    if areas is not None:
+        query = query.where(Location.area.in_(areas))
+    rows = []
+    for area, location_type, deployments, locations, water in conn.execute(query):
+        for metric, value in zip(AREA_GAUGES, (deployments, locations, water)):
+            rows.append({'metric': metric, 'day': None, 'area': area, 'dimension': location_type, 'value': value})
+    return rows
+
+def _deployment_daily_rows(conn, ranges=None):
+    day = func.date(Deployment.start_date)
+    query = select(day, Location.area, Location.type, func.count(Deployment.id)).select_from(Deployment).join(
+        Location, Location.id == Deployment.location_id
+    ).group_by(day, Location.area, Location.type)
+    if ranges is not None:
+        query = query.where(_in_ranges(Deployment.start_date, ranges))
+    return [{'metric': 'deployments_started', 'day': _as_date(started), 'area': area,
+             'dimension': location_type, 'value': count}
+            for started, area, location_type, count in conn.execute(query)]
+
+def _maintenance_daily_rows(conn, ranges=None):
+    day = func.date(Maintenance.date)
+    query = select(
+        day, Maintenance.maintenance_type, func.count(Maintenance.id),
+        func.sum(case((Maintenance.status == 'completed', 1), else_=0))
+    ).group_by(day, Maintenance.maintenance_type)
+    if ranges is not None:
+        query = query.where(_in_ranges(Maintenance.date, ranges))
+    rows = []
+    for scheduled, maintenance_type, records, completed in conn.execute(query):
+        for metric, value in zip(MAINTENANCE_DAILY, (records, completed)):
+            if not value:
+                # Counters at zero have no row, as in _apply_deltas()
+                continue
+            rows.append({'metric': metric, 'day': _as_date(scheduled), 'area': '',
+                         'dimension': maintenance_type, 'value': value})
+    return rows
+
+def _replace(conn, condition, rows):
+    conn.execute(_table.delete().where(condition))
+    if rows:
+        conn.execute(_table.insert(), rows)
+
+def _refresh_daily(conn, metrics, build_rows, days):
+    ranges = _day_ranges(days)
+    for first in range(0, len(ranges), _RANGES_PER_STATEMENT):
+        chunk = ranges[first:first + _RANGES_PER_STATEMENT]
+        days_in_chunk = or_(*((_table.c.day >= start) & (_table.c.day < end) for start, end in chunk))
+        _replace(conn, _table.c.metric.in_(metrics) & days_in_chunk, build_rows(conn, chunk))
+
+def _apply_deltas(conn, deltas):
+    """Add {(metric, day, area, dimension): delta} onto the daily counters.
+
+    Counters that drop to zero are deleted, so a type or area whose last
+    row went away disappears from the report as it would after a rebuild.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    metrics = {key[0] for key in deltas}
+    existing = {}
+    for days in _chunks({key[1] for key in deltas}):
+        query = select(_table.c.id, _table.c.metric, _table.c.day, _table.c.area, _table.c.dimension).where(
+            _table.c.metric.in_(metrics), _table.c.day.in_(days)
+        )
+        for row_id, *key in conn.execute(query):
+            existing[tuple(key)] = row_id
+    updates = [{'row_id': existing[key], 'delta': delta} for key, delta in deltas.items() if key in existing]
+    if updates:
+        conn.execute(_table.update().where(_table.c.id == bindparam('row_id')).values(
+            value=_table.c.value + bindparam('delta')
+        ), updates)
+        for ids in _chunks(update['row_id'] for update in updates if update['delta'] < 0):
+            conn.execute(_table.delete().where(_table.c.id.in_(ids), _table.c.value == 0))
+    inserts = [{'metric': metric, 'day': day, 'area': area, 'dimension': dimension, 'value': delta}
+               for (metric, day, area, dimension), delta in deltas.items() if (metric, day, area, dimension) not in existing]
+    if inserts:
+        conn.execute(_table.insert(), inserts)
+
+def _keep_previous(target, value, oldvalue, initiator):
+    return value
+
+# Load the old value when one of these is set on an expired instance, so
+# the flush hook can take the row out of the key it used to count under
+for _attribute in (Maintenance.date, Maintenance.status, Maintenance.maintenance_type,
+                   Deployment.start_date, Deployment.location_id, Deployment.status, Deployment.bowser_id,
+                   Location.area, Location.type, Bowser.status, Bowser.capacity, Bowser.current_level):
+    event.listen(_attribute, 'set', _keep_previous, active_history=True)
+
+@event.listens_for(db.session, 'after_flush')
+def refresh_aggregates(session, flush_context):
+    """Bring the report aggregates up to date with a flush.
+
+    Daily counters take deltas: each changed row is subtracted from the key
+    it was counted under and added to its new one. Gauges are recomputed
+    for the areas whose active deployments changed, which touches only the
+    active set. It runs in the flushing transaction, like the change log,
+    so the aggregates commit or roll back with the rows.
+    """
+    bowser_statuses = False
+    areas, bowser_ids, location_ids, moved_location_ids = set(), set(), set(), set()
+    maintenance_changes, deployment_changes = [], []
+    changed = [(obj, 'new') for obj in session.new] + [(obj, 'deleted') for obj in session.deleted]
+    changed += [(obj, 'dirty') for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    for obj, change in changed:
+        if isinstance(obj, Bowser):
+            bowser_statuses = bowser_statuses or change != 'dirty' or _changed(obj, ('status',))
+            if change != 'dirty' or _changed(obj, ('capacity', 'current_level', 'status')):
+                bowser_ids.add(obj.id)
+        elif isinstance(obj, Location):
+            if change != 'dirty' or _changed(obj, ('area', 'type')):
+                areas |= _values(obj, 'area')
+                if change == 'dirty':
+                    moved_location_ids.add(obj.id)
+        elif isinstance(obj, Deployment):
+            if change != 'dirty' or _changed(obj, ('status', 'location_id', 'bowser_id')):
+                location_ids |= _values(obj, 'location_id')
+            if change != 'dirty' or _changed(obj, ('start_date', 'location_id')):
+                deployment_changes.append(_before_after(obj, change, ('start_date', 'location_id')))
+        elif isinstance(obj, Maintenance):
+            if change != 'dirty' or _changed(obj, ('date', 'status', 'maintenance_type')):
+                maintenance_changes.append(_before_after(obj, change, ('date', 'maintenance_type', 'status')))
+    if not (bowser_statuses or areas or bowser_ids or location_ids or deployment_changes or maintenance_changes):
+        return
+
+    conn = session.connection()
+    deltas = defaultdict(float)
+    for states in maintenance_changes:
+        for state, sign in zip(states, (-1, 1)):
+            if state and _as_date(state[0]):
+                deltas[('maintenance_records', _as_date(state[0]), '', state[1])] += sign
+                if state[2] == 'completed':
+                    deltas[('maintenance_completed', _as_date(state[0]), '', state[1])] += sign
+
+    # Deployments count under their location's area and type
+    places = {}
+    for ids in _chunks({state[1] for states in deployment_changes for state in states if state}):
+        places.update((location_id, (area, location_type)) for location_id, area, location_type in conn.execute(
+            select(Location.id, Location.area, Location.type).where(Location.id.in_(ids))
+        ))
+    for obj in session.deleted:
+        if isinstance(obj, Location):
+            places.setdefault(obj.id, (_old(obj, 'area'), _old(obj, 'type')))
+    deployment_days = set()
+    for states in deployment_changes:
+        for state, sign in zip(states, (-1, 1)):
+            if state and _as_date(state[0]) and state[1] in places:
+                area, location_type = places[state[1]]
+                deltas[('deployments_started', _as_date(state[0]), area, location_type)] += sign
+                deployment_days.add(_as_date(state[0]))
+    _apply_deltas(conn, deltas)
+
+    for ids in _chunks(location_ids):
+        areas.update(conn.execute(select(distinct(Location.area)).where(Location.id.in_(ids))).scalars())
+    for ids in _chunks(bowser_ids):
+        areas.update(conn.execute(
+            select(distinct(Location.area)).select_from(Deployment).join(Location, Location.id == Deployment.location_id)
+            .where(Deployment.bowser_id.in_(ids), Deployment.status == 'active')
+        ).scalars())
+    if bowser_statuses:
+        _replace(conn, _table.c.metric == 'bowsers', _bowser_gauge_rows(conn))
+    for chunk in _chunks(areas):
+        _replace(conn, _table.c.metric.in_(AREA_GAUGES) & _table.c.day.is_(None) & _table.c.area.in_(chunk),
+                 _area_gauge_rows(conn, chunk))
+
+    # A location changing area or type moves every deployment it ever had
+    # to another key; those days (and the ones just adjusted, whose deltas
+    # may have used the new key) are recounted
+    if moved_location_ids:
+        for ids in _chunks(moved_location_ids):
+            deployment_days.update(_as_date(day) for day in conn.execute(
+                select(distinct(func.date(Deployment.start_date))).where(Deployment.location_id.in_(ids))
+            ).scalars())
+        _refresh_daily(conn, DEPLOYMENT_DAILY, _deployment_daily_rows, deployment_days)
+
+def rebuild_report_aggregates():
+    """Recompute every aggregate from the base tables and commit.
+
+    For new databases and for rows written around the ORM (raw SQL or
+    Core inserts), which the flush hook does not see.
+    """
+    conn = db.session.connection()
+    conn.execute(_table.delete())
+    rows = (_bowser_gauge_rows(conn) + _area_gauge_rows(conn)
+            + _deployment_daily_rows(conn) + _maintenance_daily_rows(conn))
+    if rows:
+        conn.execute(_table.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+def _tidy(value):
+    """Turn the float sums back into ints where they are whole (counts, litres)."""
+    if isinstance(value, dict):
+        return {key: _tidy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_tidy(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def build_report(days=30, area=None, today=None):
+    """Assemble /api/reports from the aggregates.
+
+    Reads only summary rows (areas x location types for the gauges, days x
+    types for the counters), so its cost does not grow with the number of
+    deployments or maintenance records. `area` narrows the deployment
+    figures to one area; maintenance is not area-specific.
+    """
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+
+    bowsers = defaultdict(float)
+    gauges = defaultdict(lambda: defaultdict(lambda: dict.fromkeys(AREA_GAUGES, 0.0)))
+    query = db.session.query(ReportAggregate.metric, ReportAggregate.area, ReportAggregate.dimension,
+                             ReportAggregate.value).filter(ReportAggregate.day.is_(None))
+    for metric, row_area, dimension, value in query:
+        if metric == 'bowsers':
+            bowsers[dimension] += value
+        elif area is None or row_area == area:
+            gauges[row_area][dimension][metric] += value
+
+    totals = dict.fromkeys(AREA_GAUGES, 0.0)
+    by_type = defaultdict(lambda: dict.fromkeys(AREA_GAUGES, 0.0))
+    by_category = defaultdict(lambda: dict.fromkeys(AREA_GAUGES, 0.0))
+    areas = []
+    for row_area, types in sorted(gauges.items()):
+        area_totals = dict.fromkeys(AREA_GAUGES, 0.0)
+        area_categories = defaultdict(lambda: dict.fromkeys(AREA_GAUGES, 0.0))
+        for location_type, values in types.items():
+            for metric, value in values.items():
+                for bucket in (totals, area_totals, by_type[location_type],
+                               by_category[location_category(location_type)],
+                               area_categories[location_category(location_type)]):
+                    bucket[metric] += value
+        areas.append(dict(area_totals, area=row_area, by_category=dict(area_categories)))
+
+    maintenance = defaultdict(lambda: {'records': 0.0, 'completed': 0.0})
+    query = db.session.query(ReportAggregate.dimension, ReportAggregate.metric, func.sum(ReportAggregate.value)).filter(
+        ReportAggregate.metric.in_(MAINTENANCE_DAILY)
+    ).group_by(ReportAggregate.dimension, ReportAggregate.metric)
+    for maintenance_type, metric, value in query:
+        maintenance[maintenance_type]['records' if metric == 'maintenance_records' else 'completed'] += value
+    records = sum(entry['records'] for entry in maintenance.values())
+    completed = sum(entry['completed'] for entry in maintenance.values())
+
+    daily = {start + timedelta(days=offset): {'deployments_started': 0.0, 'maintenance_records': 0.0,
+                                               'maintenance_completed': 0.0}
+             for offset in range(days)}
+    query = db.session.query(ReportAggregate.day, ReportAggregate.metric, func.sum(ReportAggregate.value)).filter(
+        ReportAggregate.metric.in_(DEPLOYMENT_DAILY + MAINTENANCE_DAILY),
+        ReportAggregate.day >= start,
+        ReportAggregate.day <= today
+    )
+    if area is not None:
+        query = query.filter((ReportAggregate.area == area) | ReportAggregate.metric.in_(MAINTENANCE_DAILY))
+    for day, metric, value in query.group_by(ReportAggregate.day, ReportAggregate.metric):
+        if day in daily:
+            daily[day][metric] += value
+
+    return _tidy({
+        'generated_at': datetime.utcnow().isoformat(),
+        'range': {'start': start.isoformat(), 'end': today.isoformat(), 'days': days},
+        'area': area,
+        'bowsers': {
+            'total': sum(bowsers.values()),
+            'active': bowsers.get('active', 0.0),
+            'by_status': dict(bowsers),
+        },
+        'deployments': {
+            'active': totals['active_deployments'],
+            'by_location_type': {name: values['active_deployments'] for name, values in by_type.items()},
+            'by_category': {name: values['active_deployments'] for name, values in by_category.items()},
+        },
+        'locations_served': totals['locations_served'],
+        'water_supplied': totals['water_supplied'],
+        'maintenance': {
+            'records': records,
+            'completed': completed,
+            'completion_rate': round(completed / records * 100, 1) if records else 0.0,
+            'by_type': dict(maintenance),
+        },
+        'areas': areas,
+        'daily': [dict(values, date=day.isoformat()) for day, values in sorted(daily.items())],
+    })
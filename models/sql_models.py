@@ -4,8 +4,12 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 import re
 from flask import current_app
+from sqlalchemy import bindparam
 
 class User(UserMixin, db.Model):
+    # Columns never exposed through API field projections
+    api_hidden_fields = ('password_hash',)
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -68,25 +72,62 @@ class User(UserMixin, db.Model):
         self.password_hash = password
 
     def check_password(self, password):
-        """Check password and handle failed attempts"""
+        """Check password and handle failed attempts.
+
+        Nothing is committed here: failed-attempt and lockout changes stay in
+        the session for the caller's single commit, a successful check only
+        touches the row when there are counters to reset, and last_login
+        goes through the write-behind buffer (see record_last_login).
+        """
         if self.account_locked_until and datetime.utcnow() < self.account_locked_until:
             return False
             
         is_correct = (self.password_hash == password)
         
         if is_correct:
-            self.failed_login_attempts = 0
-            self.account_locked_until = None
-            self.last_login = datetime.utcnow()
-            db.session.commit()
+            if self.failed_login_attempts or self.account_locked_until:
+                self.failed_login_attempts = 0
+                self.account_locked_until = None
+            self.record_last_login()
         else:
-            self.failed_login_attempts += 1
+            self.failed_login_attempts = (self.failed_login_attempts or 0) + 1
             if self.failed_login_attempts >= 5:
                 self.account_locked_until = datetime.utcnow() + timedelta(minutes=30)
-            db.session.commit()
             
         return is_correct
 
+    def record_last_login(self, when=None):
+        """Queue a last_login update, or set it directly without a buffer.
+
+        Buffered values reach the database (and to_dict()) within
+        LAST_LOGIN_FLUSH_SECONDS.
+        """
+        when = when or datetime.utcnow()
+        writer = current_app.extensions.get('last_login_writer')
+        if writer is None:
+            self.last_login = when
+        else:
+            writer.put(self.id, when)
+
+    @staticmethod
+    def write_last_logins(pending):
+        """Flush {user id: last_login} from the write-behind buffer in one transaction.
+
+        The Core UPDATE bypasses the session's after_flush change tracking,
+        so the 'users' change_log rows are written here; otherwise the
+        /api/users version stamp would not move.
+        """
+        users = User.__table__
+        db.session.execute(
+            users.update().where(users.c.id == bindparam('user_id')).values(last_login=bindparam('when')),
+            [{'user_id': user_id, 'when': when} for user_id, when in pending.items()]
+        )
+        db.session.execute(ChangeLog.__table__.insert(), [
+            {'collection': 'users', 'row_id': str(user_id), 'operation': 'upsert'}
+            for user_id in pending
+        ])
+        db.session.commit()
+
     def __repr__(self):
         return f'<User {self.username} ({self.role})>'
 
@@ -147,6 +188,12 @@ class Location(db.Model):
                 setattr(self, key, value)
 
 class Maintenance(db.Model):
+    __table_args__ = (
+        # Per-bowser history and the maintenance page's newest-first list
+        db.Index('ix_maintenance_bowser_date', 'bowser_id', 'date'),
+        db.Index('ix_maintenance_date', 'date'),
+    )
+
     id = db.Column(db.String(36), primary_key=True)
     bowser_id = db.Column(db.String(36), db.ForeignKey('bowser.id'), nullable=False)
     maintenance_type = db.Column(db.String(50), nullable=False)
@@ -174,6 +221,16 @@ class Maintenance(db.Model):
                 setattr(self, key, value)
 
 class Deployment(db.Model):
+    __table_args__ = (
+        # Active deployment per bowser (BowserStatusView join)
+        db.Index('ix_deployment_bowser_status', 'bowser_id', 'status'),
+        # Deployments at a location (foreign key lookups)
+        db.Index('ix_deployment_location_status', 'location_id', 'status'),
+        # Status filters, e.g. active by priority on the emergency page
+        db.Index('ix_deployment_status_priority', 'status', 'priority'),
+        db.Index('ix_deployment_start_date', 'start_date'),
+    )
+
     id = db.Column(db.String(36), primary_key=True)
     bowser_id = db.Column(db.String(36), db.ForeignKey('bowser.id'), nullable=False)
     location_id = db.Column(db.String(36), db.ForeignKey('location.id'), nullable=False)
@@ -201,6 +258,11 @@ class Deployment(db.Model):
                 setattr(self, key, value)
 
 class Invoice(db.Model):
+    __table_args__ = (
+        # Newest-first listing and its keyset cursor (issue_date, id)
+        db.Index('ix_invoice_issue_date_id', 'issue_date', 'id'),
+    )
+
     id = db.Column(db.String(36), primary_key=True)
     invoice_number = db.Column(db.String(50), unique=True, nullable=False)
     client_name = db.Column(db.String(100), nullable=False)
@@ -228,6 +290,11 @@ class Invoice(db.Model):
                 setattr(self, key, value)
 
 class Partner(db.Model):
+    __table_args__ = (
+        # Keyset cursor for /api/partners (name, id)
+        db.Index('ix_partner_name_id', 'name', 'id'),
+    )
+
     id = db.Column(db.String(36), primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     contact_person = db.Column(db.String(100), nullable=False)
@@ -253,6 +320,11 @@ class Partner(db.Model):
                 setattr(self, key, value)
 
 class Alert(db.Model):
+    __table_args__ = (
+        # High-priority alerts newest first (public map)
+        db.Index('ix_alert_priority_created_at', 'priority', 'created_at'),
+    )
+
     id = db.Column(db.String(36), primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     message = db.Column(db.Text, nullable=False)
@@ -301,4 +373,77 @@ class Scheme(db.Model):
             'status': self.status,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        } 
\ No newline at end of file
+        }
+
+class ChangeLog(db.Model):
+    """Monotonic log of row changes to the synced tables, read by /api/sync."""
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.Index('ix_change_log_collection_version', 'collection', 'version'),
+    )
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    collection = db.Column(db.String(50), nullable=False)
+    row_id = db.Column(db.String(36), nullable=False)
+    operation = db.Column(db.String(10), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'collection': self.collection,
+            'row_id': self.row_id,
+            'operation': self.operation,
+            'changed_at': self.changed_at.isoformat()
+        }
+
+class ReportAggregate(db.Model):
+    """Materialized reporting metric, maintained by models.report_aggregates.
+
+    Current-state gauges have no day; daily counters carry the day they
+    count. `dimension` is the breakdown value (bowser status, location
+    type or maintenance type).
+    """
+    __tablename__ = 'report_aggregate'
+    __table_args__ = (
+        db.Index('ix_report_aggregate_metric_day_area', 'metric', 'day', 'area'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    metric = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.Date, nullable=True)
+    area = db.Column(db.String(20), nullable=False, default='')
+    dimension = db.Column(db.String(50), nullable=False, default='')
+    value = db.Column(db.Float, nullable=False, default=0)
+
+class LevelReading(db.Model):
+    """One water-level reading from a bowser; append-only."""
+    __tablename__ = 'level_reading'
+    __table_args__ = (
+        db.Index('ix_level_reading_bowser_recorded_at', 'bowser_id', 'recorded_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    bowser_id = db.Column(db.String(36), db.ForeignKey('bowser.id'), nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False)
+    level = db.Column(db.Float, nullable=False)
+
+class LevelRollup(db.Model):
+    """Level readings of one bowser summarised over a fixed time bucket.
+
+    Maintained by utils.level_series for each of its RESOLUTIONS; every
+    field merges, so late readings fold into an existing bucket.
+    """
+    __tablename__ = 'level_rollup'
+
+    bowser_id = db.Column(db.String(36), db.ForeignKey('bowser.id'), primary_key=True)
+    resolution = db.Column(db.Integer, primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+    total = db.Column(db.Float, nullable=False)
+    minimum = db.Column(db.Float, nullable=False)
+    maximum = db.Column(db.Float, nullable=False)
+    first_at = db.Column(db.DateTime, nullable=False)
+    first_level = db.Column(db.Float, nullable=False)
+    last_at = db.Column(db.DateTime, nullable=False)
+    last_level = db.Column(db.Float, nullable=False)
@@ -0,0 +1,76 @@
+from sqlalchemy import and_
+from database import db
+from models.sql_models import Bowser, Deployment, Location
+
+class BowserStatusView:
+    """Read-only projection of a bowser, its active deployment and location name.
+
+    Built from a single joined SELECT so callers no longer issue a deployment
+    and location lookup per bowser.
+    """
+    __slots__ = ('id', 'number', 'capacity', 'current_level', 'status',
+                 'deployment_id', 'location_id', 'current_location')
+
+    def __init__(self, id, number, capacity, current_level, status,
+                 deployment_id=None, location_id=None, current_location=None):
+        self.id = id
+        self.number = number
+        self.capacity = capacity
+        self.current_level = current_level
+        self.status = status
+        self.deployment_id = deployment_id
+        self.location_id = location_id
+        self.current_location = current_location
+
+    @staticmethod
+    def query():
+        """Build the joined bowser/active deployment/location query."""
+        return db.session.query(
+            Bowser.id,
+            Bowser.number,
+            Bowser.capacity,
+            Bowser.current_level,
+            Bowser.status,
+            Deployment.id,
+            Location.id,
+            Location.name
+        ).outerjoin(
+            Deployment,
+            and_(Deployment.bowser_id == Bowser.id, Deployment.status == 'active')
+        ).outerjoin(
+            Location, Location.id == Deployment.location_id
+        ).order_by(Bowser.number)
+
+    @classmethod
+    def all(cls):
+        """Return one view per bowser, keeping the first active deployment found."""
+        views = {}
+        for row in cls.query():
+            if row[0] not in views:
+                views[row[0]] = cls(*row)
+        return list(views.values())
+
+    @classmethod
+    def status_map(cls):
+        """Return the bowser_status mapping used by the dashboard templates."""
+        return {
+            view.id: {
+                'number': view.number,
+                'capacity': view.capacity,
+                'status': view.status,
+                'current_location': view.current_location
+            }
+            for view in cls.all()
+        }
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'number': self.number,
+            'capacity': self.capacity,
+            'current_level': self.current_level,
+            'status': self.status,
+            'deployment_id': self.deployment_id,
+            'location_id': self.location_id,
+            'current_location': self.current_location
+        }
@@ -1,14 +1,34 @@
-from flask import Blueprint, jsonify, request, current_app, session
+from flask import Blueprint, jsonify, request, current_app, session, Response, stream_with_context
 from flask_login import current_user, login_required
 from functools import wraps
 from models.sql_models import User, Bowser, Location, Maintenance, Deployment, Invoice, Partner, Alert
+from models.views import BowserStatusView
+from models.change_tracking import SYNC_COLLECTIONS, changes_since, full_snapshot
+from models.report_aggregates import build_report
 from database import db
-from datetime import datetime
+from utils.pagination import paginate, parse_fields
+from utils.allocation import ALLOCATION_COLLECTIONS, build_allocation_plan, is_business_hours
+from utils.export import EXPORT_COLLECTIONS, ADMIN_EXPORT_COLLECTIONS, EXPORT_FORMATS, ndjson_chunks, csv_chunks
+from utils.bulk import BULK_COLLECTIONS, bulk_create, bulk_update, bulk_delete
+from utils.spatial import SPATIAL_COLLECTIONS
+from utils import dispatch
+from utils.json_provider import dumps_compact
+from utils.level_series import RESOLUTION_NAMES, ingest_readings, level_series, parse_timestamp
+from utils.event_broker import change_broker
+from utils.http_cache import conditional_get
+from datetime import datetime, timedelta
+import json
 import logging
+import queue
 
 api_blueprint = Blueprint('api', __name__)
 logger = logging.getLogger(__name__)
 
+# Collections pushed over /api/stream when ?collections= is not given
+STREAM_DEFAULT_COLLECTIONS = ('bowsers', 'deployments', 'alerts')
+# Seconds between keep-alive comments on an idle event stream
+STREAM_KEEPALIVE_SECONDS = 15
+
 def api_login_required(f):
     """Decorator to handle API authentication."""
     @wraps(f)
@@ -41,15 +61,27 @@ def api_staff_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def success_response(data=None, message=None):
+def success_response(data=None, message=None, **extra):
     """Helper function to create a success response."""
     response = {'status': 'success'}
     if data is not None:
         response['data'] = data
     if message is not None:
         response['message'] = message
+    response.update(extra)
     return jsonify(response), 200
 
+def page_response(page, message):
+    """Helper function to create a success response for a keyset page."""
+    response, status_code = success_response(
+        data=page.items,
+        message=message,
+        next_cursor=page.next_cursor
+    )
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    return response, status_code
+
 def error_response(message, status_code=400):
     """Helper function to create an error response."""
     return jsonify({
@@ -100,27 +132,98 @@ def handle_method_not_allowed(e):
 @api_blueprint.before_request
 def before_request():
     """Ensure user session is valid and update last seen."""
-    if current_user.is_authenticated:
+    if current_user.is_authenticated and not session.permanent:
         session.permanent = True
-        session.modified = True
     if not request.is_json and request.method != 'GET':
         return error_response('Content-Type must be application/json')
 
 # Bowser routes
 @api_blueprint.route('/bowsers', methods=['GET'])
 @handle_api_error
+@conditional_get('bowsers')
 def get_bowsers():
-    """Get all bowsers."""
+    """Get bowsers, optionally paged with ?limit=&after= and projected with ?fields=."""
     try:
-        bowsers = Bowser.query.all()
-        return success_response(
-            data=[bowser.to_dict() for bowser in bowsers],
-            message="Bowsers retrieved successfully"
-        )
+        return page_response(paginate(Bowser), "Bowsers retrieved successfully")
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         logger.error(f"Error retrieving bowsers: {str(e)}")
         return error_response(f"Error retrieving bowsers: {str(e)}", 500)
 
+# Sync route
+@api_blueprint.route('/sync', methods=['GET'])
+@handle_api_error
+def sync():
+    """Get changes since ?since=<version>, or a full snapshot when it is omitted."""
+    since = request.args.get('since')
+    try:
+        if since is None:
+            changes = full_snapshot()
+        else:
+            try:
+                since = int(since)
+            except ValueError:
+                return error_response('since must be an integer version')
+            changes = changes_since(since)
+        return success_response(data=changes, message="Changes retrieved successfully")
+    except Exception as e:
+        logger.error(f"Error retrieving changes: {str(e)}")
+        return error_response(f"Error retrieving changes: {str(e)}", 500)
+
+@api_blueprint.route('/stream', methods=['GET'])
+def stream():
+    """Server-Sent Events stream of committed changes.
+
+    Each event is named after its collection and carries
+    {collection, operation, id, row}. Clients should call /api/sync after
+    connecting, and again on a 'resync' event, to cover missed changes.
+    """
+    requested = request.args.get('collections')
+    collections = [name.strip() for name in requested.split(',')] if requested else list(STREAM_DEFAULT_COLLECTIONS)
+    unknown = [name for name in collections if name not in SYNC_COLLECTIONS]
+    if unknown:
+        return error_response(f"Unknown collection(s): {', '.join(unknown)}")
+
+    subscription = change_broker.subscribe(collections)
+
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                if subscription.overflowed:
+                    yield 'event: resync\ndata: {}\n\n'
+                    return
+                try:
+                    change = subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"event: {change['collection']}\ndata: {json.dumps(change)}\n\n"
+        finally:
+            change_broker.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@api_blueprint.route('/bowsers/status', methods=['GET'])
+@handle_api_error
+@conditional_get('bowsers', 'deployments', 'locations')
+def get_bowser_status():
+    """Get every bowser with its active deployment and location name."""
+    try:
+        views = BowserStatusView.all()
+        return success_response(
+            data=[view.to_dict() for view in views],
+            message="Bowser status retrieved successfully"
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving bowser status: {str(e)}")
+        return error_response(f"Error retrieving bowser status: {str(e)}", 500)
+
 @api_blueprint.route('/bowsers/<int:bowser_id>', methods=['GET'])
 @login_required
 def get_bowser(bowser_id):
@@ -155,14 +258,13 @@ def create_bowser():
 # Location routes
 @api_blueprint.route('/locations', methods=['GET'])
 @handle_api_error
+@conditional_get('locations')
 def get_locations():
-    """Get all locations."""
+    """Get locations, optionally paged with ?limit=&after= and projected with ?fields=."""
     try:
-        locations = Location.query.all()
-        return success_response(
-            data=[location.to_dict() for location in locations],
-            message="Locations retrieved successfully"
-        )
+        return page_response(paginate(Location), "Locations retrieved successfully")
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         logger.error(f"Error retrieving locations: {str(e)}")
         return error_response(f"Error retrieving locations: {str(e)}", 500)
@@ -199,14 +301,13 @@ def create_location():
 # Deployment routes
 @api_blueprint.route('/deployments', methods=['GET'])
 @handle_api_error
+@conditional_get('deployments')
 def get_deployments():
-    """Get all deployments."""
+    """Get deployments, optionally paged with ?limit=&after= and projected with ?fields=."""
     try:
-        deployments = Deployment.query.all()
-        return success_response(
-            data=[deployment.to_dict() for deployment in deployments],
-            message="Deployments retrieved successfully"
-        )
+        return page_response(paginate(Deployment), "Deployments retrieved successfully")
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(f"Error retrieving deployments: {str(e)}")
 
@@ -240,14 +341,13 @@ def create_deployment():
 # Maintenance routes
 @api_blueprint.route('/maintenance', methods=['GET'])
 @handle_api_error
+@conditional_get('maintenance')
 def get_maintenance():
-    """Get all maintenance records."""
+    """Get maintenance records, optionally paged with ?limit=&after= and projected with ?fields=."""
     try:
-        maintenance = Maintenance.query.all()
-        return success_response(
-            data=[record.to_dict() for record in maintenance],
-            message="Maintenance records retrieved successfully"
-        )
+        return page_response(paginate(Maintenance), "Maintenance records retrieved successfully")
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(f"Error retrieving maintenance records: {str(e)}")
 
@@ -318,18 +418,326 @@ def delete_maintenance(record_id):
     db.session.commit()
     return success_response(message='Maintenance record deleted')
 
+# Allocation routes
+@api_blueprint.route('/allocation', methods=['GET'])
+@api_staff_required
+@handle_api_error
+@conditional_get(*ALLOCATION_COLLECTIONS)
+def get_allocation():
+    """The current bowser-to-location allocation plan.
+
+    The plan is computed once and shared by every client until bowsers,
+    locations or deployments change (or ALLOCATION_CACHE_SECONDS pass).
+    """
+    now = datetime.now()
+    plan = current_app.allocation_cache.get_or_build(
+        ('plan', is_business_hours(now)),
+        lambda: build_allocation_plan(now, current_app.config['ALLOCATION_DEFAULT_POPULATION'])
+    )
+    return success_response(data=plan, message="Allocation plan retrieved successfully")
+
+# Spatial routes
+def query_float(name, default=None, minimum=None, maximum=None):
+    """Read a numeric query parameter, raising ValueError when it is missing or out of range."""
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        if default is None:
+            raise ValueError(f"{name} is required")
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if value != value:
+        raise ValueError(f"{name} must be a number")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum:g}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"{name} must be at most {maximum:g}")
+    return value
+
+def spatial_item(distance, item):
+    return dict(item, distance_km=round(distance, 3))
+
+@api_blueprint.route('/locations/nearby', methods=['GET'])
+@handle_api_error
+@conditional_get(*SPATIAL_COLLECTIONS)
+def get_nearby_locations():
+    """Locations within ?radius_km= (default 5) of ?lat=&lng=, nearest first.
+
+    Optional ?type= and ?status= filter the matches and ?limit= caps them.
+    """
+    config = current_app.config
+    try:
+        lat = query_float('lat', minimum=-90, maximum=90)
+        lng = query_float('lng', minimum=-180, maximum=180)
+        radius_km = query_float('radius_km', 5.0, minimum=0, maximum=config['SPATIAL_MAX_RADIUS_KM'])
+        limit = int(query_float('limit', config['SPATIAL_MAX_RESULTS'], minimum=1, maximum=config['SPATIAL_MAX_RESULTS']))
+    except ValueError as e:
+        return error_response(str(e))
+    location_type, status = request.args.get('type'), request.args.get('status')
+
+    def matches(location):
+        return ((location_type is None or location['type'] == location_type)
+                and (status is None or location['status'] == status))
+
+    found = current_app.extensions['spatial_index'].nearby_locations(
+        lat, lng, radius_km, limit, matches if location_type or status else None
+    )
+    return success_response(
+        data=[spatial_item(distance, location) for distance, _, location in found],
+        message="Nearby locations retrieved successfully"
+    )
+
+@api_blueprint.route('/bowsers/nearest', methods=['GET'])
+@handle_api_error
+@conditional_get(*SPATIAL_COLLECTIONS)
+def get_nearest_bowsers():
+    """The ?k= (default 5) deployed bowsers nearest to ?lat=&lng=.
+
+    Bowsers are placed at their active deployment's location. Optional
+    ?max_km= bounds the search, ?status= filters on bowser status and
+    ?min_level= on current level.
+    """
+    config = current_app.config
+    try:
+        lat = query_float('lat', minimum=-90, maximum=90)
+        lng = query_float('lng', minimum=-180, maximum=180)
+        k = int(query_float('k', 5, minimum=1, maximum=config['SPATIAL_MAX_RESULTS']))
+        max_km = query_float('max_km', config['SPATIAL_MAX_RADIUS_KM'], minimum=0,
+                             maximum=config['SPATIAL_MAX_RADIUS_KM'])
+        min_level = query_float('min_level', 0.0, minimum=0)
+    except ValueError as e:
+        return error_response(str(e))
+    status = request.args.get('status')
+
+    def matches(bowser):
+        return ((status is None or bowser['status'] == status)
+                and (bowser['current_level'] or 0) >= min_level)
+
+    found = current_app.extensions['spatial_index'].nearest_bowsers(
+        lat, lng, k, max_km, matches if status or min_level else None
+    )
+    return success_response(
+        data=[spatial_item(distance, bowser) for distance, _, bowser in found],
+        message="Nearest bowsers retrieved successfully"
+    )
+
+# Dispatch routes
+@api_blueprint.route('/dispatch/plan', methods=['POST'])
+@api_staff_required
+@handle_malformed_json
+def plan_refill_dispatch():
+    """Plan refill runs for deployed bowsers running low.
+
+    The body gives the depots ([{id, latitude, longitude, tankers}]) and
+    optionally tanker_capacity, threshold (refill bowsers below this
+    fraction of capacity), bowser_ids and improve (2-opt, default true).
+    The plan is streamed back one depot at a time as
+    {"status", "data": {"depots": [...], "summary": {...}}}.
+    """
+    if dispatch.np is None:
+        return error_response('Dispatch planning needs numpy installed', 501)
+    config = current_app.config
+    try:
+        depots, tanker_capacity, threshold, bowser_ids, improve = dispatch.parse_dispatch_request(
+            request.get_json(silent=True), config
+        )
+    except ValueError as e:
+        return error_response(str(e))
+    stops = dispatch.refill_stops(threshold, bowser_ids)
+    plans = dispatch.plan_dispatch(depots, stops, tanker_capacity, improve, config['DISPATCH_WORKERS'])
+
+    def generate():
+        totals = {'depots': len(depots), 'stops': 0, 'trips': 0, 'litres': 0.0, 'distance_km': 0.0}
+        yield '{"status":"success","data":{"depots":['
+        for number, plan in enumerate(plans):
+            for key in ('stops', 'trips', 'litres', 'distance_km'):
+                totals[key] += plan['summary'][key]
+            yield (',' if number else '') + dumps_compact(plan)
+        totals['distance_km'] = round(totals['distance_km'], 3)
+        yield '],"summary":' + dumps_compact(totals) + '}}'
+
+    return Response(generate(), mimetype='application/json', headers={'Cache-Control': 'no-store'})
+
+# Report routes
+@api_blueprint.route('/reports', methods=['GET'])
+@api_staff_required
+@handle_api_error
+def get_reports():
+    """Reports dashboard metrics, read from the materialized aggregates.
+
+    ?days= (default 30) sets the length of the daily series and ?area=
+    narrows the deployment figures to one area.
+    """
+    try:
+        days = int(query_float('days', 30, minimum=1, maximum=current_app.config['REPORT_MAX_DAYS']))
+    except ValueError as e:
+        return error_response(str(e))
+    report = build_report(days, request.args.get('area') or None)
+    return success_response(data=report, message="Report retrieved successfully")
+
+# Level time-series routes
+@api_blueprint.route('/bowsers/levels', methods=['POST'])
+@api_login_required
+@handle_malformed_json
+def record_levels():
+    """Record a batch of water-level readings.
+
+    Takes an array (or {"readings": [...]}) of {bowser_id, level,
+    recorded_at?}; readings without recorded_at are stamped now. Results
+    are reported per reading, as for the bulk endpoints.
+    """
+    try:
+        result = ingest_readings(bulk_items(request.get_json(silent=True), 'readings'))
+        return bulk_response(result, 'level', 'recorded')
+    except ValueError as e:
+        return error_response(str(e))
+
+@api_blueprint.route('/bowsers/<string:bowser_id>/levels', methods=['GET'])
+@handle_api_error
+def get_levels(bowser_id):
+    """One bowser's level history between ?start= and ?end= (default: the last day).
+
+    ?resolution= is raw, 1m, 1h, 1d or auto (default), which returns raw
+    readings when they fit in ?max_points= and otherwise the finest rollup
+    that does. A rollup needing more than max_points buckets is a 400.
+    """
+    max_points_limit = current_app.config['LEVEL_MAX_POINTS']
+    resolution = request.args.get('resolution', 'auto')
+    try:
+        end = parse_timestamp(request.args['end'], 'end') if request.args.get('end') else datetime.utcnow()
+        start = parse_timestamp(request.args['start'], 'start') if request.args.get('start') else end - timedelta(days=1)
+        max_points = int(query_float('max_points', min(500, max_points_limit), minimum=1, maximum=max_points_limit))
+    except ValueError as e:
+        return error_response(str(e))
+    except OverflowError:
+        # The default start, a day before ?end=, fell before year 1
+        return error_response('end is too early; give start as well')
+    if start >= end:
+        return error_response('start must be before end')
+    if resolution not in ('auto', 'raw', *RESOLUTION_NAMES):
+        return error_response(f"resolution must be one of: auto, raw, {', '.join(RESOLUTION_NAMES)}")
+    if db.session.query(Bowser.id).filter(Bowser.id == bowser_id).first() is None:
+        return error_response('Bowser not found', 404)
+
+    try:
+        resolution, points = level_series(bowser_id, start, end, resolution, max_points)
+    except ValueError as e:
+        return error_response(str(e))
+    return success_response(
+        data=points,
+        message="Level history retrieved successfully",
+        bowser_id=bowser_id,
+        resolution=resolution,
+        start=start.isoformat(),
+        end=end.isoformat()
+    )
+
+# Export routes
+@api_blueprint.route('/export/<string:collection>', methods=['GET'])
+@api_staff_required
+def export_collection(collection):
+    """Stream every row of a collection as NDJSON (default) or CSV (?format=csv).
+
+    Rows are read through a server-side cursor and sent in chunks, so
+    memory stays flat however large the table is. ?fields=a,b,c narrows
+    the columns.
+    """
+    model = EXPORT_COLLECTIONS.get(collection)
+    if model is None:
+        return error_response(f"Unknown collection: {collection}", 404)
+    if collection in ADMIN_EXPORT_COLLECTIONS and current_user.role != 'admin':
+        return error_response('Admin access required', 403)
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return error_response(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    try:
+        fields = parse_fields(model)
+    except ValueError as e:
+        return error_response(str(e))
+
+    chunks = ndjson_chunks(model, fields) if export_format == 'ndjson' else csv_chunks(model, fields)
+    filename = f"{collection}-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+# Bulk routes
+def bulk_items(data, key):
+    """Return the item list of a bulk request body: a JSON array or {key: [...]}."""
+    items = data.get(key) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"Request body must be a non-empty array or an object with '{key}'")
+    max_items = current_app.config.get('BULK_MAX_ITEMS', 1000)
+    if len(items) > max_items:
+        raise ValueError(f"At most {max_items} items per request")
+    return items
+
+def bulk_response(result, collection, action):
+    """Per-item results; 200 when all succeeded, 207 when some did, 400 when none did."""
+    if not result.failed:
+        status, status_code = 'success', 200
+    elif result.succeeded:
+        status, status_code = 'partial', 207
+    else:
+        status, status_code = 'error', 400
+    return jsonify({
+        'status': status,
+        'message': f"{result.succeeded} {collection} record(s) {action}, {result.failed} failed",
+        'succeeded': result.succeeded,
+        'failed': result.failed,
+        'data': result.items
+    }), status_code
+
+@api_blueprint.route('/bowsers/bulk', methods=['POST', 'PUT', 'PATCH', 'DELETE'], defaults={'collection': 'bowsers'})
+@api_blueprint.route('/locations/bulk', methods=['POST', 'PUT', 'PATCH', 'DELETE'], defaults={'collection': 'locations'})
+@api_blueprint.route('/deployments/bulk', methods=['POST', 'PUT', 'PATCH', 'DELETE'], defaults={'collection': 'deployments'})
+@api_blueprint.route('/maintenance/bulk', methods=['POST', 'PUT', 'PATCH', 'DELETE'], defaults={'collection': 'maintenance'})
+@api_login_required
+@handle_malformed_json
+def bulk_records(collection):
+    """Create (POST), update (PUT/PATCH) or delete (DELETE) many records at once.
+
+    POST and PUT/PATCH take an array of objects (updates name their row by
+    `id`), DELETE an array of ids; `{"items": [...]}` / `{"ids": [...]}`
+    are accepted too. Items are validated in one pass and the valid ones
+    are written in a single transaction.
+    """
+    model = BULK_COLLECTIONS[collection]
+    try:
+        data = request.get_json(silent=True)
+        if request.method == 'DELETE':
+            result, action = bulk_delete(model, bulk_items(data, 'ids')), 'deleted'
+        elif request.method == 'POST':
+            result, action = bulk_create(model, bulk_items(data, 'items')), 'created'
+        else:
+            result, action = bulk_update(model, bulk_items(data, 'items')), 'updated'
+        return bulk_response(result, collection, action)
+    except ValueError as e:
+        return error_response(str(e))
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error in bulk {collection} request: {str(e)}")
+        return error_response(f"Error processing bulk request: {str(e)}", 500)
+
 # User routes
 @api_blueprint.route('/users', methods=['GET'])
 @api_admin_required
 @handle_api_error
+@conditional_get('users')
 def api_users():
-    """Get all users."""
+    """Get users, optionally paged with ?limit=&after= and projected with ?fields=."""
     try:
-        users = User.query.all()
-        return success_response(
-            data=[user.to_dict() for user in users],
-            message="Users retrieved successfully"
-        )
+        return page_response(paginate(User), "Users retrieved successfully")
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         logger.error(f"Error retrieving users: {str(e)}")
         return error_response(f"Error retrieving users: {str(e)}", 500)
@@ -337,14 +745,13 @@ def api_users():
 # Alert routes
 @api_blueprint.route('/alerts', methods=['GET'])
 @handle_api_error
+@conditional_get('alerts')
 def api_alerts():
-    """Get all alerts."""
+    """Get alerts, optionally paged with ?limit=&after= and projected with ?fields=."""
     try:
-        alerts = Alert.query.all()
-        return success_response(
-            data=[alert.to_dict() for alert in alerts],
-            message="Alerts retrieved successfully"
-        )
+        return page_response(paginate(Alert), "Alerts retrieved successfully")
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         logger.error(f"Error retrieving alerts: {str(e)}")
         return error_response(f"Error retrieving alerts: {str(e)}", 500)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.security import check_password_hash
-from datetime import datetime, timedelta
+from datetime import datetime
 from models.sql_models import User
 from database import db
 import logging
@@ -64,26 +64,18 @@ def login():
                 'locked_until': user.account_locked_until.isoformat()
             }), 403
 
-        # Check password
-        if not user.check_password(password):
-            # Increment failed attempts
-            user.failed_login_attempts += 1
-            if user.failed_login_attempts >= 5:
-                user.account_locked_until = datetime.utcnow() + timedelta(minutes=30)
-                db.session.commit()
+        # Check password; check_password tracks failed attempts, lockout and
+        # last_login, and this request commits them once
+        authenticated = user.check_password(password)
+        db.session.commit()
+        if not authenticated:
+            if user.account_locked_until and user.account_locked_until > datetime.utcnow():
                 return jsonify({
                     'error': 'Account locked due to too many failed attempts',
                     'locked_until': user.account_locked_until.isoformat()
                 }), 403
-            
-            db.session.commit()
             return jsonify({'error': 'Invalid username or password'}), 401
 
-        # Reset failed attempts and update last login
-        user.failed_login_attempts = 0
-        user.last_login = datetime.utcnow()
-        db.session.commit()
-
         # Generate and return token (implement your token generation logic here)
         token = generate_token(user)
         return jsonify({
@@ -116,6 +108,7 @@ def reset_password():
             return jsonify({'error': 'User not found'}), 404
 
         if not user.check_password(current_password):
+            db.session.commit()
             return jsonify({'error': 'Current password is incorrect'}), 401
 
         try:
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, jsonify, abort
 from flask_login import login_required, current_user
 from models.sql_models import User, Bowser, Location, Deployment, Maintenance
+from models.views import BowserStatusView
 from database import db
 from functools import wraps
 
@@ -80,12 +81,5 @@ def maintenance():
 @protected_blueprint.route('/dashboard')
 @login_required
 def dashboard():
-    bowsers = Bowser.query.all()
-    bowser_status = {}
-    for bowser in bowsers:
-        bowser_status[bowser.id] = {
-            'number': bowser.number,
-            'capacity': bowser.capacity,
-            'status': bowser.status,
-        }
+    bowser_status = BowserStatusView.status_map()
     return render_template('dashboard.html', bowser_status=bowser_status) 
\ No newline at end of file
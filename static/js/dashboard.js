@@ -465,8 +465,48 @@ export class Dashboard {
      * Set up refresh intervals
      */
     startRefreshInterval() {
-        // Refresh every 30 seconds
-        this.refreshInterval = setInterval(() => this.updateDashboard(), 30000);
+        // Prefer server push; fall back to polling where EventSource is unavailable
+        if (window.EventSource) {
+            this.startEventStream();
+            return;
+        }
+        // Pull only the changes since the last sync every 30 seconds
+        this.refreshInterval = setInterval(async () => {
+            await this.dataManager.refreshData();
+            await this.updateDashboard();
+        }, 30000);
+    }
+
+    /**
+     * Subscribe to pushed bowser, deployment and alert changes
+     */
+    startEventStream() {
+        this.eventSource = new EventSource('/api/stream');
+
+        const resync = async () => {
+            await this.dataManager.refreshData();
+            this.scheduleDashboardUpdate();
+        };
+        const onChange = (event) => {
+            this.dataManager.applyEvent(JSON.parse(event.data));
+            this.scheduleDashboardUpdate();
+        };
+
+        ['bowsers', 'deployments', 'alerts'].forEach(name => this.eventSource.addEventListener(name, onChange));
+        this.eventSource.addEventListener('resync', resync);
+        // Catch up on anything missed while (re)connecting
+        this.eventSource.onopen = resync;
+    }
+
+    /**
+     * Coalesce bursts of pushed changes into one redraw
+     */
+    scheduleDashboardUpdate() {
+        if (this.pendingUpdate) return;
+        this.pendingUpdate = setTimeout(async () => {
+            this.pendingUpdate = null;
+            await this.updateDashboard();
+        }, 250);
     }
     
     /**
@@ -21,6 +21,9 @@ class DataManager {
             maintenance: initialData.maintenance || [],
             users: initialData.users || []
         };
+
+        // Change version from /api/sync; null until the first sync
+        this.syncVersion = null;
     }
 
     async initializeData() {
@@ -37,43 +40,11 @@ class DataManager {
             };
             return this.data;
         }
-        // Otherwise fetch the latest data from API endpoints
+        // Otherwise load a full snapshot (and its change version) from the sync endpoint
         console.log('Fetching public data from API');
-        try {
-            // Fetch locations, bowsers, deployments, alerts, and maintenance
-            const [locRes, bowRes, depRes, alertRes, maintRes] = await Promise.all([
-                fetch('/api/locations'),
-                fetch('/api/bowsers'),
-                fetch('/api/deployments'),
-                fetch('/api/alerts'),
-                fetch('/api/maintenance')
-            ]);
-            
-            let locationsData = await locRes.json();
-            if (locationsData.data) locationsData = locationsData.data;
-            let bowsersData = await bowRes.json();
-            if (bowsersData.data) bowsersData = bowsersData.data;
-            let deploymentsData = await depRes.json();
-            if (deploymentsData.data) deploymentsData = deploymentsData.data;
-            let alertsData = await alertRes.json();
-            if (alertsData.data) alertsData = alertsData.data;
-            // Parse maintenance data
-            let maintenanceData = await maintRes.json();
-            if (maintenanceData.data) maintenanceData = maintenanceData.data;
-            this.data = {
-                locations: locationsData,
-                bowsers: bowsersData,
-                deployments: deploymentsData,
-                alerts: alertsData,
-                maintenance: maintenanceData,
-                users: this.data.users
-            };
-            console.log('Public data loaded:', this.data);
-            return this.data;
-        } catch (error) {
-            console.error('Error loading public data:', error);
-            return this.data;
-        }
+        await this.refreshData();
+        console.log('Public data loaded:', this.data);
+        return this.data;
     }
 
     // Getter methods
@@ -102,9 +73,49 @@ class DataManager {
         return this.data.users || [];
     }
 
-    // Refresh data - in a real application, this would make API calls
+    /**
+     * Apply one /api/sync payload to the local collections
+     * @param {Object} payload - { version, full, collections: { name: { upserted, deleted } } }
+     */
+    applyChanges(payload) {
+        Object.entries(payload.collections || {}).forEach(([name, changes]) => {
+            if (payload.full) {
+                this.data[name] = changes.upserted;
+                return;
+            }
+            const byId = new Map((this.data[name] || []).map(item => [String(item.id), item]));
+            changes.deleted.forEach(id => byId.delete(String(id)));
+            changes.upserted.forEach(item => byId.set(String(item.id), item));
+            this.data[name] = Array.from(byId.values());
+        });
+        this.syncVersion = payload.version;
+    }
+
+    /**
+     * Apply one pushed change from the /api/stream event source
+     * @param {Object} change - { collection, operation, id, row }
+     */
+    applyEvent(change) {
+        const items = (this.data[change.collection] || []).filter(item => String(item.id) !== String(change.id));
+        if (change.operation !== 'delete') {
+            items.push(change.row);
+        }
+        this.data[change.collection] = items;
+    }
+
+    // Refresh data - fetch only the rows changed since the last sync
     async refreshData() {
-        console.log('Refreshing data would require API calls');
+        try {
+            const query = this.syncVersion === null ? '' : `?since=${this.syncVersion}`;
+            const response = await fetch(`/api/sync${query}`);
+            if (!response.ok) {
+                throw new Error(`Sync failed: ${response.status}`);
+            }
+            const result = await response.json();
+            this.applyChanges(result.data || result);
+        } catch (error) {
+            console.error('Error syncing data:', error);
+        }
         return this.data;
     }
 }
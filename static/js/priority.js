@@ -119,42 +119,16 @@ class PriorityManager {
     }
 
     /**
-     * Get optimal bowser allocation based on priorities
+     * Get the shared bowser allocation plan computed by the server
+     * (GET /api/allocation). Resolves to a Map of location id -> bowser ids.
      */
-    getOptimalAllocation(availableBowsers, locations) {
-        const allocation = new Map();
-        const prioritizedLocations = [...locations]
-            .sort((a, b) => this.calculatePriorityScore(a) - this.calculatePriorityScore(b));
-        
-        const availableBowsersList = [...availableBowsers]
-            .sort((a, b) => b.capacity - a.capacity);
-        
-        for (const location of prioritizedLocations) {
-            if (availableBowsersList.length === 0) break;
-            
-            const requiredCapacity = this.calculateRequiredCapacity(location);
-            let allocatedBowsers = [];
-            let totalAllocatedCapacity = 0;
-            
-            while (totalAllocatedCapacity < requiredCapacity && availableBowsersList.length > 0) {
-                const bowser = availableBowsersList.shift();
-                allocatedBowsers.push(bowser);
-                totalAllocatedCapacity += bowser.capacity;
-            }
-            
-            if (allocatedBowsers.length > 0) {
-                allocation.set(location.id, allocatedBowsers);
-            }
+    async getOptimalAllocation() {
+        const response = await fetch('/api/allocation', { credentials: 'same-origin' });
+        if (!response.ok) {
+            throw new Error(`Allocation request failed: ${response.status}`);
         }
-        
-        return allocation;
-    }
-
-    calculateRequiredCapacity(location) {
-        const type = this.locationTypes[location.type] || 'commercial';
-        const baseCapacity = location.estimatedPopulation * 10; // 10L per person
-        const priorityMultiplier = 1 + ((5 - this.priorityLevels[type].level) * 0.2);
-        return baseCapacity * priorityMultiplier;
+        const { data } = await response.json();
+        return new Map(data.allocations.map(entry => [entry.location_id, entry.bowser_ids]));
     }
 
     /**
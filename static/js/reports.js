@@ -46,19 +46,13 @@ class ReportsManager {
 
     async loadReportData() {
         try {
-            // Fetch data from API
-            const [bowsers, deployments, maintenance, reports] = await Promise.all([
-                fetch(`${CONFIG.api.base}${CONFIG.api.endpoints.bowsers}`).then(res => res.json()),
-                fetch(`${CONFIG.api.base}${CONFIG.api.endpoints.deployments}`).then(res => res.json()),
-                fetch(`${CONFIG.api.base}${CONFIG.api.endpoints.maintenance}`).then(res => res.json()),
-                fetch(`${CONFIG.api.base}${CONFIG.api.endpoints.reports}`).then(res => res.json())
-            ]);
-            
-            // Store data in dataManager
-            dataManager.bowsers = bowsers;
-            dataManager.deployments = deployments;
-            dataManager.maintenanceRecords = maintenance;
-            dataManager.reports = reports;
+            // One summary document, computed from the server's report aggregates
+            const response = await fetch(`${CONFIG.api.base}${CONFIG.api.endpoints.reports}?days=${this.dateRange}`);
+            const body = await response.json();
+            if (!response.ok) {
+                throw new Error(body.message || 'Failed to load report');
+            }
+            this.report = body.data;
             
             // Update UI components
             this.updateMetrics();
@@ -72,51 +66,20 @@ class ReportsManager {
         }
     }
 
-    async updateMetrics() {
-        let activeBowsers = 0;
-        let locationsServed = 0;
-        let maintenanceRate = 0;
-        let waterSupplied = 0;
-        let changes = {
-            bowser: '0%',
-            location: '0%',
-            maintenance: '0%',
-            supply: '0%'
+    updateMetrics() {
+        const report = this.report;
+        const activeBowsers = report.bowsers.active;
+        const locationsServed = report.locations_served;
+        const maintenanceRate = Math.round(report.maintenance.completion_rate);
+        const waterSupplied = report.water_supplied;
+
+        // Calculate changes (simplified for demo)
+        const changes = {
+            bowser: activeBowsers > 0 ? '+5%' : '0%',
+            location: locationsServed > 0 ? '+12%' : '0%',
+            maintenance: maintenanceRate > 0 ? '-2%' : '0%',
+            supply: waterSupplied > 0 ? '+8%' : '0%'
         };
-        
-        try {
-            // Get current data
-            activeBowsers = dataManager.bowsers.filter(b => b.status === 'active').length;
-            const activeDeployments = dataManager.deployments.filter(d => d.status === 'active');
-            locationsServed = new Set(activeDeployments.map(d => d.locationId)).size;
-            
-            const allMaintenance = dataManager.maintenanceRecords;
-            const completedMaintenance = allMaintenance.filter(r => r.status === 'completed');
-            maintenanceRate = allMaintenance.length ? 
-                Math.round((completedMaintenance.length / allMaintenance.length) * 100) : 0;
-
-            // Calculate total water supplied
-            waterSupplied = activeDeployments.reduce((total, deployment) => {
-                const bowser = dataManager.bowsers.find(b => b.id === deployment.bowserId);
-                if (bowser) {
-                    const supplyLevel = deployment.supplyLevel || 0;
-                    const waterDelivered = bowser.capacity * ((100 - supplyLevel) / 100);
-                    return total + waterDelivered;
-                }
-                return total;
-            }, 0);
-
-            // Calculate changes (simplified for demo)
-            changes = {
-                bowser: activeBowsers > 0 ? '+5%' : '0%',
-                location: locationsServed > 0 ? '+12%' : '0%',
-                maintenance: maintenanceRate > 0 ? '-2%' : '0%',
-                supply: waterSupplied > 0 ? '+8%' : '0%'
-            };
-        } catch (error) {
-            this.showNotification('Error updating metrics', 'error');
-            console.error(error);
-        }
 
         // Update DOM with metrics
         document.getElementById('activeBowsers').textContent = activeBowsers;
@@ -141,16 +104,14 @@ class ReportsManager {
     createUtilizationChart() {
         const ctx = document.getElementById('utilizationChart').getContext('2d');
         
-        // Calculate utilization data
-        const bowserStatuses = ['deployed', 'maintenance', 'standby', 'decommissioned'];
-        const bowserData = bowserStatuses.reduce((acc, status) => {
-            const count = dataManager.getBowsersByStatus(status).length;
-            if (count > 0) {
-                acc.labels.push(status.charAt(0).toUpperCase() + status.slice(1));
-                acc.data.push(count);
-            }
-            return acc;
-        }, { labels: [], data: [] });
+        // Bowser counts by status
+        const statusColors = {
+            active: '#4caf50',
+            maintenance: '#ff9800',
+            standby: '#2196f3',
+            decommissioned: '#f44336'
+        };
+        const byStatus = Object.entries(this.report.bowsers.by_status).filter(([, count]) => count > 0);
 
         if (this.charts.utilization) {
             this.charts.utilization.destroy();
@@ -159,15 +120,10 @@ class ReportsManager {
         this.charts.utilization = new Chart(ctx, {
             type: 'doughnut',
             data: {
-                labels: bowserData.labels,
+                labels: byStatus.map(([status]) => status.charAt(0).toUpperCase() + status.slice(1)),
                 datasets: [{
-                    data: bowserData.data,
-                    backgroundColor: [
-                        '#4caf50',  // Deployed
-                        '#ff9800',  // Maintenance
-                        '#2196f3',  // Standby
-                        '#f44336'   // Decommissioned
-                    ]
+                    data: byStatus.map(([, count]) => count),
+                    backgroundColor: byStatus.map(([status]) => statusColors[status] || '#9e9e9e')
                 }]
             },
             options: {
@@ -184,15 +140,9 @@ class ReportsManager {
     createDistributionChart() {
         const ctx = document.getElementById('distributionChart').getContext('2d');
         
-        // Calculate distribution data
-        const locationTypes = ['healthcare', 'emergency', 'residential', 'commercial'];
-        const distributionData = locationTypes.map(type => {
-            const locations = dataManager.getLocationsByType(type);
-            const deploymentCount = locations.reduce((count, location) => {
-                return count + dataManager.getDeploymentsByLocation(location.id).length;
-            }, 0);
-            return deploymentCount;
-        });
+        // Active deployments per location category
+        const locationTypes = ['healthcare', 'emergency', 'critical', 'residential', 'commercial'];
+        const distributionData = locationTypes.map(type => this.report.deployments.by_category[type] || 0);
 
         if (this.charts.distribution) {
             this.charts.distribution.destroy();
@@ -225,10 +175,8 @@ class ReportsManager {
     createMaintenanceCharts() {
         // Maintenance by Type chart
         const typeCtx = document.getElementById('maintenanceTypeChart').getContext('2d');
-        const maintenanceRecords = dataManager.getActiveMaintenance();
-        const maintenanceTypes = maintenanceRecords.reduce((acc, record) => {
-            const type = record.type.charAt(0).toUpperCase() + record.type.slice(1);
-            acc[type] = (acc[type] || 0) + 1;
+        const maintenanceTypes = Object.entries(this.report.maintenance.by_type).reduce((acc, [type, counts]) => {
+            acc[type.charAt(0).toUpperCase() + type.slice(1)] = counts.records;
             return acc;
         }, {});
 
@@ -266,9 +214,9 @@ class ReportsManager {
             }
         });
 
-        // Response Time Trends chart
+        // Daily completion chart
         const timeCtx = document.getElementById('responseTimeChart').getContext('2d');
-        const responseTimeData = this.calculateResponseTimeTrends();
+        const completionData = this.calculateCompletionTrends();
 
         if (this.charts.responseTime) {
             this.charts.responseTime.destroy();
@@ -277,13 +225,19 @@ class ReportsManager {
         this.charts.responseTime = new Chart(timeCtx, {
             type: 'line',
             data: {
-                labels: responseTimeData.labels,
+                labels: completionData.labels,
                 datasets: [{
-                    label: 'Average Response Time (hours)',
-                    data: responseTimeData.data,
+                    label: 'Maintenance scheduled',
+                    data: completionData.scheduled,
                     borderColor: '#2196f3',
                     tension: 0.4,
                     fill: false
+                }, {
+                    label: 'Maintenance completed',
+                    data: completionData.completed,
+                    borderColor: '#4caf50',
+                    tension: 0.4,
+                    fill: false
                 }]
             },
             options: {
@@ -293,108 +247,50 @@ class ReportsManager {
                         beginAtZero: true,
                         title: {
                             display: true,
-                            text: 'Hours'
+                            text: 'Records'
                         }
                     }
                 },
                 plugins: {
                     title: {
                         display: true,
-                        text: 'Maintenance Response Time Trends'
+                        text: 'Maintenance Completion Trends'
                     }
                 }
             }
         });
     }
 
-    calculateResponseTimeTrends() {
-        const maintenanceRecords = dataManager.getActiveMaintenance();
-        const now = new Date();
-        const days = Array.from({ length: this.dateRange }, (_, i) => {
-            const date = new Date(now);
-            date.setDate(date.getDate() - (this.dateRange - 1 - i));
-            return date;
-        });
-
-        // Calculate average response time for each day
-        const data = days.map(day => {
-            const dayRecords = maintenanceRecords.filter(record => {
-                const recordDate = new Date(record.scheduledDate);
-                return recordDate.toDateString() === day.toDateString();
-            });
-
-            if (dayRecords.length === 0) return 0;
-
-            const totalResponseTime = dayRecords.reduce((sum, record) => {
-                const scheduledDate = new Date(record.scheduledDate);
-                const completedDate = record.estimatedCompletion ? new Date(record.estimatedCompletion) : now;
-                return sum + (completedDate - scheduledDate) / (1000 * 60 * 60); // Convert to hours
-            }, 0);
-
-            return Math.round(totalResponseTime / dayRecords.length);
-        });
-
+    calculateCompletionTrends() {
+        const daily = this.report.daily;
         return {
-            labels: days.map(day => day.toLocaleDateString('en-US', { month: 'short', day: 'numeric' })),
-            data
+            labels: daily.map(day => new Date(day.date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' })),
+            scheduled: daily.map(day => day.maintenance_records),
+            completed: daily.map(day => day.maintenance_completed)
         };
     }
 
     updateLocationPerformance() {
         const tableBody = document.getElementById('performanceTableBody');
         const selectedType = document.getElementById('locationTypeFilter').value;
-        
-        // Get locations based on filter
-        const locations = selectedType === 'all' ? 
-            dataManager.getLocations() : 
-            dataManager.getLocationsByType(selectedType);
 
         // Clear existing rows
         tableBody.innerHTML = '';
 
-        // Add location rows
-        locations.forEach(location => {
-            const deployments = dataManager.getDeploymentsByLocation(location.id);
-            const activeDeployments = deployments.filter(d => d.status === 'active');
-            const alerts = dataManager.getAlertsByLocation(location.id);
-            
+        // One row per area, narrowed to a location category when selected
+        this.report.areas.forEach(area => {
+            const figures = selectedType === 'all' ? area : area.by_category[selectedType];
+            if (!figures) return;
+
             const row = document.createElement('tr');
             row.innerHTML = `
-                <td>${location.name}</td>
-                <td>${location.type.charAt(0).toUpperCase() + location.type.slice(1)}</td>
-                <td>${activeDeployments.length}</td>
-                <td>${this.calculateSupplyLevel(activeDeployments)}%</td>
-                <td>${this.calculateRefillRate(deployments)}/day</td>
-                <td>${alerts.length}</td>
+                <td>${area.area || 'Unassigned'}</td>
+                <td>${figures.locations_served}</td>
+                <td>${figures.active_deployments}</td>
+                <td>${Math.round(figures.water_supplied).toLocaleString()}L</td>
             `;
             tableBody.appendChild(row);
         });
-
-        // Update location type filter options
-        const typeFilter = document.getElementById('locationTypeFilter');
-        typeFilter.innerHTML = `
-            <option value="all">All Types</option>
-            <option value="healthcare">Healthcare</option>
-            <option value="emergency">Emergency</option>
-            <option value="residential">Residential</option>
-            <option value="commercial">Commercial</option>
-        `;
-    }
-
-    calculateSupplyLevel(deployments) {
-        if (deployments.length === 0) return 0;
-        
-        const totalLevel = deployments.reduce((sum, deployment) => {
-            return sum + (deployment.supplyLevel || 0);
-        }, 0);
-        
-        return Math.round(totalLevel / deployments.length);
-    }
-
-    calculateRefillRate(deployments) {
-        // This would normally calculate based on historical refill data
-        // For now, return a mock value between 1-3
-        return ((deployments.length % 3) + 1).toFixed(1);
     }
 
     exportReport(format) {
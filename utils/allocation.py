@@ -0,0 +1,173 @@
+import bisect
+from datetime import datetime
+from database import db
+from models.sql_models import Bowser, Location, Deployment
+
+# Priority categories, as in static/js/priority.js (lower level = served first)
+PRIORITY_LEVELS = {
+    'healthcare': {'level': 1, 'min_supply_level': 80, 'response_time': 60},
+    'emergency': {'level': 2, 'min_supply_level': 75, 'response_time': 90},
+    'critical': {'level': 3, 'min_supply_level': 70, 'response_time': 120},
+    'residential': {'level': 4, 'min_supply_level': 60, 'response_time': 180},
+    'commercial': {'level': 5, 'min_supply_level': 50, 'response_time': 240},
+}
+# Location.type -> category; unknown types count as commercial
+LOCATION_CATEGORIES = {
+    'hospital': 'healthcare',
+    'clinic': 'healthcare',
+    'fireStation': 'emergency',
+    'fire_station': 'emergency',
+    'policeStation': 'emergency',
+    'police_station': 'emergency',
+    'ambulanceDepot': 'emergency',
+    'ambulance_depot': 'emergency',
+    'powerPlant': 'critical',
+    'power_plant': 'critical',
+    'waterTreatment': 'critical',
+    'water_treatment': 'critical',
+    'dataCenter': 'critical',
+    'data_center': 'critical',
+    'residential': 'residential',
+    'apartment': 'residential',
+    'office': 'commercial',
+    'retail': 'commercial',
+}
+# Bowsers in these states, and not on an active or scheduled deployment,
+# can be allocated
+ALLOCATABLE_BOWSER_STATUSES = ('available', 'active')
+COMMITTED_DEPLOYMENT_STATUSES = ('active', 'scheduled')
+LITRES_PER_PERSON = 10
+# Collections a plan is computed from; changes to them invalidate it
+ALLOCATION_COLLECTIONS = ('bowsers', 'locations', 'deployments')
+
+def location_category(location_type):
+    return LOCATION_CATEGORIES.get(location_type, 'commercial')
+
+def is_business_hours(now):
+    return 9 <= now.hour <= 17
+
+def priority_score(category, population, business_hours):
+    """PriorityManager.calculatePriorityScore without live supply data.
+
+    Lower scores are served first: the category sets the thousands, a
+    smaller population adds up to 100 and healthcare/emergency sites (or
+    any site during business hours) are pulled forward.
+    """
+    population_score = max(0, 100 - population / 1000) if population else 50
+    if category in ('healthcare', 'emergency'):
+        special_score = 100
+    else:
+        special_score = 50 if business_hours else 0
+    return PRIORITY_LEVELS[category]['level'] * 1000 + population_score - special_score
+
+def required_capacity(category, population):
+    """Litres a location needs: 10 L a head, up to +80% for top categories."""
+    return population * LITRES_PER_PERSON * (1 + (5 - PRIORITY_LEVELS[category]['level']) * 0.2)
+
+class CapacityPool:
+    """Unallocated bowsers bucketed by capacity.
+
+    A fleet has few distinct capacities, so best-fit picks are a binary
+    search over them plus a pop from the bucket.
+    """
+
+    def __init__(self, bowsers):
+        self._buckets = {}
+        for bowser_id, capacity in sorted(bowsers, reverse=True):
+            self._buckets.setdefault(capacity, []).append(bowser_id)
+        self._capacities = sorted(self._buckets)
+
+    def __bool__(self):
+        return bool(self._capacities)
+
+    def take(self, needed):
+        """Remove the smallest bowser holding `needed`, or the largest one.
+
+        Returns (bowser id, capacity).
+        """
+        index = min(bisect.bisect_left(self._capacities, needed), len(self._capacities) - 1)
+        capacity = self._capacities[index]
+        bucket = self._buckets[capacity]
+        bowser_id = bucket.pop()
+        if not bucket:
+            del self._buckets[capacity]
+            del self._capacities[index]
+        return bowser_id, capacity
+
+    def remaining(self):
+        return sorted(bowser_id for bucket in self._buckets.values() for bowser_id in bucket)
+
+def allocate(locations, bowsers, business_hours, default_population):
+    """Assign bowsers to locations in priority order.
+
+    `locations` are (id, name, type) and `bowsers` (id, capacity) tuples.
+    Scores are computed once per location and sorted on, then each
+    location takes best-fit bowsers until its need is covered, so large
+    bowsers are not spent on small gaps.
+    """
+    # Every input to the score is per category, so score each category once
+    terms = {
+        category: (priority_score(category, default_population, business_hours),
+                   required_capacity(category, default_population))
+        for category in PRIORITY_LEVELS
+    }
+    ranked = []
+    for location_id, name, location_type in locations:
+        category = location_category(location_type)
+        score, needed = terms[category]
+        ranked.append((score, location_id, name, category, needed))
+    ranked.sort()
+
+    pool = CapacityPool(bowsers)
+    allocations, unserved = [], []
+    shortfall = 0.0
+    for score, location_id, name, category, needed in ranked:
+        bowser_ids, allocated = [], 0.0
+        while allocated < needed and pool:
+            bowser_id, capacity = pool.take(needed - allocated)
+            bowser_ids.append(bowser_id)
+            allocated += capacity
+        shortfall += max(0.0, needed - allocated)
+        if not bowser_ids:
+            unserved.append(location_id)
+            continue
+        allocations.append({
+            'location_id': location_id,
+            'location_name': name,
+            'category': category,
+            'priority_level': PRIORITY_LEVELS[category]['level'],
+            'score': score,
+            'required_capacity': needed,
+            'allocated_capacity': allocated,
+            'bowser_ids': bowser_ids,
+        })
+
+    return {
+        'allocations': allocations,
+        'unserved_location_ids': unserved,
+        'unallocated_bowser_ids': pool.remaining(),
+        'summary': {
+            'locations': len(ranked),
+            'served_locations': len(allocations),
+            'fully_served_locations': sum(1 for entry in allocations
+                                          if entry['allocated_capacity'] >= entry['required_capacity']),
+            'bowsers': len(bowsers),
+            'allocated_bowsers': sum(len(entry['bowser_ids']) for entry in allocations),
+            'shortfall_litres': shortfall,
+        },
+    }
+
+def build_allocation_plan(now=None, default_population=500):
+    """Read active locations and free bowsers and compute the current plan."""
+    now = now or datetime.now()
+    business_hours = is_business_hours(now)
+    committed = db.session.query(Deployment.bowser_id).filter(Deployment.status.in_(COMMITTED_DEPLOYMENT_STATUSES))
+    bowsers = db.session.query(Bowser.id, Bowser.capacity).filter(
+        Bowser.status.in_(ALLOCATABLE_BOWSER_STATUSES),
+        Bowser.id.notin_(committed)
+    ).all()
+    locations = db.session.query(Location.id, Location.name, Location.type).filter(Location.status == 'active').all()
+    plan = allocate(locations, bowsers, business_hours, default_population)
+    plan['generated_at'] = now.isoformat()
+    plan['business_hours'] = business_hours
+    return plan
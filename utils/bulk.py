@@ -0,0 +1,282 @@
+import math
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+from database import db
+from models.sql_models import Bowser, Location, Deployment, Maintenance
+
+# Collections writable through /api/<collection>/bulk
+BULK_COLLECTIONS = OrderedDict([
+    ('bowsers', Bowser),
+    ('locations', Location),
+    ('deployments', Deployment),
+    ('maintenance', Maintenance),
+])
+
+# SQLite's default bound-parameter limit is 999
+_IN_CHUNK_SIZE = 500
+
+class BulkResult:
+    """Per-item outcome of a bulk operation, in request order."""
+
+    def __init__(self, items):
+        self.items = items
+
+    @property
+    def succeeded(self):
+        return sum(1 for item in self.items if item['status'] != 'error')
+
+    @property
+    def failed(self):
+        return len(self.items) - self.succeeded
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        yield values[start:start + _IN_CHUNK_SIZE]
+
+def _existing(column, values):
+    """Return {value: row id} for rows whose `column` is one of `values`."""
+    table = column.table
+    found = {}
+    for chunk in _chunks(set(values)):
+        for value, row_id in db.session.query(column, table.c.id).filter(column.in_(chunk)):
+            found[value] = row_id
+    return found
+
+def _referenced(column, values):
+    """Return the `values` that some row's `column` still points at."""
+    found = set()
+    for chunk in _chunks(set(values)):
+        found.update(value for value, in db.session.query(column).filter(column.in_(chunk)).distinct())
+    return found
+
+def coerce_value(column, value):
+    """Convert a JSON value to the Python value for `column`.
+
+    Raises ValueError with a message naming the field.
+    """
+    if value is None:
+        if not column.nullable:
+            raise ValueError(f"{column.name} may not be null")
+        return None
+    column_type = column.type
+    if isinstance(column_type, db.DateTime):
+        if not isinstance(value, str):
+            raise ValueError(f"{column.name} must be a date string")
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{column.name} must be YYYY-MM-DD or an ISO timestamp")
+    if isinstance(column_type, (db.Float, db.Integer)):
+        if isinstance(value, bool):
+            raise ValueError(f"{column.name} must be a number")
+        try:
+            number = float(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"{column.name} must be a number")
+        # nan is stored as NULL and inf is served as null
+        if not math.isfinite(number):
+            raise ValueError(f"{column.name} must be a number")
+        if not isinstance(column_type, db.Integer):
+            return number
+        # int() would silently truncate 2.7
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"{column.name} must be a whole number")
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{column.name} must be a whole number")
+    if not isinstance(value, str):
+        raise ValueError(f"{column.name} must be a string")
+    length = getattr(column_type, 'length', None)
+    if length and len(value) > length:
+        raise ValueError(f"{column.name} must be at most {length} characters")
+    return value
+
+def _coerce_fields(table, fields):
+    """Coerce every field of one item, rejecting unknown field names."""
+    unknown = [name for name in fields if name not in table.c]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return {name: coerce_value(table.c[name], value) for name, value in fields.items()}
+
+def _required_columns(table):
+    return [
+        column for column in table.columns
+        if not column.primary_key and not column.nullable and column.default is None
+    ]
+
+def _check_constraints(table, staged, errors):
+    """Flag staged values that would break a unique or foreign key constraint.
+
+    `staged` maps item index to (row id, values). Checking up front costs
+    one IN query per constrained column, and keeps a single bad item from
+    rolling back the whole transaction at commit.
+    """
+    for column in table.columns:
+        if column.unique or column.primary_key:
+            seen = {}
+            for index, (row_id, values) in staged.items():
+                if index in errors or values.get(column.name) is None:
+                    continue
+                value = values[column.name]
+                if value in seen:
+                    errors[index] = f"Duplicate {column.name} '{value}' in request"
+                seen[value] = row_id
+            owners = _existing(column, seen)
+            for index, (row_id, values) in staged.items():
+                if index not in errors and owners.get(values.get(column.name), row_id) != row_id:
+                    errors[index] = f"{column.name} '{values[column.name]}' already exists"
+
+        for foreign_key in column.foreign_keys:
+            wanted = {values[column.name] for index, (row_id, values) in staged.items()
+                      if index not in errors and values.get(column.name) is not None}
+            present = _existing(foreign_key.column, wanted)
+            for index, (row_id, values) in staged.items():
+                value = values.get(column.name)
+                if index not in errors and value is not None and value not in present:
+                    errors[index] = f"{column.name} '{value}' does not exist"
+
+def _referencing_columns(table):
+    """Foreign key columns in other tables that point at `table`."""
+    return [
+        foreign_key.parent
+        for other in db.metadata.sorted_tables
+        for foreign_key in other.foreign_keys
+        if foreign_key.column.table is table
+    ]
+
+def _commit(results, status):
+    """Commit the staged rows, marking every staged item failed on error."""
+    try:
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        for item in results:
+            if item['status'] == status:
+                item['status'] = 'error'
+                item['error'] = f"Transaction failed: {str(e.orig if hasattr(e, 'orig') else e)}"
+
+def bulk_create(model, docs):
+    """Validate `docs` in one pass and insert the valid ones in one transaction.
+
+    Rows get a new UUID unless the item carries its own `id`. Since every
+    primary key is known before the flush, the unit of work sends each
+    table's inserts as a single executemany.
+    """
+    table = model.__table__
+    required = _required_columns(table)
+    errors, staged = {}, {}
+    for index, doc in enumerate(docs):
+        if not isinstance(doc, dict):
+            errors[index] = 'Item must be an object'
+            continue
+        missing = [column.name for column in required if column.name not in doc]
+        if missing:
+            errors[index] = f"Missing required field(s): {', '.join(missing)}"
+            continue
+        try:
+            values = _coerce_fields(table, doc)
+        except ValueError as e:
+            errors[index] = str(e)
+            continue
+        values['id'] = values.get('id') or str(uuid.uuid4())
+        staged[index] = (values['id'], values)
+
+    _check_constraints(table, staged, errors)
+
+    results, rows = [], []
+    for index in range(len(docs)):
+        if index in errors:
+            results.append({'index': index, 'status': 'error', 'error': errors[index]})
+            continue
+        row = model(**staged[index][1])
+        rows.append(row)
+        results.append({'index': index, 'id': row.id, 'status': 'created'})
+    if rows:
+        db.session.add_all(rows)
+        _commit(results, 'created')
+    return BulkResult(results)
+
+def bulk_update(model, updates):
+    """Apply partial updates (each item names its row by `id`) in one transaction."""
+    table = model.__table__
+    errors, staged, seen = {}, {}, set()
+    ids = [update.get('id') for update in updates if isinstance(update, dict)]
+    rows = {}
+    for chunk in _chunks({row_id for row_id in ids if isinstance(row_id, str)}):
+        for row in model.query.filter(model.id.in_(chunk)):
+            rows[row.id] = row
+
+    for index, update in enumerate(updates):
+        if not isinstance(update, dict) or not update.get('id'):
+            errors[index] = 'Item must be an object with an id'
+            continue
+        if not isinstance(update['id'], str):
+            errors[index] = 'id must be a string'
+            continue
+        if update['id'] not in rows:
+            errors[index] = 'Not found'
+            continue
+        if update['id'] in seen:
+            errors[index] = f"Duplicate id '{update['id']}' in request"
+            continue
+        seen.add(update['id'])
+        fields = {name: value for name, value in update.items() if name != 'id'}
+        try:
+            staged[index] = (update['id'], _coerce_fields(table, fields))
+        except ValueError as e:
+            errors[index] = str(e)
+
+    _check_constraints(table, staged, errors)
+
+    results = []
+    for index, update in enumerate(updates):
+        if index in errors:
+            result = {'index': index, 'status': 'error', 'error': errors[index]}
+            if isinstance(update, dict) and update.get('id'):
+                result['id'] = update['id']
+            results.append(result)
+            continue
+        row_id, values = staged[index]
+        for name, value in values.items():
+            setattr(rows[row_id], name, value)
+        results.append({'index': index, 'id': row_id, 'status': 'updated'})
+    if staged.keys() - errors.keys():
+        _commit(results, 'updated')
+    return BulkResult(results)
+
+def bulk_delete(model, doc_ids):
+    """Delete rows by id in one transaction; rows still referenced are kept."""
+    table = model.__table__
+    rows = {}
+    for chunk in _chunks({doc_id for doc_id in doc_ids if isinstance(doc_id, str)}):
+        for row in model.query.filter(model.id.in_(chunk)):
+            rows[row.id] = row
+
+    referenced = {}
+    for column in _referencing_columns(table):
+        for row_id in _referenced(column, rows):
+            referenced.setdefault(row_id, column.table.name)
+
+    results, seen = [], set()
+    for index, doc_id in enumerate(doc_ids):
+        if not isinstance(doc_id, str):
+            results.append({'index': index, 'id': doc_id, 'status': 'error', 'error': 'id must be a string'})
+        elif doc_id not in rows:
+            results.append({'index': index, 'id': doc_id, 'status': 'error', 'error': 'Not found'})
+        elif doc_id in referenced:
+            results.append({'index': index, 'id': doc_id, 'status': 'error',
+                            'error': f"Still referenced by {referenced[doc_id]}"})
+        elif doc_id in seen:
+            results.append({'index': index, 'id': doc_id, 'status': 'error',
+                            'error': f"Duplicate id '{doc_id}' in request"})
+        else:
+            seen.add(doc_id)
+            db.session.delete(rows[doc_id])
+            results.append({'index': index, 'id': doc_id, 'status': 'deleted'})
+    if seen:
+        _commit(results, 'deleted')
+    return BulkResult(results)
@@ -0,0 +1,122 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip is offered without it
+    brotli = None
+
+# Used when COMPRESS_MIMETYPES is not configured
+DEFAULT_MIMETYPES = (
+    'text/html',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/x-ndjson',
+    'image/svg+xml',
+)
+
+class GzipEncoder:
+    """Incremental gzip (RFC 1952) encoder."""
+
+    def __init__(self, app):
+        self._compressor = zlib.compressobj(app.config.get('COMPRESS_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class BrotliEncoder:
+    """Incremental brotli encoder (needs the optional brotli package)."""
+
+    def __init__(self, app):
+        self._compressor = brotli.Compressor(quality=app.config.get('COMPRESS_BR_QUALITY', 4))
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+# Content-Encoding tokens this process can produce
+ENCODERS = {'gzip': GzipEncoder}
+if brotli is not None:
+    ENCODERS['br'] = BrotliEncoder
+
+def negotiate_encoding(app):
+    """Pick the configured encoding the client accepts best, or None."""
+    offered = [name for name in app.config.get('COMPRESS_ALGORITHMS', ('br', 'gzip')) if name in ENCODERS]
+    return request.accept_encodings.best_match(offered) if offered else None
+
+def compress_chunks(encoder, chunks):
+    """Compress a streamed body chunk by chunk.
+
+    Every chunk is flushed, so a slow stream reaches the client as it is
+    produced rather than when the compressor's window fills.
+    """
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def init_compression(app):
+    """Compress eligible responses with gzip or brotli.
+
+    A response is eligible when its mimetype is in COMPRESS_MIMETYPES and
+    it carries no Content-Encoding or Cache-Control: no-transform. Buffered
+    bodies are compressed when at least COMPRESS_MIN_SIZE bytes; streamed
+    bodies (exports) are compressed on the fly. Register this before other
+    after_request hooks so it runs after them.
+    """
+    mimetypes = frozenset(app.config.get('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES))
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype not in mimetypes
+                or response.status_code < 200 or response.status_code in (204, 206)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding(app)
+        if encoding is None:
+            return response
+
+        if response.status_code != 304:
+            encoder = ENCODERS[encoding](app)
+            if response.is_streamed:
+                response.response = compress_chunks(encoder, response.response)
+                response.headers.pop('Content-Length', None)
+            else:
+                body = response.get_data()
+                if len(body) < min_size:
+                    return response
+                response.set_data(encoder.compress(body) + encoder.finish())
+            response.headers['Content-Encoding'] = encoding
+
+        # The compressed bytes differ from the identity ones, so a strong
+        # validator would be wrong for them
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
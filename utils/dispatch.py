@@ -0,0 +1,243 @@
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # optional; /api/dispatch/plan is unavailable without it
+    np = None
+
+from database import db
+from models.sql_models import Bowser, Location, Deployment
+from utils.spatial import EARTH_RADIUS_KM
+
+# Smallest 2-opt gain, in km, worth applying; guards against float noise
+MIN_IMPROVEMENT_KM = 1e-9
+
+def distance_matrix(lats, lons, to_lats=None, to_lons=None):
+    """Haversine distances in km between every pair of points, as an array.
+
+    Rows are the (lats, lons) points and columns the (to_lats, to_lons)
+    points, which default to the same set.
+    """
+    lat1, lon1 = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lons, dtype=float))
+    if to_lats is None:
+        lat2, lon2 = lat1, lon1
+    else:
+        lat2, lon2 = np.radians(np.asarray(to_lats, dtype=float)), np.radians(np.asarray(to_lons, dtype=float))
+    a = (np.sin((lat2[None, :] - lat1[:, None]) / 2) ** 2
+         + np.cos(lat1)[:, None] * np.cos(lat2)[None, :] * np.sin((lon2[None, :] - lon1[:, None]) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def nearest_neighbour_trips(matrix, demand, capacity):
+    """Split stops into tanker trips with the nearest-neighbour heuristic.
+
+    Node 0 is the depot and nodes 1.. the stops, whose `demand` must not
+    exceed `capacity`. Each trip leaves the depot full and repeatedly
+    drives to the nearest unvisited stop it still has water for; when none
+    fits it returns and the next trip starts. Returns lists of node indices
+    (the depot at either end is implied). Stops that even a full tanker
+    cannot serve are left out.
+    """
+    unvisited = np.ones(len(demand), dtype=bool)
+    unvisited[0] = False
+    trips = []
+    while unvisited.any():
+        trip, current, load = [], 0, capacity
+        while True:
+            reachable = unvisited & (demand <= load)
+            if not reachable.any():
+                break
+            stop = int(np.where(reachable, matrix[current], np.inf).argmin())
+            trip.append(stop)
+            unvisited[stop] = False
+            load -= demand[stop]
+            current = stop
+        if not trip:
+            # Nothing left fits a full tanker; another trip would be empty too
+            break
+        trips.append(trip)
+    return trips
+
+def two_opt(matrix, trip, max_passes=50):
+    """Shorten a depot-to-depot trip by reversing segments (2-opt).
+
+    For each edge the gain of every exchange with a later edge is computed
+    in one vector operation and the best one applied. Passes repeat until
+    none improves the trip or `max_passes` is reached. Load is unchanged,
+    as the same stops are visited.
+    """
+    route = np.array([0, *trip, 0])
+    for _ in range(max_passes):
+        improved = False
+        for i in range(len(route) - 3):
+            a, b = route[i], route[i + 1]
+            c, d = route[i + 2:-1], route[i + 3:]
+            gain = matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+            best = int(gain.argmin())
+            if gain[best] < -MIN_IMPROVEMENT_KM:
+                j = i + 2 + best
+                route[i + 1:j + 1] = route[i + 1:j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return [int(node) for node in route[1:-1]]
+
+def trip_distance(matrix, trip):
+    route = [0, *trip, 0]
+    return float(sum(matrix[a, b] for a, b in zip(route, route[1:])))
+
+def plan_depot(depot, stops, tanker_capacity, improve=True):
+    """Plan the refill trips of one depot's tankers.
+
+    `depot` is a dict with id, latitude, longitude and tankers; `stops` are
+    (bowser id, bowser number, location id, location name, latitude,
+    longitude, litres) tuples. Trips are handed to the depot's tankers
+    longest first, each to the tanker with the least distance so far.
+    Runs without the database, so it can be sent to a worker process.
+    """
+    matrix = distance_matrix(
+        [depot['latitude']] + [stop[4] for stop in stops],
+        [depot['longitude']] + [stop[5] for stop in stops]
+    )
+    # A stop needing more than a tanker holds gets one full load
+    demand = np.minimum(np.array([0.0] + [stop[6] for stop in stops]), tanker_capacity)
+    trips = nearest_neighbour_trips(matrix, demand, tanker_capacity)
+    if improve:
+        trips = [two_opt(matrix, trip) for trip in trips]
+
+    planned = sorted(((trip_distance(matrix, trip), trip) for trip in trips), key=lambda entry: -entry[0])
+    # Tankers beyond the number of trips would stay idle, so they get no heap entry
+    tankers = [(0.0, number) for number in range(1, max(1, min(depot['tankers'], len(planned))) + 1)]
+    output = []
+    for distance, trip in planned:
+        total, tanker = heapq.heappop(tankers)
+        heapq.heappush(tankers, (total + distance, tanker))
+        output.append({
+            'tanker': tanker,
+            'distance_km': round(distance, 3),
+            'litres': float(demand[trip].sum()),
+            'stops': [{
+                'bowser_id': stops[node - 1][0],
+                'bowser_number': stops[node - 1][1],
+                'location_id': stops[node - 1][2],
+                'location_name': stops[node - 1][3],
+                'latitude': stops[node - 1][4],
+                'longitude': stops[node - 1][5],
+                'litres': float(demand[node]),
+            } for node in trip],
+        })
+    output.sort(key=lambda entry: entry['tanker'])
+    return {
+        'depot': depot,
+        'trips': output,
+        'summary': {
+            'stops': len(stops),
+            'trips': len(output),
+            'litres': sum(trip['litres'] for trip in output),
+            'distance_km': round(sum(distance for distance, _ in planned), 3),
+            'longest_tanker_km': round(max(total for total, _ in tankers), 3),
+        },
+    }
+
+def refill_stops(threshold, bowser_ids=None):
+    """Deployed bowsers below `threshold` of capacity, as plan_depot stops.
+
+    Litres are what tops each bowser up to capacity. Bowsers whose active
+    deployment's location has no coordinates cannot be routed and are left
+    out.
+    """
+    query = db.session.query(
+        Bowser.id, Bowser.number, Location.id, Location.name,
+        Location.latitude, Location.longitude, Bowser.capacity - Bowser.current_level
+    ).join(Deployment, Deployment.bowser_id == Bowser.id).join(
+        Location, Location.id == Deployment.location_id
+    ).filter(
+        Deployment.status == 'active',
+        Location.latitude.isnot(None),
+        Location.longitude.isnot(None),
+        Bowser.current_level < Bowser.capacity * threshold
+    )
+    if bowser_ids is not None:
+        query = query.filter(Bowser.id.in_(bowser_ids))
+    stops = {}
+    for row in query.order_by(Bowser.id):
+        stops.setdefault(row[0], tuple(row))
+    return list(stops.values())
+
+def assign_to_depots(depots, stops):
+    """Group stops by their nearest depot; returns one list per depot."""
+    groups = [[] for _ in depots]
+    if stops:
+        matrix = distance_matrix(
+            [stop[4] for stop in stops], [stop[5] for stop in stops],
+            [depot['latitude'] for depot in depots], [depot['longitude'] for depot in depots]
+        )
+        for stop, nearest in zip(stops, matrix.argmin(axis=1)):
+            groups[nearest].append(stop)
+    return groups
+
+def plan_dispatch(depots, stops, tanker_capacity, improve=True, workers=1):
+    """Yield plan_depot() results for each depot, in the order given.
+
+    Stops go to their nearest depot. With `workers` > 1 and several depots
+    the depots are planned in a process pool; results are still yielded as
+    soon as each one (in order) is ready, so they can be streamed.
+    """
+    groups = assign_to_depots(depots, stops)
+    arguments = (depots, groups, [tanker_capacity] * len(depots), [improve] * len(depots))
+    if workers > 1 and len(depots) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(depots))) as executor:
+            yield from executor.map(plan_depot, *arguments)
+    else:
+        yield from map(plan_depot, *arguments)
+
+def parse_dispatch_request(data, config):
+    """Validate a /api/dispatch/plan body; raises ValueError on bad input.
+
+    Returns (depots, tanker capacity, refill threshold, bowser ids or None,
+    improve).
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    raw_depots = data.get('depots')
+    if not isinstance(raw_depots, list) or not raw_depots:
+        raise ValueError("'depots' must be a non-empty array")
+    if len(raw_depots) > config['DISPATCH_MAX_DEPOTS']:
+        raise ValueError(f"At most {config['DISPATCH_MAX_DEPOTS']} depots per plan")
+    depots = []
+    for number, depot in enumerate(raw_depots, 1):
+        if not isinstance(depot, dict):
+            raise ValueError(f"Depot {number} must be an object")
+        try:
+            latitude, longitude = float(depot['latitude']), float(depot['longitude'])
+        except (KeyError, TypeError, ValueError, OverflowError):
+            raise ValueError(f"Depot {number} needs numeric latitude and longitude")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError(f"Depot {number} coordinates are out of range")
+        tankers = depot.get('tankers', 1)
+        if isinstance(tankers, float) and tankers.is_integer():
+            tankers = int(tankers)
+        if isinstance(tankers, bool) or not isinstance(tankers, int):
+            raise ValueError(f"Depot {number} tankers must be a whole number")
+        if not 1 <= tankers <= config['DISPATCH_MAX_TANKERS']:
+            raise ValueError(f"Depot {number} needs between 1 and {config['DISPATCH_MAX_TANKERS']} tankers")
+        depots.append({'id': str(depot.get('id', number)), 'latitude': latitude,
+                       'longitude': longitude, 'tankers': tankers})
+
+    try:
+        tanker_capacity = float(data.get('tanker_capacity', config['DISPATCH_TANKER_CAPACITY']))
+        threshold = float(data.get('threshold', config['DISPATCH_REFILL_THRESHOLD']))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('tanker_capacity and threshold must be numbers')
+    if not (math.isfinite(tanker_capacity) and math.isfinite(threshold)):
+        raise ValueError('tanker_capacity and threshold must be finite numbers')
+    if tanker_capacity <= 0:
+        raise ValueError('tanker_capacity must be positive')
+    if not 0 < threshold <= 1:
+        raise ValueError('threshold must be above 0 and at most 1')
+    bowser_ids = data.get('bowser_ids')
+    if bowser_ids is not None and not (isinstance(bowser_ids, list)
+                                       and all(isinstance(bowser_id, str) for bowser_id in bowser_ids)):
+        raise ValueError("'bowser_ids' must be an array of ids")
+    return depots, tanker_capacity, threshold, bowser_ids, bool(data.get('improve', True))
@@ -0,0 +1,80 @@
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+class Subscription:
+    """A subscriber's bounded event queue.
+
+    A subscriber that falls more than `maxsize` events behind is marked as
+    overflowed instead of blocking publishers; it should resynchronise (for
+    example through /api/sync) and subscribe again.
+    """
+
+    def __init__(self, topics: Optional[Iterable[str]] = None, maxsize: int = 256):
+        self.topics = frozenset(topics) if topics else None
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def offer(self, event: Dict):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: Optional[float] = None) -> Dict:
+        """Wait for the next event; raises queue.Empty on timeout."""
+        return self.queue.get(timeout=timeout)
+
+class EventBroker:
+    """In-process fan-out of events to any number of subscribers.
+
+    Only subscribers in the same process see an event, so every worker
+    process keeps its own broker fed by its own writes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._listeners = []
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None, maxsize: int = 256) -> Subscription:
+        subscription = Subscription(topics, maxsize)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def listen(self, callback: Callable[[str, Dict], None], topics: Optional[Iterable[str]] = None):
+        """Call `callback(topic, event)` synchronously on every matching publish.
+
+        Listeners run on the publishing thread, so they must be quick and
+        must not raise; use them for cache invalidation, not for I/O.
+        """
+        topics = frozenset(topics) if topics else None
+        with self._lock:
+            self._listeners.append((topics, callback))
+
+    def publish(self, topic: str, event: Dict):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            listeners = list(self._listeners)
+        for topics, callback in listeners:
+            if topics is None or topic in topics:
+                callback(topic, event)
+        for subscription in subscriptions:
+            if subscription.wants(topic):
+                subscription.offer(event)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+# Shared broker for model change events
+change_broker = EventBroker()
@@ -0,0 +1,82 @@
+import csv
+import io
+from collections import OrderedDict
+from database import db
+from models.sql_models import Bowser, Location, Deployment, Maintenance, Alert, Invoice, Partner
+from utils.json_provider import dumps_compact
+from utils.serialization import projected_columns, row_serializer, json_value
+
+# Collections available through /api/export/<collection>
+EXPORT_COLLECTIONS = OrderedDict([
+    ('bowsers', Bowser),
+    ('locations', Location),
+    ('deployments', Deployment),
+    ('maintenance', Maintenance),
+    ('alerts', Alert),
+    ('invoices', Invoice),
+    ('partners', Partner),
+])
+# Finance data is admin-only, as on the /finance pages
+ADMIN_EXPORT_COLLECTIONS = frozenset(['invoices', 'partners'])
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Rows fetched per round trip to the cursor
+EXPORT_BATCH_SIZE = 1000
+# Serialized bytes gathered before a chunk is handed to the server
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+def export_rows(model, fields=None, batch_size=EXPORT_BATCH_SIZE):
+    """Return (columns, row iterator) for every row of `model`.
+
+    Rows are plain column tuples read through a streaming cursor with
+    yield_per, in primary key order, so no ORM objects are built and only
+    one batch is held in memory at a time.
+    """
+    columns = projected_columns(model, fields)
+    primary_key = list(model.__table__.primary_key.columns)
+    query = db.session.query(*columns).order_by(*primary_key).yield_per(batch_size)
+    return columns, iter(query)
+
+def _chunked(lines, chunk_bytes):
+    """Join serialized lines into chunks of roughly `chunk_bytes`."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+def ndjson_chunks(model, fields=None, chunk_bytes=EXPORT_CHUNK_BYTES):
+    """Stream `model` as newline-delimited JSON, one object per row."""
+    columns, rows = export_rows(model, fields)
+    serialize = row_serializer(columns)
+    lines = (dumps_compact(serialize(row)) + '\n' for row in rows)
+    return _chunked(lines, chunk_bytes)
+
+def csv_chunks(model, fields=None, chunk_bytes=EXPORT_CHUNK_BYTES):
+    """Stream `model` as CSV with a header row; NULLs become empty cells."""
+    columns, rows = export_rows(model, fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def lines():
+        writer.writerow([column.name for column in columns])
+        yield _drain(buffer)
+        for row in rows:
+            writer.writerow([json_value(value) for value in row])
+            yield _drain(buffer)
+
+    return _chunked(lines(), chunk_bytes)
+
+def _drain(buffer):
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
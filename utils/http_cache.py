@@ -0,0 +1,54 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from flask_login import current_user
+from models.change_tracking import collection_stamps
+
+def collections_etag(collections):
+    """Build a strong ETag and Last-Modified time for the current request.
+
+    The tag covers the version stamps of the collections a view reads, the
+    full request path (so ?limit=/?fields= variants differ) and the
+    signed-in user (so per-user markup is never shared).
+    """
+    stamps = collection_stamps(collections)
+    user_id = current_user.get_id() if current_user.is_authenticated else ''
+    parts = [request.full_path, str(user_id)]
+    parts += [f"{name}:{version}:{changed_at.isoformat() if changed_at else ''}"
+              for name, (version, changed_at) in sorted(stamps.items())]
+    etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+    changes = [changed_at for version, changed_at in stamps.values() if changed_at]
+    return etag, max(changes) if changes else None
+
+def not_modified(etag):
+    """True when the request's If-None-Match holds `etag`.
+
+    If-Modified-Since is not used: HTTP dates have one-second resolution,
+    so a second write in the same second would still be answered with a
+    304. Last-Modified is sent for information only.
+    """
+    # Weak comparison, since compression weakens the ETag sent
+    return bool(request.if_none_match) and request.if_none_match.contains_weak(etag)
+
+def conditional_get(*collections):
+    """Answer GETs with 304 Not Modified when none of `collections` changed.
+
+    The version check costs one small change_log query; the wrapped view,
+    and so the row queries and serialization, only runs when the client's
+    If-None-Match validator is stale (see not_modified()).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag, last_modified = collections_etag(collections)
+            response = make_response('', 304) if not_modified(etag) else make_response(f(*args, **kwargs))
+            if response.status_code not in (200, 304):
+                return response
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache' if current_user.is_authenticated else 'no-cache'
+            response.vary.add('Cookie')
+            return response
+        return decorated_function
+    return decorator
@@ -1,13 +1,218 @@
+import bisect
+import heapq
 import json
 import os
+import threading
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterable
+
+def _compare(compare):
+    """Range operator that never matches None or values of another type."""
+    def operator(value, operand):
+        if value is None:
+            return False
+        try:
+            return compare(value, operand)
+        except TypeError:
+            return False
+    return operator
+
+_OPERATORS = {
+    '$eq': lambda value, operand: value == operand,
+    '$ne': lambda value, operand: value != operand,
+    '$in': lambda value, operand: value in operand,
+    '$nin': lambda value, operand: value not in operand,
+    '$gt': _compare(lambda value, operand: value > operand),
+    '$gte': _compare(lambda value, operand: value >= operand),
+    '$lt': _compare(lambda value, operand: value < operand),
+    '$lte': _compare(lambda value, operand: value <= operand),
+}
+_RANGE_OPERATORS = ('$gt', '$gte', '$lt', '$lte')
+
+def _is_operator(condition: Any) -> bool:
+    return isinstance(condition, dict) and bool(condition) and all(
+        str(key).startswith('$') for key in condition
+    )
+
+def _sort_key(value: Any):
+    """Order key: missing/None values first, then numbers, strings and other types.
+
+    Values of different types never compare directly, so a field holding
+    mixed types can still be sorted and indexed.
+    """
+    if value is None:
+        return (0,)
+    if isinstance(value, (int, float)):
+        return (1, 0, value)
+    if isinstance(value, str):
+        return (1, 1, value)
+    return (1, 2, type(value).__name__, json.dumps(value, sort_keys=True, default=str))
+
+def match_document(doc: Dict, query: Dict) -> bool:
+    """Return True if a document satisfies every condition in the query.
+
+    A condition is an exact value, or a dict of operators such as
+    {'$in': [...]}, {'$gte': ..., '$lt': ...} or {'$ne': ...}.
+    """
+    for key, condition in query.items():
+        if key not in doc:
+            return False
+        value = doc[key]
+        if _is_operator(condition):
+            for op, operand in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported query operator '{op}'")
+                if not _OPERATORS[op](value, operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+def select_documents(docs: Iterable[Dict], query: Optional[Dict] = None, order_by: Optional[str] = None,
+                     descending: bool = False, limit: Optional[int] = None) -> List[Dict]:
+    """Filter, order and truncate documents with a linear scan."""
+    if limit is not None and (not isinstance(limit, int) or limit < 0):
+        raise ValueError('limit must be a non-negative integer')
+    results = (doc for doc in docs if match_document(doc, query or {}))
+    if order_by:
+        key = lambda doc: _sort_key(doc.get(order_by))
+        if limit is not None:
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            return pick(limit, results, key=key)
+        return sorted(results, key=key, reverse=descending)
+    if limit is not None:
+        return list(islice(results, limit))
+    return list(results)
+
+class _HashIndex:
+    """Secondary index mapping a field value to the documents holding it."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.buckets: Dict[Any, Dict[str, Dict]] = {}
+
+    def add(self, doc: Dict):
+        try:
+            self.buckets.setdefault(doc.get(self.field), {})[str(doc.get('id'))] = doc
+        except TypeError:
+            # Unhashable values (lists, dicts) are left to the scan path
+            pass
+
+    def remove(self, doc: Dict):
+        try:
+            bucket = self.buckets.get(doc.get(self.field))
+        except TypeError:
+            return
+        if bucket is not None:
+            bucket.pop(str(doc.get('id')), None)
+            if not bucket:
+                del self.buckets[doc.get(self.field)]
+
+    def candidates(self, condition: Any) -> Optional[List[Dict]]:
+        """Return matching candidates for an equality/$in condition, or None."""
+        if _is_operator(condition):
+            if '$eq' in condition:
+                values = [condition['$eq']]
+            elif '$in' in condition:
+                values = list(condition['$in'])
+            else:
+                return None
+        else:
+            values = [condition]
+        docs = []
+        try:
+            for value in dict.fromkeys(values):
+                docs.extend(self.buckets.get(value, {}).values())
+        except TypeError:
+            return None
+        return docs
+
+class _SortedIndex:
+    """Secondary index keeping documents ordered by a field, for ranges and sorting."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.keys: List[Any] = []
+        self.docs: List[Dict] = []
+
+    def add(self, doc: Dict):
+        key = _sort_key(doc.get(self.field))
+        position = bisect.bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.docs.insert(position, doc)
+
+    def remove(self, doc: Dict):
+        key = _sort_key(doc.get(self.field))
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_right(self.keys, key)
+        for position in range(lo, hi):
+            if self.docs[position] is doc:
+                del self.keys[position]
+                del self.docs[position]
+                return
+
+    def scan(self, condition: Optional[Dict] = None, descending: bool = False) -> List[Dict]:
+        """Return documents in key order, optionally bounded by range operators."""
+        lo, hi = 0, len(self.keys)
+        if condition:
+            if '$eq' in condition:
+                lo = bisect.bisect_left(self.keys, _sort_key(condition['$eq']))
+                hi = bisect.bisect_right(self.keys, _sort_key(condition['$eq']))
+            if '$gte' in condition:
+                lo = max(lo, bisect.bisect_left(self.keys, _sort_key(condition['$gte'])))
+            if '$gt' in condition:
+                lo = max(lo, bisect.bisect_right(self.keys, _sort_key(condition['$gt'])))
+            if '$lte' in condition:
+                hi = min(hi, bisect.bisect_right(self.keys, _sort_key(condition['$lte'])))
+            if '$lt' in condition:
+                hi = min(hi, bisect.bisect_left(self.keys, _sort_key(condition['$lt'])))
+            if any(op in condition for op in _RANGE_OPERATORS):
+                # Range operators never match missing values
+                lo = max(lo, bisect.bisect_left(self.keys, (1,)))
+        docs = self.docs[lo:hi] if lo < hi else []
+        return docs[::-1] if descending else docs
 
 class JsonHandler:
-    def __init__(self, file_path: str):
+    """JSON document store backed by a single file.
+
+    Engines:
+        'file'    - parse the whole file on every call (original behaviour).
+        'memory'  - keep collections resident with per-collection id indexes and
+                    only reload when the file's mtime, inode or size changes.
+        'journal' - like 'memory', but mutations are appended as JSON lines to
+                    '<file>.log' and folded into a new snapshot once the log
+                    grows past compact_threshold bytes.
+
+    The resident engines also maintain declared secondary indexes ('hash' for
+    equality/$in lookups, 'sorted' for ranges and ordering) which query() uses
+    to avoid scanning whole collections.
+    """
+    ENGINES = ('file', 'memory', 'journal')
+    INDEX_KINDS = {'hash': _HashIndex, 'sorted': _SortedIndex}
+    DEFAULT_COMPACT_THRESHOLD = 4 * 1024 * 1024
+
+    def __init__(self, file_path: str, engine: str = 'file',
+                 compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+                 indexes: Optional[Dict[str, Dict[str, str]]] = None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown JsonHandler engine '{engine}'")
         self.file_path = file_path
+        self.log_path = file_path + '.log'
+        self.engine = engine
+        self.compact_threshold = compact_threshold
+        self._resident = engine in ('memory', 'journal')
+        self._lock = threading.RLock()
+        self._data: Optional[Dict] = None
+        self._id_indexes: Dict[str, Dict[str, Dict]] = {}
+        self._index_specs: Dict[str, Dict[str, str]] = {}
+        self._secondary_indexes: Dict[str, Dict[str, Any]] = {}
+        self._file_stamp = None
         self.ensure_file_exists()
+        for collection, fields in (indexes or {}).items():
+            for field, kind in fields.items():
+                self.create_index(collection, field, kind)
 
     def ensure_file_exists(self):
         """Ensure the JSON file exists with initial structure."""
@@ -26,27 +231,208 @@ class JsonHandler:
             with open(self.file_path, 'w') as f:
                 json.dump(initial_data, f, indent=4)
 
-    def load_data(self) -> Dict:
-        """Load data from the JSON file."""
+    @staticmethod
+    def _path_stamp(path: str):
+        """Return an (mtime, inode, size) stamp for a file, or None if missing."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _stat_stamp(self):
+        """Return the stamp used to detect changes made by other processes."""
+        if self.engine == 'journal':
+            return (self._path_stamp(self.file_path), self._path_stamp(self.log_path))
+        return self._path_stamp(self.file_path)
+
+    def _read_file(self) -> Dict:
         try:
             with open(self.file_path, 'r') as f:
                 return json.load(f)
         except (json.JSONDecodeError, FileNotFoundError):
             return {}
 
+    def _rebuild_id_indexes(self):
+        self._id_indexes = {
+            collection: {str(doc.get('id')): doc for doc in docs}
+            for collection, docs in self._data.items()
+            if isinstance(docs, list)
+        }
+
+    def _rebuild_secondary_indexes(self):
+        self._secondary_indexes = {}
+        for collection, fields in self._index_specs.items():
+            for field, kind in fields.items():
+                self._build_index(collection, field, kind)
+
+    def _rebuild_indexes(self):
+        self._rebuild_id_indexes()
+        self._rebuild_secondary_indexes()
+
+    def _build_index(self, collection: str, field: str, kind: str):
+        index = self.INDEX_KINDS[kind](field)
+        for doc in (self._data or {}).get(collection, []):
+            index.add(doc)
+        self._secondary_indexes.setdefault(collection, {})[field] = index
+
+    def create_index(self, collection: str, field: str, kind: str = 'hash'):
+        """Declare a secondary index on a collection field ('hash' or 'sorted').
+
+        Indexes are only maintained by the resident engines; the 'file' engine
+        accepts the declaration but keeps scanning.
+        """
+        if kind not in self.INDEX_KINDS:
+            raise ValueError(f"Unknown index kind '{kind}'")
+        with self._lock:
+            self._index_specs.setdefault(collection, {})[field] = kind
+            if self._data is not None:
+                self._build_index(collection, field, kind)
+
+    def _index_doc(self, collection: str, doc: Dict):
+        self._id_index(collection)[str(doc['id'])] = doc
+        for index in self._secondary_indexes.get(collection, {}).values():
+            index.add(doc)
+
+    def _unindex_doc(self, collection: str, doc: Dict):
+        self._id_index(collection).pop(str(doc.get('id')), None)
+        for index in self._secondary_indexes.get(collection, {}).values():
+            index.remove(doc)
+
+    def _id_index(self, collection: str) -> Dict[str, Dict]:
+        """Return the id -> document index for a collection (resident engines)."""
+        index = self._id_indexes.get(collection)
+        if index is None:
+            index = self._id_indexes[collection] = {}
+        return index
+
+    def load_data(self) -> Dict:
+        """Load data from the JSON file, or from memory when it is unchanged."""
+        if self.engine == 'file':
+            return self._read_file()
+
+        with self._lock:
+            stamp = self._stat_stamp()
+            if self._data is None or stamp != self._file_stamp:
+                self._data = self._read_file()
+                self._rebuild_id_indexes()
+                if self.engine == 'journal':
+                    self._replay_log()
+                self._rebuild_secondary_indexes()
+                self._file_stamp = stamp
+            return self._data
+
     def save_data(self, data: Dict):
         """Save data to the JSON file."""
-        with open(self.file_path, 'w') as f:
+        with self._lock:
+            if self.engine == 'journal':
+                self._data = data
+                self._rebuild_indexes()
+                self._write_snapshot(data)
+                return
+            with open(self.file_path, 'w') as f:
+                json.dump(data, f, indent=4)
+            if self._resident:
+                if data is not self._data:
+                    self._data = data
+                    self._rebuild_indexes()
+                self._file_stamp = self._stat_stamp()
+
+    # --- Journal engine ---
+
+    def _apply_entry(self, entry: Dict):
+        """Apply one logged mutation to the resident data. Safe to re-apply."""
+        collection = entry['collection']
+        docs = self._data.setdefault(collection, [])
+        index = self._id_index(collection)
+        doc_id = str(entry['id'])
+        op = entry['op']
+
+        if op == 'create':
+            existing = index.get(doc_id)
+            if existing is not None:
+                existing.clear()
+                existing.update(entry['doc'])
+            else:
+                doc = dict(entry['doc'])
+                docs.append(doc)
+                index[doc_id] = doc
+        elif op == 'update':
+            doc = index.get(doc_id)
+            if doc is not None:
+                doc.update(entry['changes'])
+        elif op == 'delete':
+            doc = index.pop(doc_id, None)
+            if doc is not None:
+                docs.remove(doc)
+
+    def _replay_log(self):
+        """Fold the mutation log on top of the freshly loaded snapshot."""
+        try:
+            with open(self.log_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted append
+                        break
+                    self._apply_entry(entry)
+        except FileNotFoundError:
+            pass
+
+    def _append_log(self, entries: List[Dict]):
+        lines = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+        with open(self.log_path, 'a') as f:
+            f.write(lines)
+            f.flush()
+        self._file_stamp = self._stat_stamp()
+        if os.path.getsize(self.log_path) >= self.compact_threshold:
+            self.compact()
+
+    def _write_snapshot(self, data: Dict):
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+        # Log entries are idempotent, so a crash before truncation is harmless
+        open(self.log_path, 'w').close()
+        self._file_stamp = self._stat_stamp()
+
+    def compact(self):
+        """Fold the mutation log into a new snapshot and truncate the log.
+
+        The snapshot is written to a temporary file and atomically renamed over
+        the old one, so a crash leaves either the old or the new snapshot intact.
+        """
+        if self.engine != 'journal':
+            return
+        with self._lock:
+            self._write_snapshot(self.load_data())
+
+    def _persist(self, data: Dict, entries: List[Dict]):
+        """Persist a mutation, as log entries when journaling or a full rewrite otherwise."""
+        if self.engine == 'journal':
+            self._append_log(entries)
+        else:
+            self.save_data(data)
+
+    # --- Collection operations ---
 
     def get_all(self, collection: str) -> List[Dict]:
         """Get all documents from a collection."""
         data = self.load_data()
+        if self._resident:
+            # Hand out a copy so callers sorting in place don't reorder the cache
+            return list(data.get(collection, []))
         return data.get(collection, [])
 
     def get_by_id(self, collection: str, doc_id: str) -> Optional[Dict]:
         """Get a document by its ID from a collection."""
         data = self.load_data()
+        if self._resident:
+            return self._id_index(collection).get(str(doc_id))
         for doc in data.get(collection, []):
             if str(doc.get('id')) == str(doc_id):
                 return doc
@@ -54,111 +440,194 @@ class JsonHandler:
 
     def create(self, collection: str, doc: Dict) -> Dict:
         """Create a new document in a collection."""
-        data = self.load_data()
-        if collection not in data:
-            data[collection] = []
+        with self._lock:
+            data = self.load_data()
+            if collection not in data:
+                data[collection] = []
 
-        # Generate a new ID if not provided
-        if 'id' not in doc:
-            doc['id'] = str(uuid.uuid4())
+            # Generate a new ID if not provided
+            if 'id' not in doc:
+                doc['id'] = str(uuid.uuid4())
 
-        # Add timestamps
-        doc['created_at'] = datetime.utcnow().isoformat()
-        doc['updated_at'] = doc['created_at']
+            # Add timestamps
+            doc['created_at'] = datetime.utcnow().isoformat()
+            doc['updated_at'] = doc['created_at']
 
-        data[collection].append(doc)
-        self.save_data(data)
-        return doc
+            data[collection].append(doc)
+            if self._resident:
+                self._index_doc(collection, doc)
+            self._persist(data, [{'op': 'create', 'collection': collection, 'id': doc['id'], 'doc': doc}])
+            return doc
 
     def update(self, collection: str, doc_id: str, updates: Dict) -> Optional[Dict]:
         """Update a document in a collection."""
-        data = self.load_data()
-        for doc in data.get(collection, []):
-            if str(doc.get('id')) == str(doc_id):
-                doc.update(updates)
-                doc['updated_at'] = datetime.utcnow().isoformat()
-                self.save_data(data)
+        with self._lock:
+            data = self.load_data()
+            if self._resident:
+                doc = self._id_index(collection).get(str(doc_id))
+                if doc is None:
+                    return None
+                changes = dict(updates, updated_at=datetime.utcnow().isoformat())
+                self._unindex_doc(collection, doc)
+                doc.update(changes)
+                self._index_doc(collection, doc)
+                self._persist(data, [{'op': 'update', 'collection': collection, 'id': doc_id, 'changes': changes}])
                 return doc
-        return None
+
+            for doc in data.get(collection, []):
+                if str(doc.get('id')) == str(doc_id):
+                    doc.update(updates)
+                    doc['updated_at'] = datetime.utcnow().isoformat()
+                    self.save_data(data)
+                    return doc
+            return None
 
     def delete(self, collection: str, doc_id: str) -> bool:
         """Delete a document from a collection."""
-        data = self.load_data()
-        if collection not in data:
+        with self._lock:
+            data = self.load_data()
+            if collection not in data:
+                return False
+            if self._resident:
+                doc = self._id_index(collection).get(str(doc_id))
+                if doc is None:
+                    return False
+                self._unindex_doc(collection, doc)
+                data[collection].remove(doc)
+                self._persist(data, [{'op': 'delete', 'collection': collection, 'id': doc_id}])
+                return True
+
+            initial_length = len(data[collection])
+            data[collection] = [doc for doc in data[collection] if str(doc.get('id')) != str(doc_id)]
+            if len(data[collection]) < initial_length:
+                self.save_data(data)
+                return True
             return False
 
-        initial_length = len(data[collection])
-        data[collection] = [doc for doc in data[collection] if str(doc.get('id')) != str(doc_id)]
-        if len(data[collection]) < initial_length:
-            self.save_data(data)
-            return True
-        return False
+    def query(self, collection: str, query: Optional[Dict] = None, order_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None) -> List[Dict]:
+        """Query documents in a collection.
 
-    def query(self, collection: str, query: Dict) -> List[Dict]:
-        """Query documents in a collection."""
+        Conditions are exact matches unless given as operator dicts, e.g.
+        {'status': {'$in': ['active', 'pending']}, 'start_date': {'$gte': '2025-01-01'}}.
+        Results can be ordered by a field and truncated to `limit`, which must
+        be a non-negative integer (ValueError otherwise). Declared hash
+        indexes narrow equality/$in conditions and sorted indexes serve range
+        conditions and ordering without a full scan.
+        """
         data = self.load_data()
-        results = []
-        for doc in data.get(collection, []):
-            matches = True
-            for key, value in query.items():
-                if key not in doc or doc[key] != value:
-                    matches = False
-                    break
-            if matches:
-                results.append(doc)
-        return results
+        query = query or {}
+        if not self._resident:
+            return select_documents(data.get(collection, []), query, order_by, descending, limit)
+
+        with self._lock:
+            indexes = self._secondary_indexes.get(collection, {})
+            candidates, ordered = None, False
+
+            for field, condition in query.items():
+                index = indexes.get(field)
+                if isinstance(index, _HashIndex):
+                    candidates = index.candidates(condition)
+                    if candidates is not None:
+                        break
+
+            if candidates is None:
+                for field, condition in query.items():
+                    index = indexes.get(field)
+                    if isinstance(index, _SortedIndex) and _is_operator(condition):
+                        ordered = order_by == field
+                        candidates = index.scan(condition, descending=ordered and descending)
+                        break
+
+            if candidates is None and isinstance(indexes.get(order_by), _SortedIndex):
+                candidates = indexes[order_by].scan(descending=descending)
+                ordered = True
+
+            if candidates is None:
+                candidates = data.get(collection, [])
+
+            if ordered:
+                return select_documents(candidates, query, limit=limit)
+            return select_documents(candidates, query, order_by, descending, limit)
 
     def bulk_create(self, collection: str, docs: List[Dict]) -> List[Dict]:
         """Create multiple documents in a collection."""
-        data = self.load_data()
-        if collection not in data:
-            data[collection] = []
+        with self._lock:
+            data = self.load_data()
+            if collection not in data:
+                data[collection] = []
 
-        created_docs = []
-        for doc in docs:
-            # Generate a new ID if not provided
-            if 'id' not in doc:
-                doc['id'] = str(uuid.uuid4())
+            created_docs = []
+            for doc in docs:
+                # Generate a new ID if not provided
+                if 'id' not in doc:
+                    doc['id'] = str(uuid.uuid4())
 
-            # Add timestamps
-            doc['created_at'] = datetime.utcnow().isoformat()
-            doc['updated_at'] = doc['created_at']
+                # Add timestamps
+                doc['created_at'] = datetime.utcnow().isoformat()
+                doc['updated_at'] = doc['created_at']
 
-            data[collection].append(doc)
-            created_docs.append(doc)
+                data[collection].append(doc)
+                if self._resident:
+                    self._index_doc(collection, doc)
+                created_docs.append(doc)
 
-        self.save_data(data)
-        return created_docs
+            self._persist(data, [
+                {'op': 'create', 'collection': collection, 'id': doc['id'], 'doc': doc}
+                for doc in created_docs
+            ])
+            return created_docs
 
     def bulk_update(self, collection: str, updates: List[Dict]) -> List[Dict]:
         """Update multiple documents in a collection."""
-        data = self.load_data()
-        updated_docs = []
-        for update in updates:
-            doc_id = update.get('id')
-            if not doc_id:
-                continue
+        with self._lock:
+            data = self.load_data()
+            updated_docs = []
+            entries = []
+            for update in updates:
+                doc_id = update.get('id')
+                if not doc_id:
+                    continue
 
-            for doc in data.get(collection, []):
-                if str(doc.get('id')) == str(doc_id):
-                    doc.update(update)
-                    doc['updated_at'] = datetime.utcnow().isoformat()
-                    updated_docs.append(doc)
-                    break
+                if self._resident:
+                    doc = self._id_index(collection).get(str(doc_id))
+                    if doc is not None:
+                        changes = dict(update, updated_at=datetime.utcnow().isoformat())
+                        self._unindex_doc(collection, doc)
+                        doc.update(changes)
+                        self._index_doc(collection, doc)
+                        updated_docs.append(doc)
+                        entries.append({'op': 'update', 'collection': collection, 'id': doc_id, 'changes': changes})
+                    continue
 
-        if updated_docs:
-            self.save_data(data)
-        return updated_docs
+                for doc in data.get(collection, []):
+                    if str(doc.get('id')) == str(doc_id):
+                        doc.update(update)
+                        doc['updated_at'] = datetime.utcnow().isoformat()
+                        updated_docs.append(doc)
+                        break
+
+            if updated_docs:
+                self._persist(data, entries)
+            return updated_docs
 
     def bulk_delete(self, collection: str, doc_ids: List[str]) -> int:
         """Delete multiple documents from a collection."""
-        data = self.load_data()
-        if collection not in data:
-            return 0
+        with self._lock:
+            data = self.load_data()
+            if collection not in data:
+                return 0
 
-        initial_length = len(data[collection])
-        data[collection] = [doc for doc in data[collection] if str(doc.get('id')) not in doc_ids]
-        deleted_count = initial_length - len(data[collection])
-        if deleted_count > 0:
-            self.save_data(data)
-        return deleted_count 
\ No newline at end of file
+            kept, removed = [], []
+            for doc in data[collection]:
+                (removed if str(doc.get('id')) in doc_ids else kept).append(doc)
+            if removed:
+                data[collection] = kept
+                if self._resident:
+                    for doc in removed:
+                        self._unindex_doc(collection, doc)
+                self._persist(data, [
+                    {'op': 'delete', 'collection': collection, 'id': doc.get('id')}
+                    for doc in removed
+                ])
+            return len(removed)
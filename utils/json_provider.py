@@ -0,0 +1,60 @@
+import json
+import logging
+from flask.json import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used without it
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+class OrjsonEncoder(JSONEncoder):
+    """Flask JSON encoder that hands whole documents to orjson.
+
+    json.dumps() (and so jsonify() and the tojson filter) call encode()
+    once per document, so overriding it swaps the encoder without touching
+    any view. Dates are passed back to JSONEncoder.default() and keys are
+    sorted when JSON_SORT_KEYS asks for it, so the output carries the same
+    values as the stdlib encoder. Anything orjson rejects (e.g. integers
+    over 64 bits) falls back to the stdlib path.
+    """
+
+    def encode(self, o):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.indent is not None:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(o, default=self.default, option=option).decode()
+        except TypeError:
+            return super().encode(o)
+
+# Encoders selectable with JSON_BACKEND
+JSON_BACKENDS = {
+    'stdlib': JSONEncoder,
+}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = OrjsonEncoder
+
+def dumps_compact(obj):
+    """Serialize `obj` without whitespace, through orjson when available.
+
+    For hot paths outside jsonify() such as per-row streaming; values must
+    already be JSON types (see utils.serialization.row_serializer).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(',', ':'))
+
+def init_json_provider(app):
+    """Register the encoder chosen by JSON_BACKEND ('auto' prefers orjson)."""
+    backend = app.config.get('JSON_BACKEND', 'auto')
+    if backend == 'auto':
+        backend = 'orjson' if 'orjson' in JSON_BACKENDS else 'stdlib'
+    elif backend not in JSON_BACKENDS:
+        logger.warning(f"JSON backend '{backend}' is not available, using stdlib")
+        backend = 'stdlib'
+    app.json_encoder = JSON_BACKENDS[backend]
+    app.extensions['json_backend'] = backend
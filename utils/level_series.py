@@ -0,0 +1,262 @@
+import math
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import bindparam, func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from database import db
+from models.sql_models import Bowser, LevelReading, LevelRollup
+from utils.bulk import BulkResult
+
+# Rollup bucket widths in seconds, finest first: 1 minute, 1 hour, 1 day
+RESOLUTIONS = (60, 3600, 86400)
+RESOLUTION_NAMES = {'1m': 60, '1h': 3600, '1d': 86400}
+# Readings stamped further ahead than this are rejected as clock errors
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+_EPOCH = datetime(1970, 1, 1)
+# Keeps IN lists under SQLite's 999 parameters
+_IN_CHUNK_SIZE = 400
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        yield values[start:start + _IN_CHUNK_SIZE]
+
+def bucket_start(moment, resolution):
+    """Start of the `resolution`-second bucket holding `moment`."""
+    seconds = (moment - _EPOCH) // timedelta(seconds=1)
+    return _EPOCH + timedelta(seconds=seconds - seconds % resolution)
+
+def parse_timestamp(value, name):
+    """Parse an ISO timestamp to a naive UTC datetime; raises ValueError."""
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be an ISO timestamp")
+    try:
+        moment = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO timestamp")
+    if moment.tzinfo is not None:
+        try:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        except OverflowError:
+            raise ValueError(f"{name} is out of range")
+    return moment
+
+def _summary(recorded_at, level):
+    return {'count': 1, 'total': level, 'minimum': level, 'maximum': level,
+            'first_at': recorded_at, 'first_level': level, 'last_at': recorded_at, 'last_level': level}
+
+def _merge(into, other):
+    """Fold summary `other` into `into`; on equal timestamps `other` is the later one."""
+    into['count'] += other['count']
+    into['total'] += other['total']
+    into['minimum'] = min(into['minimum'], other['minimum'])
+    into['maximum'] = max(into['maximum'], other['maximum'])
+    if other['first_at'] < into['first_at']:
+        into['first_at'], into['first_level'] = other['first_at'], other['first_level']
+    if other['last_at'] >= into['last_at']:
+        into['last_at'], into['last_level'] = other['last_at'], other['last_level']
+    return into
+
+def _update_rollups(readings):
+    """Merge (bowser id, recorded_at, level) readings into every rollup.
+
+    The batch is summarised per bucket first, so each touched bucket costs
+    one row read and one row write however many readings fall into it.
+    """
+    partials = {}
+    for bowser_id, recorded_at, level in readings:
+        for resolution in RESOLUTIONS:
+            key = (bowser_id, resolution, bucket_start(recorded_at, resolution))
+            if key in partials:
+                _merge(partials[key], _summary(recorded_at, level))
+            else:
+                partials[key] = _summary(recorded_at, level)
+
+    # Touched buckets are read back as bowser ids x bucket starts: plain IN
+    # lists compile far faster than row values, and a batch covers few of
+    # each, so the handful of extra rows is dropped here
+    table = LevelRollup.__table__
+    existing = {}
+    for resolution in RESOLUTIONS:
+        bowser_ids = {bowser_id for bowser_id, bucket_resolution, _ in partials if bucket_resolution == resolution}
+        starts = {start for _, bucket_resolution, start in partials if bucket_resolution == resolution}
+        for bowser_chunk in _chunks(bowser_ids):
+            for start_chunk in _chunks(starts):
+                rows = db.session.query(table).filter(
+                    table.c.resolution == resolution,
+                    table.c.bowser_id.in_(bowser_chunk),
+                    table.c.bucket_start.in_(start_chunk)
+                )
+                for row in rows:
+                    summary = dict(row._mapping)
+                    key = (summary.pop('bowser_id'), summary.pop('resolution'), summary.pop('bucket_start'))
+                    if key in partials:
+                        existing[key] = summary
+
+    updates, inserts = [], []
+    for (bowser_id, resolution, start), partial in partials.items():
+        key = {'key_bowser_id': bowser_id, 'key_resolution': resolution, 'key_bucket_start': start}
+        if (bowser_id, resolution, start) in existing:
+            updates.append(dict(_merge(existing[(bowser_id, resolution, start)], partial), **key))
+        else:
+            inserts.append(dict(partial, bowser_id=bowser_id, resolution=resolution, bucket_start=start))
+    if updates:
+        db.session.execute(table.update().where(
+            (table.c.bowser_id == bindparam('key_bowser_id'))
+            & (table.c.resolution == bindparam('key_resolution'))
+            & (table.c.bucket_start == bindparam('key_bucket_start'))
+        ), updates)
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+
+def _write(readings):
+    """Append the readings, update the rollups and move current_level forward."""
+    latest = {}
+    for bowser_id, recorded_at, level in readings:
+        if bowser_id not in latest or recorded_at >= latest[bowser_id][0]:
+            latest[bowser_id] = (recorded_at, level)
+    newest_stored = {}
+    for chunk in _chunks(latest):
+        newest_stored.update(db.session.query(LevelReading.bowser_id, func.max(LevelReading.recorded_at)).filter(
+            LevelReading.bowser_id.in_(chunk)
+        ).group_by(LevelReading.bowser_id))
+
+    db.session.execute(LevelReading.__table__.insert(), [
+        {'bowser_id': bowser_id, 'recorded_at': recorded_at, 'level': level}
+        for bowser_id, recorded_at, level in readings
+    ])
+    _update_rollups(readings)
+
+    # Through the ORM, so change events (sync, streams, reports) follow the level
+    moved = [bowser_id for bowser_id, (recorded_at, _) in latest.items()
+             if newest_stored.get(bowser_id) is None or recorded_at >= newest_stored[bowser_id]]
+    for chunk in _chunks(moved):
+        for bowser in Bowser.query.filter(Bowser.id.in_(chunk)):
+            if bowser.current_level != latest[bowser.id][1]:
+                bowser.current_level = latest[bowser.id][1]
+
+def ingest_readings(docs, now=None):
+    """Validate a batch of {bowser_id, level, recorded_at?} readings and store the valid ones.
+
+    Levels must be finite and between 0 and the bowser's capacity; readings
+    without recorded_at are stamped `now`. Valid readings are
+    written in one transaction: appended to level_reading, merged into the
+    1 minute, 1 hour and 1 day rollups, and, when newer than anything
+    stored for the bowser, copied to Bowser.current_level.
+    """
+    now = now or datetime.utcnow()
+    ids = {doc.get('bowser_id') for doc in docs if isinstance(doc, dict) and isinstance(doc.get('bowser_id'), str)}
+    capacities = {}
+    for chunk in _chunks(ids):
+        capacities.update(db.session.query(Bowser.id, Bowser.capacity).filter(Bowser.id.in_(chunk)))
+
+    items, readings = [], []
+    for index, doc in enumerate(docs):
+        try:
+            if not isinstance(doc, dict):
+                raise ValueError('Reading must be an object')
+            bowser_id, level = doc.get('bowser_id'), doc.get('level')
+            if not isinstance(bowser_id, str):
+                raise ValueError('bowser_id must be a string')
+            if bowser_id not in capacities:
+                raise ValueError(f"Unknown bowser_id: {bowser_id}")
+            if isinstance(level, bool) or not isinstance(level, (int, float)):
+                raise ValueError('level must be a non-negative number')
+            try:
+                level = float(level)
+            except OverflowError:
+                raise ValueError('level must be a non-negative number')
+            # inf would be stored and poison the bowser's rollup buckets for good
+            if not math.isfinite(level) or level < 0:
+                raise ValueError('level must be a non-negative number')
+            if level > capacities[bowser_id]:
+                raise ValueError(f"level must not exceed the bowser's capacity ({capacities[bowser_id]:g})")
+            recorded_at = now if doc.get('recorded_at') is None else parse_timestamp(doc['recorded_at'], 'recorded_at')
+            if recorded_at > now + MAX_CLOCK_SKEW:
+                raise ValueError('recorded_at is in the future')
+        except ValueError as e:
+            items.append({'index': index, 'bowser_id': doc.get('bowser_id') if isinstance(doc, dict) else None,
+                          'status': 'error', 'error': str(e)})
+            continue
+        readings.append((bowser_id, recorded_at, level))
+        items.append({'index': index, 'bowser_id': bowser_id, 'status': 'recorded', 'error': None})
+
+    if readings:
+        try:
+            try:
+                _write(readings)
+                db.session.commit()
+            except IntegrityError:
+                # A concurrent batch created one of the same buckets first
+                db.session.rollback()
+                _write(readings)
+                db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            for item in items:
+                if item['status'] == 'recorded':
+                    item['status'] = 'error'
+                    item['error'] = f"Transaction failed: {str(e.orig if hasattr(e, 'orig') else e)}"
+    return BulkResult(items)
+
+def bucket_count(start, end, resolution):
+    """Number of `resolution`-second buckets that rollup_points() can return."""
+    span = (end - bucket_start(start, resolution)).total_seconds()
+    return max(0, math.ceil(span / resolution))
+
+def choose_resolution(start, end, max_points):
+    """The finest rollup giving at most `max_points` buckets over [start, end)."""
+    for resolution in RESOLUTIONS:
+        if bucket_count(start, end, resolution) <= max_points:
+            return resolution
+    return RESOLUTIONS[-1]
+
+def raw_points(bowser_id, start, end, limit):
+    """Raw readings in [start, end), oldest first, at most `limit`."""
+    rows = db.session.query(LevelReading.recorded_at, LevelReading.level).filter(
+        LevelReading.bowser_id == bowser_id,
+        LevelReading.recorded_at >= start,
+        LevelReading.recorded_at < end
+    ).order_by(LevelReading.recorded_at).limit(limit)
+    return [{'t': recorded_at.isoformat(), 'level': level} for recorded_at, level in rows]
+
+def rollup_points(bowser_id, resolution, start, end):
+    """Buckets of `resolution` seconds starting in [start, end), oldest first.
+
+    A primary-key range read, so it costs one row per point returned.
+    """
+    rows = db.session.query(
+        LevelRollup.bucket_start, LevelRollup.count, LevelRollup.total, LevelRollup.minimum,
+        LevelRollup.maximum, LevelRollup.first_level, LevelRollup.last_level
+    ).filter(
+        LevelRollup.bowser_id == bowser_id,
+        LevelRollup.resolution == resolution,
+        LevelRollup.bucket_start >= bucket_start(start, resolution),
+        LevelRollup.bucket_start < end
+    ).order_by(LevelRollup.bucket_start)
+    return [{'t': started.isoformat(), 'count': count, 'mean': total / count, 'min': minimum,
+             'max': maximum, 'first': first, 'last': last}
+            for started, count, total, minimum, maximum, first, last in rows]
+
+def level_series(bowser_id, start, end, resolution='auto', max_points=500):
+    """Return (resolution name, points) for a chart of one bowser's level.
+
+    'auto' serves the raw readings when there are at most `max_points` of
+    them in the range and otherwise the finest rollup that fits. 'raw' is
+    cut off at `max_points` readings. Raises ValueError when the rollup
+    would need more than `max_points` buckets, rather than returning an
+    unbounded or silently shortened series.
+    """
+    if resolution in ('auto', 'raw'):
+        points = raw_points(bowser_id, start, end, max_points + 1)
+        if resolution == 'raw' or len(points) <= max_points:
+            return 'raw', points[:max_points]
+        resolution = choose_resolution(start, end, max_points)
+    else:
+        resolution = RESOLUTION_NAMES[resolution]
+    name = next(name for name, seconds in RESOLUTION_NAMES.items() if seconds == resolution)
+    count = bucket_count(start, end, resolution)
+    if count > max_points:
+        raise ValueError(f"{name} resolution gives {count} points over this range, more than "
+                         f"max_points ({max_points}); use a coarser resolution or a shorter range")
+    return name, rollup_points(bowser_id, resolution, start, end)
@@ -0,0 +1,105 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import tuple_
+from database import db
+from utils.serialization import serializable_columns, json_value, projected_columns, row_serializer
+
+# Upper bound for ?limit= so a single page cannot ask for the whole table
+MAX_PAGE_SIZE = 1000
+
+class Page:
+    """One page of serialized rows plus the cursor for the next page (or None)."""
+
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+def encode_cursor(values):
+    payload = json.dumps([json_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor into values for the given sort columns."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor')
+    decoded = []
+    for column, value in zip(columns, values):
+        if isinstance(column.type, db.DateTime) and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+def parse_fields(model):
+    """Return the field names requested with ?fields=a,b,c, or None for all."""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    allowed = {column.name for column in serializable_columns(model)}
+    names = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return names
+
+def parse_limit():
+    raw = request.args.get('limit')
+    if raw is None:
+        return None
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, MAX_PAGE_SIZE)
+
+def paginate(model, order_by=None, descending=False):
+    """Read one keyset page of a model using the current request's arguments.
+
+    Supports ?limit=N, ?after=<cursor> and ?fields=a,b,c. Rows are ordered by
+    `order_by` columns plus the primary key, and the next page starts strictly
+    after the last row returned, so page cost does not grow with table size.
+    Without ?limit every matching row is returned, as before.
+
+    Raises ValueError for malformed arguments.
+    """
+    table = model.__table__
+    sort_columns = [table.c[name] for name in (order_by or [])]
+    sort_columns += [column for column in table.primary_key.columns if column not in sort_columns]
+
+    fields = parse_fields(model)
+    limit = parse_limit()
+
+    # Column tuples rather than ORM objects; sort keys not requested ride
+    # along after the projected columns for the cursor
+    columns = projected_columns(model, fields)
+    query = db.session.query(*columns, *[column for column in sort_columns if column not in columns])
+
+    after = request.args.get('after')
+    if after:
+        values = decode_cursor(after, sort_columns)
+        if len(sort_columns) == 1:
+            key, target = sort_columns[0], values[0]
+        else:
+            key, target = tuple_(*sort_columns), tuple_(*values)
+        query = query.filter(key < target if descending else key > target)
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in sort_columns])
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.name) for column in sort_columns])
+
+    serialize = row_serializer(columns)
+    return Page([serialize(row) for row in rows], next_cursor)
@@ -0,0 +1,50 @@
+from datetime import datetime
+from database import db
+
+def serializable_columns(model):
+    """Columns that may be exposed through the API for a model."""
+    hidden = getattr(model, 'api_hidden_fields', ())
+    return [column for column in model.__table__.columns if column.name not in hidden]
+
+def json_value(value):
+    """Convert a column value to its JSON form, matching the models' to_dict()."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def projected_columns(model, fields=None):
+    """The serializable columns of `model`, narrowed to `fields` in their order."""
+    if fields:
+        return [model.__table__.c[name] for name in fields]
+    return serializable_columns(model)
+
+def row_serializer(columns):
+    """Return a function turning a column tuple into a dict like to_dict().
+
+    Only the leading len(columns) values of a row are used, so queries may
+    select extra columns (e.g. sort keys) after them. Date columns are
+    found once here instead of type-checking every value of every row.
+    """
+    names = [column.name for column in columns]
+    dates = [index for index, column in enumerate(columns) if isinstance(column.type, db.DateTime)]
+    if not dates:
+        return lambda row: dict(zip(names, row))
+
+    def serialize(row):
+        values = list(row[:len(names)])
+        for index in dates:
+            if values[index] is not None:
+                values[index] = values[index].isoformat()
+        return dict(zip(names, values))
+    return serialize
+
+def project_rows(model, *criteria, fields=None, order_by=None):
+    """Serialize matching rows of `model` from column tuples.
+
+    Produces the same dicts as [row.to_dict() for row in query] without
+    building ORM objects or calling to_dict().
+    """
+    columns = projected_columns(model, fields)
+    query = db.session.query(*columns).filter(*criteria)
+    if order_by is not None:
+        query = query.order_by(*order_by)
+    serialize = row_serializer(columns)
+    return [serialize(row) for row in query]
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import secrets
+import tempfile
+import time
+from datetime import timedelta
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SecureCookieSessionInterface, SessionInterface
+from itsdangerous import BadSignature, Signer
+
+logger = logging.getLogger(__name__)
+
+# Used when SESSION_REFRESH_THRESHOLD is not configured
+DEFAULT_REFRESH_THRESHOLD = timedelta(minutes=5)
+
+def refresh_threshold(app):
+    """Seconds after which an unchanged permanent session is re-issued."""
+    return app.config.get('SESSION_REFRESH_THRESHOLD', DEFAULT_REFRESH_THRESHOLD).total_seconds()
+
+class SlidingCookieSessionInterface(SecureCookieSessionInterface):
+    """Signed-cookie sessions with a sliding expiry window.
+
+    Unlike SESSION_REFRESH_EACH_REQUEST, an unchanged permanent session is
+    only re-signed and re-sent once its last refresh is older than
+    SESSION_REFRESH_THRESHOLD, so most responses carry no Set-Cookie.
+    """
+
+    def should_set_cookie(self, app, session):
+        now = int(time.time())
+        if session.modified or (session.permanent and now - session.get('_refreshed', 0) >= refresh_threshold(app)):
+            session['_refreshed'] = now
+            return True
+        return False
+
+class ServerSideSession(SecureCookieSession):
+    """Session data kept in a SessionStore; the cookie only carries the id."""
+
+    def __init__(self, initial=None, sid=None, expires_at=0.0, new=False):
+        super().__init__(initial)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = new
+        self.initial_user_id = (initial or {}).get('_user_id')
+
+class FileSystemSessionStore:
+    """One JSON file per session under `directory` (SESSION_TYPE='filesystem')."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.directory, sid)
+
+    def load(self, sid):
+        """Return (payload, expires_at), or None for a missing or expired session."""
+        try:
+            with open(self._path(sid), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get('expires_at', 0) <= time.time():
+            self.delete(sid)
+            return None
+        return record['payload'], record['expires_at']
+
+    def save(self, sid, payload, expires_at):
+        # Write through a temp file so a concurrent load never sees half a file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'payload': payload, 'expires_at': expires_at}, f)
+            os.replace(temp_path, self._path(sid))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def delete(self, sid):
+        try:
+            os.remove(self._path(sid))
+        except OSError:
+            pass
+
+    def purge_expired(self):
+        """Remove expired session files; returns how many were removed."""
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name.startswith('.tmp-'):
+                continue
+            try:
+                with open(self._path(name), 'r', encoding='utf-8') as f:
+                    expired = json.load(f).get('expires_at', 0) <= now
+            except (OSError, ValueError):
+                expired = True
+            if expired:
+                self.delete(name)
+                removed += 1
+        return removed
+
+class ServerSideSessionInterface(SessionInterface):
+    """Sessions stored server-side, identified by a (signed) random id cookie.
+
+    The store is written when the session changes; the cookie is only sent
+    for a new session, a new sign-in (the id is rotated to prevent
+    fixation) or when the sliding expiry is due for a refresh.
+    """
+
+    serializer = TaggedJSONSerializer()
+    session_class = ServerSideSession
+    # Purge expired files after this many new sessions
+    purge_every = 1000
+
+    def __init__(self, store):
+        self.store = store
+        self._new_sessions = 0
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-side-session', key_derivation='hmac')
+
+    def _cookie_value(self, app, sid):
+        if app.config.get('SESSION_USE_SIGNER'):
+            return self._signer(app).sign(sid).decode()
+        return sid
+
+    def _sid_from_cookie(self, app, value):
+        if app.config.get('SESSION_USE_SIGNER'):
+            try:
+                value = self._signer(app).unsign(value).decode()
+            except BadSignature:
+                return None
+        return value if value and all(c in '0123456789abcdef' for c in value) else None
+
+    def _new_session(self):
+        self._new_sessions += 1
+        if self._new_sessions % self.purge_every == 0:
+            try:
+                self.store.purge_expired()
+            except OSError as e:
+                logger.warning(f"Session purge failed: {str(e)}")
+        return self.session_class(sid=secrets.token_hex(32), new=True)
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        sid = self._sid_from_cookie(app, cookie) if cookie else None
+        record = self.store.load(sid) if sid else None
+        if record is None:
+            return self._new_session()
+        payload, expires_at = record
+        try:
+            data = self.serializer.loads(payload)
+        except ValueError:
+            return self._new_session()
+        return self.session_class(data, sid=sid, expires_at=expires_at)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+
+        if not session:
+            if not session.new:
+                self.store.delete(session.sid)
+            if session.modified:
+                response.delete_cookie(name, domain=domain, path=path, secure=secure, samesite=samesite)
+            return
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        now = time.time()
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        refresh_due = now - (session.expires_at - lifetime) >= refresh_threshold(app)
+        rotate = not session.new and session.get('_user_id') != session.initial_user_id
+        if not (session.new or session.modified or refresh_due):
+            return
+
+        if rotate:
+            self.store.delete(session.sid)
+            session.sid = secrets.token_hex(32)
+        session.expires_at = now + lifetime
+        self.store.save(session.sid, self.serializer.dumps(dict(session)), session.expires_at)
+
+        # Browser-session cookies never expire client-side, so only
+        # permanent ones need re-sending to slide their expiry
+        if session.new or rotate or (refresh_due and session.permanent):
+            response.set_cookie(
+                name,
+                self._cookie_value(app, session.sid),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=secure,
+                samesite=samesite,
+            )
+
+def init_session_interface(app):
+    """Install the session interface selected by SESSION_TYPE."""
+    if app.config.get('SESSION_TYPE') == 'filesystem':
+        app.session_interface = ServerSideSessionInterface(FileSystemSessionStore(app.config['SESSION_FILE_DIR']))
+    else:
+        app.session_interface = SlidingCookieSessionInterface()
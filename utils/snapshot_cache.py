@@ -0,0 +1,51 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class SnapshotCache:
+    """In-process cache of pre-rendered payloads.
+
+    Entries are dropped by `invalidate()` (wired to model change events) and
+    expire after `max_age` seconds regardless, which bounds staleness for
+    writes made by other worker processes that this process never hears of.
+    """
+
+    def __init__(self, max_age: float = 5.0):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, tuple] = {}
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            return None
+        return value
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, building and storing it on a miss.
+
+        A value whose build overlapped an invalidation is returned to the
+        caller but not stored, so a write that lands mid-render is never
+        hidden behind a fresh-looking entry.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            generation = self._generation
+        value = build()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.max_age)
+        return value
+
+    def invalidate(self, *args):
+        """Drop every entry. Accepts and ignores event-listener arguments."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
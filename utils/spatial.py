@@ -0,0 +1,265 @@
+import logging
+import math
+import threading
+import time
+from database import db
+from models.sql_models import Bowser, Location, Deployment
+from utils.serialization import serializable_columns, row_serializer
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Collections whose change events move points in the indexes
+SPATIAL_COLLECTIONS = ('locations', 'deployments', 'bowsers')
+
+logger = logging.getLogger(__name__)
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def valid_point(lat, lon):
+    """True for finite coordinates within ±90 latitude and ±180 longitude."""
+    return (isinstance(lat, (int, float)) and isinstance(lon, (int, float))
+            and math.isfinite(lat) and math.isfinite(lon)
+            and -90 <= lat <= 90 and -180 <= lon <= 180)
+
+class GridIndex:
+    """Points bucketed into a fixed latitude/longitude grid.
+
+    Radius queries visit only the cells overlapping the query's bounding
+    box and check exact haversine distance for the points in them; nearest
+    queries widen the radius until enough points are found. Inserts and
+    removals are O(1), so the index can follow writes as they happen.
+    """
+
+    def __init__(self, cell_km=5.0):
+        self.cell_degrees = cell_km / KM_PER_DEGREE
+        self._columns = math.ceil(360 / self.cell_degrees)
+        self._cells = {}
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        return (math.floor((lat + 90) / self.cell_degrees),
+                math.floor((lon + 180) / self.cell_degrees) % self._columns)
+
+    def insert(self, key, lat, lon, item):
+        """Add or move the point `key`, carrying `item` as its payload."""
+        self.remove(key)
+        cell = self._cell(lat, lon)
+        self._points[key] = (lat, lon, cell, item)
+        self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        bucket = self._cells[point[2]]
+        bucket.discard(key)
+        if not bucket:
+            del self._cells[point[2]]
+
+    def get(self, key):
+        point = self._points.get(key)
+        return point and point[3]
+
+    def _candidate_cells(self, lat, lon, radius_km):
+        """Cells that may hold points within `radius_km` of (lat, lon)."""
+        delta_lat = radius_km / KM_PER_DEGREE
+        lat_min, lat_max = max(-90.0, lat - delta_lat), min(90.0, lat + delta_lat)
+        widest = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+        delta_lon = 180.0 if widest < 1e-9 else min(180.0, delta_lat / widest)
+        rows = range(self._cell(lat_min, 0)[0], self._cell(lat_max, 0)[0] + 1)
+        if delta_lon >= 180.0:
+            columns = range(self._columns)
+        else:
+            first = self._cell(0, lon - delta_lon)[1]
+            count = math.floor(2 * delta_lon / self.cell_degrees) + 2
+            columns = [(first + offset) % self._columns for offset in range(min(count, self._columns))]
+        if len(rows) * len(columns) > len(self._cells):
+            # A box wider than the occupied area: walk the occupied cells
+            row_set, column_set = set(rows), set(columns)
+            return [cell for cell in self._cells if cell[0] in row_set and cell[1] in column_set]
+        return [(row, column) for row in rows for column in columns if (row, column) in self._cells]
+
+    def within(self, lat, lon, radius_km, predicate=None):
+        """Return [(distance km, key, item)] within `radius_km`, nearest first."""
+        found = []
+        for cell in self._candidate_cells(lat, lon, radius_km):
+            for key in self._cells[cell]:
+                point_lat, point_lon, _, item = self._points[key]
+                if predicate is not None and not predicate(item):
+                    continue
+                distance = haversine_km(lat, lon, point_lat, point_lon)
+                if distance <= radius_km:
+                    found.append((distance, key, item))
+        found.sort(key=lambda entry: (entry[0], entry[1]))
+        return found
+
+    def nearest(self, lat, lon, k=1, max_km=None, predicate=None):
+        """Return the `k` nearest [(distance km, key, item)], optionally capped at `max_km`."""
+        limit = max_km if max_km is not None else math.pi * EARTH_RADIUS_KM
+        radius = min(limit, self.cell_degrees * KM_PER_DEGREE)
+        while True:
+            found = self.within(lat, lon, radius, predicate)
+            if len(found) >= k or radius >= limit:
+                return found[:k]
+            radius = min(limit, radius * 4)
+
+class SpatialIndexes:
+    """Location and deployed-bowser indexes for one app.
+
+    Built from the database on first use and then kept current from model
+    change events (see `apply`). Bowsers have no coordinates of their own;
+    a bowser is placed at the location of its active deployment. Writes
+    made by other worker processes are picked up by rebuilding after
+    `max_age` seconds.
+    """
+
+    def __init__(self, cell_km=5.0, max_age=300.0):
+        self.cell_km = cell_km
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._state = None
+        self._built_at = 0.0
+        self._pending = None
+
+    def _fresh_state(self):
+        return {
+            'locations': GridIndex(self.cell_km),
+            'bowsers': GridIndex(self.cell_km),
+            'location_rows': {},
+            'bowser_rows': {},
+            # Active deployments: id -> (bowser id, location id), and back
+            'deployments': {},
+            'bowser_deployments': {},
+        }
+
+    def _build(self):
+        state = self._fresh_state()
+        # Rows are kept in their to_dict() form, as change events carry them
+        for model, rows in ((Location, state['location_rows']), (Bowser, state['bowser_rows'])):
+            columns = serializable_columns(model)
+            serialize = row_serializer(columns)
+            for row in db.session.query(*columns):
+                item = serialize(row)
+                rows[item['id']] = item
+        active = db.session.query(Deployment.id, Deployment.bowser_id, Deployment.location_id).filter(
+            Deployment.status == 'active'
+        )
+        for deployment_id, bowser_id, location_id in active:
+            state['deployments'][deployment_id] = (bowser_id, location_id)
+            state['bowser_deployments'][bowser_id] = deployment_id
+        for location_id in state['location_rows']:
+            _place_location(state, location_id)
+        for bowser_id in state['bowser_rows']:
+            _place_bowser(state, bowser_id)
+        return state
+
+    def _fresh(self):
+        return self._state is not None and time.monotonic() - self._built_at < self.max_age
+
+    def _current(self):
+        with self._lock:
+            if self._fresh():
+                return self._state
+        with self._build_lock:
+            with self._lock:
+                if self._fresh():
+                    return self._state
+                # Events published while the database is read are replayed on top
+                self._pending = []
+            state = self._build()
+            with self._lock:
+                for topic, event in self._pending:
+                    _apply(state, topic, event)
+                self._pending = None
+                self._state, self._built_at = state, time.monotonic()
+                return state
+
+    def nearby_locations(self, lat, lon, radius_km, limit=None, predicate=None):
+        state = self._current()
+        with self._lock:
+            found = state['locations'].within(lat, lon, radius_km, predicate)
+        return found[:limit] if limit else found
+
+    def nearest_bowsers(self, lat, lon, k=1, max_km=None, predicate=None):
+        state = self._current()
+        with self._lock:
+            return state['bowsers'].nearest(lat, lon, k, max_km, predicate)
+
+    def apply(self, topic, event):
+        """Change-broker listener: move, add or drop the points an event touches.
+
+        Runs inside the session's after_commit, so it never raises: an event
+        that cannot be applied is logged and the indexes are rebuilt on the
+        next query instead.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((topic, event))
+            if self._state is not None:
+                try:
+                    _apply(self._state, topic, event)
+                except Exception as e:
+                    logger.error(f"Spatial index update for {topic} {event.get('id')} failed: {str(e)}")
+                    self._state = None
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+
+def _place_location(state, location_id):
+    row = state['location_rows'].get(location_id)
+    if row is None or not valid_point(row['latitude'], row['longitude']):
+        state['locations'].remove(location_id)
+        return
+    state['locations'].insert(location_id, row['latitude'], row['longitude'], row)
+
+def _place_bowser(state, bowser_id):
+    row = state['bowser_rows'].get(bowser_id)
+    deployment_id = state['bowser_deployments'].get(bowser_id)
+    location_id = deployment_id and state['deployments'][deployment_id][1]
+    location = state['location_rows'].get(location_id) if row is not None and location_id else None
+    if not location or not valid_point(location['latitude'], location['longitude']):
+        state['bowsers'].remove(bowser_id)
+        return
+    item = dict(row, deployment_id=deployment_id, location_id=location_id,
+                latitude=location['latitude'], longitude=location['longitude'])
+    state['bowsers'].insert(bowser_id, location['latitude'], location['longitude'], item)
+
+def _apply(state, topic, event):
+    row_id, row = event['id'], event.get('row')
+    if topic == 'locations':
+        if row is None:
+            state['location_rows'].pop(row_id, None)
+        else:
+            state['location_rows'][row_id] = row
+        _place_location(state, row_id)
+        for bowser_id, location_id in list(state['deployments'].values()):
+            if location_id == row_id:
+                _place_bowser(state, bowser_id)
+    elif topic == 'bowsers':
+        if row is None:
+            state['bowser_rows'].pop(row_id, None)
+        else:
+            state['bowser_rows'][row_id] = row
+        _place_bowser(state, row_id)
+    elif topic == 'deployments':
+        previous = state['deployments'].pop(row_id, None)
+        if previous and state['bowser_deployments'].get(previous[0]) == row_id:
+            del state['bowser_deployments'][previous[0]]
+        if row is not None and row.get('status') == 'active':
+            state['deployments'][row_id] = (row['bowser_id'], row['location_id'])
+            state['bowser_deployments'][row['bowser_id']] = row_id
+        affected = {previous[0]} if previous else set()
+        if row is not None:
+            affected.add(row['bowser_id'])
+        for bowser_id in affected:
+            _place_bowser(state, bowser_id)
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    `get_or_load` skips storing a value whose load overlapped an
+    invalidation (`pop` or `clear`), so a reader racing a writer cannot
+    put the pre-write value back for a full TTL.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Return the cached value, calling `load()` on a miss. None is not cached."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            generation = self._generation
+        value = load()
+        if value is not None:
+            self.set(key, value, generation)
+        return value
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,65 @@
+import atexit
+import logging
+import threading
+from typing import Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindBuffer:
+    """Coalesce non-critical updates in memory and write them in batches.
+
+    `put(key, value)` keeps only the latest value per key. A daemon thread
+    hands the pending values to `flush(pending)` inside an app context
+    every `interval` seconds, or sooner once `max_pending` keys are queued,
+    so a burst of N updates costs one write transaction instead of N.
+    Values still pending at interpreter exit are flushed by an atexit hook;
+    a hard crash loses at most one interval of updates.
+    """
+
+    def __init__(self, app, flush: Callable[[Dict[Hashable, object]], None],
+                 interval: float = 5.0, max_pending: int = 500):
+        self.app = app
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, object] = {}
+        self._wake = threading.Event()
+        self._thread = None
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._pending[key] = value
+            full = len(self._pending) >= self.max_pending
+            if self._thread is None:
+                # Started lazily so CLI commands and forked workers only get
+                # a thread when they actually queue something
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write everything pending now; returns the number of keys written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            with self.app.app_context():
+                self._flush(pending)
+        except Exception as e:
+            logger.error(f"Write-behind flush of {len(pending)} updates failed: {str(e)}")
+            with self._lock:
+                # Keep newer values queued since the failed batch was taken
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)
+            return 0
+        return len(pending)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()